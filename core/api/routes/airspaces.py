@@ -25,7 +25,8 @@ async def search_bbox(
     """Query airspaces within a bounding box at a given altitude."""
     try:
         results = await asyncio.to_thread(
-            svc.query_segment_airspaces, min_lat, min_lon, max_lat, max_lon, altitude_ft
+            svc.query_segment_airspaces, min_lat, min_lon, max_lat, max_lon, altitude_ft,
+            include_geometry=True,
         )
         return [a.to_firestore() for a in results]
     except SpatiaLiteNotReadyError:
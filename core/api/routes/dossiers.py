@@ -16,11 +16,15 @@ router = APIRouter(prefix="/dossiers", tags=["dossiers"])
 @router.get("")
 async def list_dossiers(
     status: DossierStatus | None = None,
+    limit: int | None = None,
+    start_after: str | None = None,
     user_id: str = Depends(get_current_user),
     repo: DossierRepository = Depends(get_dossier_repo),
 ) -> list[dict]:
     if status is not None:
-        items = await repo.list_by_status(user_id, status)
+        items = await repo.list_by_status(
+            user_id, status, limit=limit, start_after=start_after,
+        )
     else:
         items = await repo.list_all(user_id)
     return [d.to_firestore() for d in items]
@@ -506,7 +506,8 @@ async def analyze_route(
     # Run synchronous SpatiaLite query in thread pool
     try:
         leg_airspaces = await asyncio.to_thread(
-            airspace_svc.analyze_route, waypoint_tuples, leg_tuples
+            airspace_svc.analyze_route, waypoint_tuples, leg_tuples,
+            include_geometry=True,
         )
     except SpatiaLiteNotReadyError:
         return {
@@ -584,7 +585,8 @@ async def analyze_route_with_overrides(
     # Run synchronous SpatiaLite query in thread pool
     try:
         leg_airspaces = await asyncio.to_thread(
-            airspace_svc.analyze_route, waypoint_tuples, leg_tuples
+            airspace_svc.analyze_route, waypoint_tuples, leg_tuples,
+            include_geometry=True,
         )
     except SpatiaLiteNotReadyError:
         return {
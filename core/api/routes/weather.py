@@ -121,9 +121,9 @@ def _simulation_to_dict(simulation, requested_models: list[str]) -> dict[str, An
                     "wind_speed_10m": forecast.wind_speed_10m,
                     "wind_direction_10m": forecast.wind_direction_10m,
                     "wind_gusts_10m": forecast.wind_gusts_10m,
-                    "temperature_levels": forecast.temperature_levels,
-                    "wind_speed_levels": forecast.wind_speed_levels,
-                    "wind_direction_levels": forecast.wind_direction_levels,
+                    "temperature_levels": mr.level_values(forecast.temperature_levels),
+                    "wind_speed_levels": mr.level_values(forecast.wind_speed_levels),
+                    "wind_direction_levels": mr.level_values(forecast.wind_direction_levels),
                     "cloud_cover": forecast.cloud_cover,
                     "cloud_cover_low": forecast.cloud_cover_low,
                     "cloud_cover_mid": forecast.cloud_cover_mid,
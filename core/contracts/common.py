@@ -15,9 +15,14 @@ Internal services (e.g. SpatiaLite queries) may use metric units,
 but must convert to the above before returning to the API layer.
 """
 
-from typing import Any
+from typing import Any, ClassVar, Self
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+
+def is_icao(code: str) -> bool:
+    """4 uppercase ASCII letters — regex-free equivalent of ``^[A-Z]{4}$``."""
+    return len(code) == 4 and code.isascii() and code.isalpha() and code.isupper()
 
 
 class FirestoreModel(BaseModel):
@@ -26,6 +31,9 @@ class FirestoreModel(BaseModel):
     - Enums serialize as string values (Firestore stores strings).
     - ``to_firestore()`` produces a JSON-safe dict (datetimes as ISO 8601).
     - ``from_firestore()`` hydrates from a Firestore document dict.
+    - ``from_firestore_many()`` / ``to_firestore_many()`` handle whole
+      result sets through a cached ``TypeAdapter(list[cls])``, validated in
+      one pydantic-core pass instead of one Python call per document.
     """
 
     model_config = ConfigDict(
@@ -33,6 +41,8 @@ class FirestoreModel(BaseModel):
         use_enum_values=True,
     )
 
+    __list_adapter__: ClassVar[TypeAdapter[Any] | None] = None
+
     def to_firestore(self) -> dict[str, Any]:
         """Dump to Firestore-compatible dict."""
         return self.model_dump(mode="json", by_alias=True, exclude_none=True)
@@ -42,6 +52,29 @@ class FirestoreModel(BaseModel):
         """Create model instance from Firestore document dict."""
         return cls.model_validate(data)
 
+    @classmethod
+    def _list_adapter(cls) -> TypeAdapter[list[Self]]:
+        # Built on first use: forward refs are resolved by then. Read from
+        # the class's own __dict__ so subclasses never share their parent's.
+        adapter: TypeAdapter[list[Self]] | None = cls.__dict__.get("__list_adapter__")
+        if adapter is None:
+            adapter = TypeAdapter(list[cls])  # type: ignore[valid-type]
+            cls.__list_adapter__ = adapter
+        return adapter
+
+    @classmethod
+    def from_firestore_many(cls, docs: list[dict[str, Any]]) -> list[Any]:
+        """Create model instances from a list of Firestore document dicts."""
+        return cls._list_adapter().validate_python(docs)
+
+    @classmethod
+    def to_firestore_many(cls, entities: list["FirestoreModel"]) -> list[dict[str, Any]]:
+        """Dump a list of instances to Firestore-compatible dicts."""
+        docs: list[dict[str, Any]] = cls._list_adapter().dump_python(
+            entities, mode="json", by_alias=True, exclude_none=True,
+        )
+        return docs
+
 
 class GeoPoint(BaseModel):
     """WGS84 geographic coordinate."""
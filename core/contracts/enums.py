@@ -113,3 +113,16 @@ class AerodromeStatus(str, Enum):
     RESTRICTED = "restricted"
     MILITARY = "military"
     CLOSED = "closed"
+
+
+# Value → member lookup tables, built once at import. A plain dict hit is
+# several times cheaper than ``Enum(value)`` through the metaclass, which
+# matters in per-row loops such as the METAR cloud layers.
+VALUE_MAPS: dict[type[Enum], dict[str, Enum]] = {
+    cls: {m.value: m for m in cls}
+    for cls in (
+        LocationType, WaypointRole, WaypointSource, DossierStatus, SectionId,
+        SectionCompletion, TrackSource, ForecastModel, VFRStatus, CloudCover,
+        AirspaceType, IntersectionType, AerodromeStatus,
+    )
+}
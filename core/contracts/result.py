@@ -1,22 +1,35 @@
-"""Generic service result wrapper."""
+"""Generic service result wrapper.
 
+Plain dataclasses rather than pydantic models: results are built on every
+internal service call and never come from untrusted input, so validation
+would be pure overhead. ``to_dict()`` / ``to_json()`` serialize at the edge.
+"""
+
+import json
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Generic, TypeVar
+from typing import Any, Generic, TypeVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
 T = TypeVar("T")
 
 
-class ServiceError(BaseModel):
+def _utcnow() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class ServiceError:
     """Structured error from a service call."""
 
-    code: str = Field(..., description="Machine-readable error code")
-    message: str = Field(..., description="Human-readable error message")
+    code: str  # Machine-readable error code
+    message: str  # Human-readable error message
     details: dict[str, str | int | float | bool | None] | None = None
 
 
-class ServiceResult(BaseModel, Generic[T]):
+@dataclass(slots=True)
+class ServiceResult(Generic[T]):
     """Generic wrapper for service responses.
 
     On success: ``data`` is populated.
@@ -26,8 +39,8 @@ class ServiceResult(BaseModel, Generic[T]):
     success: bool
     data: T | None = None
     error: ServiceError | None = None
-    duration_ms: float | None = Field(default=None, ge=0)
-    timestamp: datetime = Field(default_factory=lambda: datetime.now(tz=timezone.utc))
+    duration_ms: float | None = None
+    timestamp: datetime = field(default_factory=_utcnow)
 
     @classmethod
     def ok(cls, data: T, duration_ms: float | None = None) -> "ServiceResult[T]":
@@ -41,3 +54,24 @@ class ServiceResult(BaseModel, Generic[T]):
             success=False,
             error=ServiceError(code=code, message=message, details=details or None),
         )
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-safe dict; pydantic payloads are dumped in JSON mode."""
+        payload: Any = (
+            self.data.model_dump(mode="json", by_alias=True, exclude_none=True)
+            if isinstance(self.data, BaseModel)
+            else self.data
+        )
+        error = self.error
+        return {
+            "success": self.success,
+            "data": payload,
+            "error": None if error is None else {
+                "code": error.code, "message": error.message, "details": error.details,
+            },
+            "duration_ms": self.duration_ms,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), default=str)
@@ -6,19 +6,27 @@ A ``UserWaypoint`` is a persisted waypoint saved for reuse across routes.
 Stored at: ``/users/{user_id}/user_waypoints/{waypoint_id}``
 """
 
+import functools
 import hashlib
 from datetime import datetime, timezone
 
 from pydantic import Field, computed_field, field_validator
 
-from core.contracts.common import FirestoreModel
+from core.contracts.common import FirestoreModel, is_icao
 from core.contracts.enums import LocationType, WaypointSource
 
 
+# typed=True: 48 and 48.0 hash alike but format differently in the raw key.
+@functools.lru_cache(maxsize=4096, typed=True)
 def waypoint_id(name: str, latitude: float, longitude: float) -> str:
-    """Deterministic waypoint ID: MD5(name:lat:lon)[:16]."""
+    """Deterministic waypoint ID: MD5(name:lat:lon)[:16].
+
+    Pure function of its inputs, memoised since the same waypoint recurs
+    across legs and imports. MD5 is an identifier here, not a security
+    primitive.
+    """
     raw = f"{name}:{latitude}:{longitude}"
-    return hashlib.md5(raw.encode()).hexdigest()[:16]
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()[:16]
 
 
 class Waypoint(FirestoreModel):
@@ -34,7 +42,7 @@ class Waypoint(FirestoreModel):
     location_type: LocationType = LocationType.GPS_POINT
     icao_code: str | None = Field(
         default=None,
-        pattern=r"^[A-Z]{4}$",
+        json_schema_extra={"pattern": r"^[A-Z]{4}$"},
         description="ICAO code if location is an aerodrome",
     )
     description: str | None = None
@@ -50,6 +58,13 @@ class Waypoint(FirestoreModel):
     def strip_name(cls, v: str) -> str:
         return v.strip()
 
+    @field_validator("icao_code", mode="after")
+    @classmethod
+    def check_icao_code(cls, v: str | None) -> str | None:
+        if v is not None and not is_icao(v):
+            raise ValueError(f"icao_code must be 4 uppercase letters, got {v!r}")
+        return v
+
 
 class UserWaypoint(Waypoint):
     """A waypoint persisted by a user for reuse across multiple routes.
@@ -4,12 +4,18 @@ Stored at: ``/users/{user_id}/dossiers/{dossier_id}/simulations/{simulation_id}`
 """
 
 from datetime import datetime
+from typing import Any
 
-from pydantic import Field
+from pydantic import Field, field_validator, model_validator
 
-from core.contracts.common import FirestoreModel
+from core.contracts.common import FirestoreModel, is_icao
 from core.contracts.enums import CloudCover, ForecastModel, VFRStatus
 
+_FLIGHT_CATEGORIES = frozenset({"VFR", "MVFR", "IFR", "LIFR"})
+
+# ForecastData fields holding one value per ModelResult.pressure_levels_hpa entry.
+_LEVEL_FIELDS = ("temperature_levels", "wind_speed_levels", "wind_direction_levels")
+
 
 class CloudLayer(FirestoreModel):
     """A single cloud layer from METAR observation."""
@@ -19,15 +25,20 @@ class CloudLayer(FirestoreModel):
 
 
 class ForecastData(FirestoreModel):
-    """Forecast data for a single point/time from one model."""
+    """Forecast data for a single point/time from one model.
+
+    The ``*_levels`` lists are positionally aligned with the owning
+    ``ModelResult.pressure_levels_hpa`` (``None`` where a level is missing),
+    so the level vocabulary is stored once per model rather than per point.
+    """
 
     # Surface temperature
     temperature_2m: float | None = Field(default=None, description="deg C")
     dewpoint_2m: float | None = Field(default=None, description="deg C")
 
-    # Temperature at pressure levels: {1000: 12.5, 925: 8.1, 850: 3.2}
-    temperature_levels: dict[int, float] = Field(
-        default_factory=dict, description="{hPa: deg_C}"
+    # Temperature at pressure levels: [12.5, 8.1, 3.2] for [1000, 925, 850]
+    temperature_levels: list[float | None] = Field(
+        default_factory=list, description="deg C per pressure level"
     )
 
     # Surface wind (kt)
@@ -36,11 +47,11 @@ class ForecastData(FirestoreModel):
     wind_gusts_10m: float | None = Field(default=None, ge=0, description="kt")
 
     # Wind at pressure levels (kt)
-    wind_speed_levels: dict[int, float] = Field(
-        default_factory=dict, description="{hPa: kt}"
+    wind_speed_levels: list[float | None] = Field(
+        default_factory=list, description="kt per pressure level"
     )
-    wind_direction_levels: dict[int, int] = Field(
-        default_factory=dict, description="{hPa: degrees}"
+    wind_direction_levels: list[int | None] = Field(
+        default_factory=list, description="degrees per pressure level"
     )
 
     # Cloud cover (%)
@@ -61,7 +72,7 @@ class ObservationData(FirestoreModel):
     """Real weather observation (METAR)."""
 
     observation_time: datetime
-    icao: str = Field(..., pattern=r"^[A-Z]{4}$")
+    icao: str = Field(..., json_schema_extra={"pattern": r"^[A-Z]{4}$"})
 
     wind_direction: int | None = Field(default=None, ge=0, le=360)
     wind_speed: float | None = Field(default=None, ge=0, description="kt")
@@ -74,12 +85,26 @@ class ObservationData(FirestoreModel):
     ceiling: int | None = Field(default=None, ge=0, description="ft AGL, lowest BKN/OVC")
     clouds: list[CloudLayer] = Field(default_factory=list)
     flight_category: str | None = Field(
-        default=None, pattern=r"^(VFR|MVFR|IFR|LIFR)$"
+        default=None, json_schema_extra={"pattern": r"^(VFR|MVFR|IFR|LIFR)$"}
     )
 
     altimeter: float | None = Field(default=None, description="hPa (QNH)")
     raw_metar: str | None = None
 
+    @field_validator("icao", mode="after")
+    @classmethod
+    def check_icao(cls, v: str) -> str:
+        if not is_icao(v):
+            raise ValueError(f"icao must be 4 uppercase letters, got {v!r}")
+        return v
+
+    @field_validator("flight_category", mode="after")
+    @classmethod
+    def check_flight_category(cls, v: str | None) -> str | None:
+        if v is not None and v not in _FLIGHT_CATEGORIES:
+            raise ValueError(f"flight_category must be one of VFR/MVFR/IFR/LIFR, got {v!r}")
+        return v
+
 
 class VFRIndex(FirestoreModel):
     """VFR safety assessment for a single point."""
@@ -119,8 +144,58 @@ class ModelResult(FirestoreModel):
 
     model: ForecastModel
     model_run_time: datetime
+    pressure_levels_hpa: list[int] = Field(
+        default_factory=list,
+        description="hPa levels indexing every point's *_levels arrays",
+    )
     points: list[ModelPoint]
 
+    @model_validator(mode="before")
+    @classmethod
+    def upgrade_level_dicts(cls, data: Any) -> Any:
+        """Convert legacy ``{hPa: value}`` level dicts to aligned arrays."""
+        if not isinstance(data, dict) or "pressure_levels_hpa" in data:
+            return data
+
+        forecasts = [
+            p["forecast"]
+            for p in data.get("points") or ()
+            if isinstance(p, dict) and isinstance(p.get("forecast"), dict)
+        ]
+        levels = sorted(
+            {
+                int(hpa)
+                for f in forecasts
+                for name in _LEVEL_FIELDS
+                if isinstance(f.get(name), dict)
+                for hpa in f[name]
+            },
+            reverse=True,
+        )
+        if not levels:
+            return data
+
+        points = []
+        for point in data["points"]:
+            forecast = point.get("forecast") if isinstance(point, dict) else None
+            if isinstance(forecast, dict):
+                forecast = dict(forecast)
+                for name in _LEVEL_FIELDS:
+                    if isinstance(forecast.get(name), dict):
+                        by_level = {int(k): v for k, v in forecast[name].items()}
+                        forecast[name] = [by_level.get(hpa) for hpa in levels]
+                point = {**point, "forecast": forecast}
+            points.append(point)
+        return {**data, "pressure_levels_hpa": levels, "points": points}
+
+    def level_values(self, values: list[Any]) -> dict[int, Any]:
+        """Map a point's ``*_levels`` array back to ``{hPa: value}``, skipping gaps."""
+        return {
+            hpa: v
+            for hpa, v in zip(self.pressure_levels_hpa, values)
+            if v is not None
+        }
+
 
 class WeatherSimulation(FirestoreModel):
     """Multi-model weather simulation on a route.
@@ -7,10 +7,11 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import logging
 from pathlib import Path
 
-from core.etl.sia_parser import parse_sia_xml
+from core.etl.sia_parser import iter_sia_rows
 from core.etl.spatialite_builder import SpatiaLiteBuilder
 from core.etl.tile_generator import TileGenerator
 
@@ -34,15 +35,13 @@ def main() -> None:
 
     args.output.mkdir(parents=True, exist_ok=True)
 
-    # 1. Parse SIA XML
-    logger.info("Parsing SIA XML: %s", args.xml_path)
-    data = parse_sia_xml(args.xml_path)
-
-    # 2. Build SpatiaLite DB
+    # 1-2. Stream SIA XML rows straight into the SpatiaLite DB
     db_path = args.output / f"skypath_{args.cycle}.db"
-    logger.info("Building SpatiaLite DB: %s", db_path)
+    logger.info("Building SpatiaLite DB from %s: %s", args.xml_path, db_path)
     builder = SpatiaLiteBuilder(db_path)
-    builder.build(data)
+    # Encode geometries to WKB in Python when shapely is available
+    wkb = importlib.util.find_spec("shapely") is not None
+    builder.consume(iter_sia_rows(args.xml_path, wkb=wkb))
 
     # 3. Generate tiles
     tiles_dir = args.output / "tiles"
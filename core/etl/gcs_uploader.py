@@ -8,6 +8,8 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+_TILE_UPLOAD_WORKERS = 16
+
 
 class GCSUploader:
     """Uploads SpatiaLite DB and tiles to GCS buckets."""
@@ -31,9 +33,12 @@ class GCSUploader:
         Returns a summary dict with upload counts.
         """
         from google.cloud import storage
+        from google.cloud.storage import transfer_manager
 
         client = storage.Client()
-        summary: dict = {"cycle": cycle, "db_uploaded": False, "tiles_uploaded": 0}
+        summary: dict = {
+            "cycle": cycle, "db_uploaded": False, "tiles_uploaded": 0, "tiles_failed": 0,
+        }
 
         # Upload SpatiaLite database
         ref_bucket = client.bucket(self._reference_bucket)
@@ -50,17 +55,36 @@ class GCSUploader:
         meta_blob = ref_bucket.blob(f"airac/{cycle}/metadata.json")
         meta_blob.upload_from_string(json.dumps(metadata))
 
-        # Upload tiles
+        # Upload tiles — the library's worker pool handles parallelism and retries.
+        # Tiles are pre-gzipped; Content-Encoding lets clients inflate transparently.
         tiles_bkt = client.bucket(self._tiles_bucket)
-        tile_count = 0
-        for tile_path in tiles_dir.rglob("*.json"):
-            rel = tile_path.relative_to(tiles_dir)
-            blob = tiles_bkt.blob(f"{cycle}/{rel.as_posix()}")
-            blob.upload_from_filename(str(tile_path))
-            tile_count += 1
-
-        summary["tiles_uploaded"] = tile_count
-        logger.info("Uploaded %d tiles to gs://%s/%s/", tile_count, self._tiles_bucket, cycle)
+        filenames = [p.relative_to(tiles_dir).as_posix() for p in tiles_dir.rglob("*.json.gz")]
+        results = transfer_manager.upload_many_from_filenames(
+            tiles_bkt,
+            filenames,
+            source_directory=str(tiles_dir),
+            blob_name_prefix=f"{cycle}/",
+            max_workers=_TILE_UPLOAD_WORKERS,
+            skip_if_exists=False,
+            additional_blob_attributes={
+                "content_type": "application/json",
+                "content_encoding": "gzip",
+            },
+        )
+        failures = [(name, r) for name, r in zip(filenames, results) if isinstance(r, Exception)]
+        for name, exc in failures[:10]:
+            logger.warning("Tile upload failed: %s (%s)", name, exc)
+
+        summary["tiles_uploaded"] = len(filenames) - len(failures)
+        summary["tiles_failed"] = len(failures)
+        logger.info(
+            "Uploaded %d tiles to gs://%s/%s/ (%d failed)",
+            summary["tiles_uploaded"], self._tiles_bucket, cycle, len(failures),
+        )
+
+        tileset = tiles_dir / "tileset.json"
+        if tileset.exists():
+            tiles_bkt.blob(f"{cycle}/tileset.json").upload_from_filename(str(tileset))
 
         return summary
 
@@ -4,24 +4,77 @@ from __future__ import annotations
 
 import logging
 import xml.etree.ElementTree as ET
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 logger = logging.getLogger(__name__)
 
 
+# SIA table tag → ParsedSIA field, parents before children
+SIA_TABLES: dict[str, str] = {
+    "Espace": "espaces",
+    "Partie": "parties",
+    "Volume": "volumes",
+    "Geometrie": "geometries",
+    "Service": "services",
+    "Frequence": "frequencies",
+    "Ad": "aerodromes",
+    "Rwy": "runways",
+}
+
+
 @dataclass
 class ParsedSIA:
     """Complete parsed dataset from a SIA XML export."""
 
-    espaces: list[dict] = field(default_factory=list)
-    parties: list[dict] = field(default_factory=list)
-    volumes: list[dict] = field(default_factory=list)
-    geometries: list[dict] = field(default_factory=list)
-    services: list[dict] = field(default_factory=list)
-    frequencies: list[dict] = field(default_factory=list)
-    aerodromes: list[dict] = field(default_factory=list)
-    runways: list[dict] = field(default_factory=list)
+    espaces: list[dict[str, Any]] = field(default_factory=list)
+    parties: list[dict[str, Any]] = field(default_factory=list)
+    volumes: list[dict[str, Any]] = field(default_factory=list)
+    geometries: list[dict[str, Any]] = field(default_factory=list)
+    services: list[dict[str, Any]] = field(default_factory=list)
+    frequencies: list[dict[str, Any]] = field(default_factory=list)
+    aerodromes: list[dict[str, Any]] = field(default_factory=list)
+    runways: list[dict[str, Any]] = field(default_factory=list)
+
+    def rows(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Yield ``(tag, row)`` tuples, the shape produced by iter_sia_rows."""
+        for tag, attr in SIA_TABLES.items():
+            for row in getattr(self, attr):
+                yield tag, row
+
+
+def iter_sia_rows(xml_path: Path, *, wkb: bool = False) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Stream ``(tag, row)`` tuples from a SIA XML export.
+
+    Each top-level record is converted as soon as its closing tag is read,
+    then dropped from the tree, so memory stays flat whatever the file size.
+    Unknown tables are skipped silently.
+
+    With ``wkb=True`` (requires the optional ``shapely`` dependency),
+    Geometrie rows also carry a ``WKB`` key so the builder can skip
+    SpatiaLite's WKT lexer.
+    """
+    depth = 0
+    root: ET.Element | None = None
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        tag = _local_name(elem.tag)
+        if tag in SIA_TABLES:
+            row = _element_to_dict(elem)
+            if wkb and tag == "Geometrie":
+                _attach_wkb(row)
+            yield tag, row
+        assert root is not None  # Set by the first "start" event
+        root.clear()
 
 
 def parse_sia_xml(xml_path: Path) -> ParsedSIA:
@@ -31,32 +84,12 @@ def parse_sia_xml(xml_path: Path) -> ParsedSIA:
     - Espace → Partie → Volume → Geometrie
     - Service → Frequence (linked by IndicLieu)
     - Ad → Rwy (linked by AdCode)
+
+    Materialises every row; the ETL pipeline streams iter_sia_rows instead.
     """
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
     result = ParsedSIA()
-
-    for table in root:
-        tag = _local_name(table.tag)
-        row = _element_to_dict(table)
-
-        if tag == "Espace":
-            result.espaces.append(row)
-        elif tag == "Partie":
-            result.parties.append(row)
-        elif tag == "Volume":
-            result.volumes.append(row)
-        elif tag == "Geometrie":
-            result.geometries.append(row)
-        elif tag == "Service":
-            result.services.append(row)
-        elif tag == "Frequence":
-            result.frequencies.append(row)
-        elif tag == "Ad":
-            result.aerodromes.append(row)
-        elif tag == "Rwy":
-            result.runways.append(row)
-        # Skip unknown tables silently
+    for tag, row in iter_sia_rows(xml_path):
+        getattr(result, SIA_TABLES[tag]).append(row)
 
     logger.info(
         "Parsed SIA XML: %d espaces, %d parties, %d volumes, %d geometries, "
@@ -73,6 +106,20 @@ def parse_sia_xml(xml_path: Path) -> ParsedSIA:
     return result
 
 
+def _attach_wkb(row: dict[str, Any]) -> None:
+    """Add the WKB encoding of the row's WKT, if it parses."""
+    from shapely import from_wkt, to_wkb
+    from shapely.errors import GEOSException
+
+    wkt = row.get("WKT", row.get("wkt", ""))
+    if not wkt:
+        return
+    try:
+        row["WKB"] = to_wkb(from_wkt(wkt))
+    except GEOSException:
+        logger.debug("Unparseable WKT left to SpatiaLite: %.60s", wkt)
+
+
 def _local_name(tag: str) -> str:
     """Strip namespace prefix from an XML tag."""
     if "}" in tag:
@@ -80,9 +127,9 @@ def _local_name(tag: str) -> str:
     return tag
 
 
-def _element_to_dict(element: ET.Element) -> dict:
+def _element_to_dict(element: ET.Element) -> dict[str, Any]:
     """Convert an XML element and its children to a flat dict."""
-    result: dict = {}
+    result: dict[str, Any] = {}
     for child in element:
         key = _local_name(child.tag)
         result[key] = (child.text or "").strip()
@@ -4,12 +4,29 @@ from __future__ import annotations
 
 import logging
 import sqlite3
+from collections.abc import Iterable
+from itertools import count
 from pathlib import Path
 
 from core.etl.sia_parser import ParsedSIA
 
 logger = logging.getLogger(__name__)
 
+# Rows buffered per table before each executemany
+_BATCH_SIZE = 5000
+
+# One-shot bulk build: the DB is rebuilt from XML on failure, so no journal
+# or fsync. page_size must be set before the first write; VACUUM at the end
+# still compacts the shipped file.
+_BUILD_PRAGMAS = """
+    PRAGMA page_size = 8192;
+    PRAGMA journal_mode = OFF;
+    PRAGMA synchronous = OFF;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -262144;
+    PRAGMA locking_mode = EXCLUSIVE;
+"""
+
 
 class SpatiaLiteBuilder:
     """Builds the SpatiaLite reference database used by query services."""
@@ -18,21 +35,28 @@ class SpatiaLiteBuilder:
         self._db_path = db_path
 
     def build(self, data: ParsedSIA) -> Path:
-        """Build the complete SpatiaLite database.
+        """Build the complete SpatiaLite database from an in-memory dataset."""
+        return self.consume(data.rows())
+
+    def consume(self, rows: Iterable[tuple[str, dict]]) -> Path:
+        """Build the complete SpatiaLite database from streamed SIA rows.
 
         Steps:
-        1. Create tables
-        2. Insert parsed data
-        3. Build spatial geometries from WKT
-        4. Create materialized view with altitude conversion
+        1. Create tables (Geometrie.geom declared up front)
+        2. Insert rows in executemany batches, building geometries on insert
+           (from WKB when the row carries it, else from WKT)
+        3. Index foreign keys (after the load, so inserts stay cheap)
+        4. Create materialized view with altitude conversion, indexed by altitude band
         5. Build R-tree spatial index
         """
         conn = sqlite3.connect(str(self._db_path))
         try:
+            conn.executescript(_BUILD_PRAGMAS)
             self._load_spatialite(conn)
             self._create_tables(conn)
-            self._insert_data(conn, data)
-            self._build_spatial_geometries(conn)
+            self._add_geometry_column(conn)
+            self._insert_rows(conn, rows)
+            self._create_fk_indexes(conn)
             self._create_materialized_view(conn)
             self._create_spatial_index(conn)
             conn.execute("VACUUM")
@@ -45,9 +69,8 @@ class SpatiaLiteBuilder:
         return self._db_path
 
     def _load_spatialite(self, conn: sqlite3.Connection) -> None:
-        conn.enable_load_extension(True)
-        from core.persistence.spatialite.db_manager import _load_spatialite
-        _load_spatialite(conn)
+        from core.persistence.spatialite.spatialite_loader import enable_spatialite
+        enable_spatialite(conn)
         conn.execute("SELECT InitSpatialMetadata(1)")
 
     def _create_tables(self, conn: sqlite3.Connection) -> None:
@@ -151,131 +174,65 @@ class SpatiaLiteBuilder:
             );
         """)
 
-    def _insert_data(self, conn: sqlite3.Connection, data: ParsedSIA) -> None:
-        espace_pk_map: dict[str, int] = {}
-        partie_pk_map: dict[str, int] = {}
-        ad_pk_map: dict[str, int] = {}
-
-        # Espaces
-        for e in data.espaces:
-            cur = conn.execute(
-                "INSERT INTO Espace (EspaceId, Nom, TypeEspace, Classe) VALUES (?,?,?,?)",
-                (e.get("pk", e.get("EspaceId", "")),
-                 e.get("Nom", ""),
-                 e.get("TypeEspace", ""),
-                 e.get("Classe", "")),
-            )
-            espace_pk_map[e.get("pk", e.get("EspaceId", ""))] = cur.lastrowid
-
-        # Parties
-        for p in data.parties:
-            esp_pk = espace_pk_map.get(p.get("espace_pk", p.get("EspaceId", "")), None)
-            cur = conn.execute(
-                "INSERT INTO Partie (espace_pk, PartieId, Nom) VALUES (?,?,?)",
-                (esp_pk, p.get("pk", p.get("PartieId", "")), p.get("Nom", "")),
-            )
-            partie_pk_map[p.get("pk", p.get("PartieId", ""))] = cur.lastrowid
-
-        # Volumes
-        for v in data.volumes:
-            part_pk = partie_pk_map.get(v.get("partie_pk", v.get("PartieId", "")), None)
-            conn.execute(
-                """INSERT INTO Volume
-                   (partie_pk, VolumeId, Plancher, PlancherRef, PlancherVal,
-                    Plafond, PlafondRef, PlafondVal, HorCode)
-                   VALUES (?,?,?,?,?,?,?,?,?)""",
-                (part_pk, v.get("pk", v.get("VolumeId", "")),
-                 v.get("Plancher", ""), v.get("PlancherRef", ""), v.get("PlancherVal", ""),
-                 v.get("Plafond", ""), v.get("PlafondRef", ""), v.get("PlafondVal", ""),
-                 v.get("HorCode", "")),
-            )
-
-        # Geometries
-        for g in data.geometries:
-            part_pk = partie_pk_map.get(g.get("partie_pk", g.get("PartieId", "")), None)
-            conn.execute(
-                "INSERT INTO Geometrie (partie_pk, WKT) VALUES (?,?)",
-                (part_pk, g.get("WKT", g.get("wkt", ""))),
-            )
+    def _add_geometry_column(self, conn: sqlite3.Connection) -> None:
+        """Declare the spatial column so geometries are built at insert time."""
+        conn.execute(
+            "SELECT AddGeometryColumn('Geometrie', 'geom', 4326, 'GEOMETRY', 'XY')"
+        )
+        conn.commit()
 
-        # Services
-        service_pk_map: dict[str, int] = {}
-        for s in data.services:
-            cur = conn.execute(
-                """INSERT INTO Service
-                   (IndicLieu, Indicatif, TypeService, Langue, HorCode, HorTxt)
-                   VALUES (?,?,?,?,?,?)""",
-                (s.get("IndicLieu", ""), s.get("Indicatif", ""),
-                 s.get("TypeService", ""), s.get("Langue", ""),
-                 s.get("HorCode", ""), s.get("HorTxt", "")),
-            )
-            service_pk_map[s.get("pk", s.get("IndicLieu", ""))] = cur.lastrowid
+    def _insert_rows(self, conn: sqlite3.Connection, rows: Iterable[tuple[str, dict]]) -> None:
+        """Insert streamed rows with executemany, one buffer per table.
 
-        # Frequencies
-        for f in data.frequencies:
-            svc_pk = service_pk_map.get(f.get("service_pk", f.get("IndicLieu", "")), None)
-            conn.execute(
-                """INSERT INTO Frequence
-                   (service_pk, IndicLieu, Frequence, Espacement, HorCode, HorTxt, Secteur, Remarques)
-                   VALUES (?,?,?,?,?,?,?,?)""",
-                (svc_pk, f.get("IndicLieu", ""), f.get("Frequence", ""),
-                 f.get("Espacement", ""), f.get("HorCode", ""),
-                 f.get("HorTxt", ""), f.get("Secteur", ""), f.get("Remarques", "")),
-            )
+        Runs as a single explicit transaction, committed once at the end.
 
-        # Aerodromes
-        for ad in data.aerodromes:
-            cur = conn.execute(
-                """INSERT INTO Ad
-                   (AdCode, AdNomComplet, AdStatut, ArpLat, ArpLon, AdRefAltFt,
-                    DecMag, TempRef, HorCode, Carburant, CarburantRem,
-                    MetCentre, MetBriefing, CatSSLIA, Gestionnaire, Telephone, Remarques)
-                   VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                (ad.get("AdCode", ""), ad.get("AdNomComplet", ""), ad.get("AdStatut", ""),
-                 _float(ad.get("ArpLat")), _float(ad.get("ArpLon")),
-                 _float(ad.get("AdRefAltFt")), _float(ad.get("DecMag")),
-                 _float(ad.get("TempRef")), ad.get("HorCode", ""),
-                 ad.get("Carburant", ""), ad.get("CarburantRem", ""),
-                 ad.get("MetCentre", ""), ad.get("MetBriefing", ""),
-                 ad.get("CatSSLIA", ""), ad.get("Gestionnaire", ""),
-                 ad.get("Telephone", ""), ad.get("Remarques", "")),
-            )
-            ad_pk_map[ad.get("AdCode", "")] = cur.lastrowid
-
-        # Runways
-        for rwy in data.runways:
-            a_pk = ad_pk_map.get(rwy.get("AdCode", ""), None)
-            conn.execute(
-                """INSERT INTO Rwy
-                   (ad_pk, AdCode, Identifiant, Longueur, Largeur, Principal,
-                    Revetement, PCN, OrientationGeo,
-                    LatSeuil1, LonSeuil1, AltFtSeuil1, LDA1,
-                    LatSeuil2, LonSeuil2, AltFtSeuil2, LDA2)
-                   VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                (a_pk, rwy.get("AdCode", ""), rwy.get("Identifiant", ""),
-                 _float(rwy.get("Longueur")), _float(rwy.get("Largeur")),
-                 _int(rwy.get("Principal")),
-                 rwy.get("Revetement", ""), rwy.get("PCN", ""),
-                 _float(rwy.get("OrientationGeo")),
-                 _float(rwy.get("LatSeuil1")), _float(rwy.get("LonSeuil1")),
-                 _float(rwy.get("AltFtSeuil1")), _float(rwy.get("LDA1")),
-                 _float(rwy.get("LatSeuil2")), _float(rwy.get("LonSeuil2")),
-                 _float(rwy.get("AltFtSeuil2")), _float(rwy.get("LDA2"))),
-            )
+        Parent primary keys are allocated by source key as soon as either
+        side is seen, so parent rows need not precede their children.
+        """
+        keys = {
+            "Espace": _PkAllocator(),
+            "Partie": _PkAllocator(),
+            "Service": _PkAllocator(),
+            "Ad": _PkAllocator(),
+        }
+        buffers: dict[str, list[tuple]] = {tag: [] for tag in _INSERT_SQL}
+        counts = dict.fromkeys(_INSERT_SQL, 0)
+
+        # One cursor for the whole load instead of one per Connection.execute
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN")
+            for tag, row in rows:
+                buf = buffers[tag]
+                buf.append(_ROW_PARAMS[tag](row, keys))
+                if len(buf) >= _BATCH_SIZE:
+                    counts[tag] += _bulk_insert(cur, _INSERT_SQL[tag], buf)
+
+            for tag, buf in buffers.items():
+                counts[tag] += _bulk_insert(cur, _INSERT_SQL[tag], buf)
+
+            # References to parents that never showed up become NULL, as before
+            for child, column, parent in _FOREIGN_KEYS:
+                cur.execute(
+                    f"UPDATE {child} SET {column} = NULL "
+                    f"WHERE {column} IS NOT NULL AND {column} NOT IN (SELECT pk FROM {parent})"
+                )
+        finally:
+            cur.close()
 
         conn.commit()
+        logger.info("Inserted SIA rows: %s", ", ".join(f"{n} {t}" for t, n in counts.items()))
 
-    def _build_spatial_geometries(self, conn: sqlite3.Connection) -> None:
-        """Convert WKT text geometries into SpatiaLite spatial column."""
-        conn.execute(
-            "SELECT AddGeometryColumn('Geometrie', 'geom', 4326, 'GEOMETRY', 'XY')"
-        )
-        conn.execute("""
-            UPDATE Geometrie
-            SET geom = GeomFromText(WKT, 4326)
-            WHERE WKT IS NOT NULL AND WKT != ''
+    def _create_fk_indexes(self, conn: sqlite3.Connection) -> None:
+        """Index the join columns used by the materialized view and lookups."""
+        conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_partie_espace ON Partie(espace_pk);
+            CREATE INDEX IF NOT EXISTS idx_volume_partie ON Volume(partie_pk);
+            CREATE INDEX IF NOT EXISTS idx_geom_partie ON Geometrie(partie_pk);
+            CREATE INDEX IF NOT EXISTS idx_freq_service ON Frequence(service_pk);
+            CREATE INDEX IF NOT EXISTS idx_rwy_ad ON Rwy(ad_pk);
+            ANALYZE;
         """)
-        conn.commit()
 
     def _create_materialized_view(self, conn: sqlite3.Connection) -> None:
         """Create the pre-joined view used by AirspaceQueryService."""
@@ -300,6 +257,13 @@ class SpatiaLiteBuilder:
             JOIN Geometrie g ON g.partie_pk = p.pk
             WHERE g.geom IS NOT NULL
         """)
+        # Every airspace query bounds the altitude band: lets the planner
+        # skip volumes out of band before any geometry test
+        conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_airspace_alt
+                ON airspace_spatial_indexed(altitude_floor_ft_amsl, altitude_ceiling_ft_amsl);
+            ANALYZE airspace_spatial_indexed;
+        """)
         conn.commit()
 
     def _create_spatial_index(self, conn: sqlite3.Connection) -> None:
@@ -314,18 +278,179 @@ class SpatiaLiteBuilder:
 
 
 def _float(val) -> float | None:
-    if val is None or val == "":
-        return None
+    # try/except is free on the happy path (3.11+); only bad input pays
     try:
-        return float(val)
+        return None if val is None or val == "" else float(val)
     except (ValueError, TypeError):
         return None
 
 
 def _int(val) -> int | None:
-    if val is None or val == "":
-        return None
     try:
-        return int(val)
+        return None if val is None or val == "" else int(val)
     except (ValueError, TypeError):
         return None
+
+
+def _floats(row: dict, fields: tuple[str, ...]) -> tuple[float | None, ...]:
+    """Coerce several numeric columns of a row in one C-level map pass."""
+    return tuple(map(_float, map(row.get, fields)))
+
+
+def _bulk_insert(cur: sqlite3.Cursor, sql: str, rows: list[tuple]) -> int:
+    """executemany a buffer and empty it. Returns the number of rows."""
+    n = len(rows)
+    if n:
+        cur.executemany(sql, rows)
+        rows.clear()
+    return n
+
+
+class _PkAllocator:
+    """Hands out primary keys for a parent table, keyed by SIA source key.
+
+    A child may reference its parent before the parent row is streamed in;
+    both then agree on the pk allocated at first sight. A duplicate parent
+    key gets a fresh pk and later children point to it (last one wins).
+    """
+
+    def __init__(self) -> None:
+        self._pks: dict[str, int] = {}
+        self._claimed: set[int] = set()
+        self._next = count(1)
+
+    def claim(self, key: str) -> int:
+        pk = self._pks.get(key)
+        if pk is None or pk in self._claimed:
+            pk = self._pks[key] = next(self._next)
+        self._claimed.add(pk)
+        return pk
+
+    def ref(self, key: str) -> int:
+        pk = self._pks.get(key)
+        if pk is None:
+            pk = self._pks[key] = next(self._next)
+        return pk
+
+
+_INSERT_SQL: dict[str, str] = {
+    "Espace": "INSERT INTO Espace (pk, EspaceId, Nom, TypeEspace, Classe) VALUES (?,?,?,?,?)",
+    "Partie": "INSERT INTO Partie (pk, espace_pk, PartieId, Nom) VALUES (?,?,?,?)",
+    "Volume": """INSERT INTO Volume
+        (partie_pk, VolumeId, Plancher, PlancherRef, PlancherVal,
+         Plafond, PlafondRef, PlafondVal, HorCode)
+        VALUES (?,?,?,?,?,?,?,?,?)""",
+    "Geometrie": """INSERT INTO Geometrie (partie_pk, WKT, geom)
+        VALUES (?,?,COALESCE(GeomFromWKB(?, 4326), GeomFromText(?, 4326)))""",
+    "Service": """INSERT INTO Service
+        (pk, IndicLieu, Indicatif, TypeService, Langue, HorCode, HorTxt)
+        VALUES (?,?,?,?,?,?,?)""",
+    "Frequence": """INSERT INTO Frequence
+        (service_pk, IndicLieu, Frequence, Espacement, HorCode, HorTxt, Secteur, Remarques)
+        VALUES (?,?,?,?,?,?,?,?)""",
+    "Ad": """INSERT INTO Ad
+        (pk, AdCode, AdNomComplet, AdStatut, ArpLat, ArpLon, AdRefAltFt,
+         DecMag, TempRef, HorCode, Carburant, CarburantRem,
+         MetCentre, MetBriefing, CatSSLIA, Gestionnaire, Telephone, Remarques)
+        VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+    "Rwy": """INSERT INTO Rwy
+        (ad_pk, AdCode, Identifiant, Longueur, Largeur, Principal,
+         Revetement, PCN, OrientationGeo,
+         LatSeuil1, LonSeuil1, AltFtSeuil1, LDA1,
+         LatSeuil2, LonSeuil2, AltFtSeuil2, LDA2)
+        VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+}
+
+# (child table, FK column, parent table)
+_FOREIGN_KEYS = (
+    ("Partie", "espace_pk", "Espace"),
+    ("Volume", "partie_pk", "Partie"),
+    ("Geometrie", "partie_pk", "Partie"),
+    ("Frequence", "service_pk", "Service"),
+    ("Rwy", "ad_pk", "Ad"),
+)
+
+
+# Numeric columns coerced with _floats, in INSERT column order
+_AD_FLOATS = ("ArpLat", "ArpLon", "AdRefAltFt", "DecMag", "TempRef")
+_RWY_THRESHOLD_FLOATS = (
+    "OrientationGeo",
+    "LatSeuil1", "LonSeuil1", "AltFtSeuil1", "LDA1",
+    "LatSeuil2", "LonSeuil2", "AltFtSeuil2", "LDA2",
+)
+
+
+def _espace_params(e: dict, keys: dict[str, _PkAllocator]) -> tuple:
+    key = e.get("pk", e.get("EspaceId", ""))
+    return (keys["Espace"].claim(key), key,
+            e.get("Nom", ""), e.get("TypeEspace", ""), e.get("Classe", ""))
+
+
+def _partie_params(p: dict, keys: dict[str, _PkAllocator]) -> tuple:
+    key = p.get("pk", p.get("PartieId", ""))
+    return (keys["Partie"].claim(key),
+            keys["Espace"].ref(p.get("espace_pk", p.get("EspaceId", ""))),
+            key, p.get("Nom", ""))
+
+
+def _volume_params(v: dict, keys: dict[str, _PkAllocator]) -> tuple:
+    return (keys["Partie"].ref(v.get("partie_pk", v.get("PartieId", ""))),
+            v.get("pk", v.get("VolumeId", "")),
+            v.get("Plancher", ""), v.get("PlancherRef", ""), v.get("PlancherVal", ""),
+            v.get("Plafond", ""), v.get("PlafondRef", ""), v.get("PlafondVal", ""),
+            v.get("HorCode", ""))
+
+
+def _geometrie_params(g: dict, keys: dict[str, _PkAllocator]) -> tuple:
+    # Prefer pre-encoded WKB (binary, no lexer); fall back to parsing WKT
+    wkt = g.get("WKT", g.get("wkt", ""))
+    wkb = g.get("WKB")
+    return (keys["Partie"].ref(g.get("partie_pk", g.get("PartieId", ""))),
+            wkt,
+            sqlite3.Binary(wkb) if wkb else None,
+            None if wkb else wkt or None)
+
+
+def _service_params(s: dict, keys: dict[str, _PkAllocator]) -> tuple:
+    return (keys["Service"].claim(s.get("pk", s.get("IndicLieu", ""))),
+            s.get("IndicLieu", ""), s.get("Indicatif", ""),
+            s.get("TypeService", ""), s.get("Langue", ""),
+            s.get("HorCode", ""), s.get("HorTxt", ""))
+
+
+def _frequence_params(f: dict, keys: dict[str, _PkAllocator]) -> tuple:
+    return (keys["Service"].ref(f.get("service_pk", f.get("IndicLieu", ""))),
+            f.get("IndicLieu", ""), f.get("Frequence", ""),
+            f.get("Espacement", ""), f.get("HorCode", ""),
+            f.get("HorTxt", ""), f.get("Secteur", ""), f.get("Remarques", ""))
+
+
+def _ad_params(ad: dict, keys: dict[str, _PkAllocator]) -> tuple:
+    return (keys["Ad"].claim(ad.get("AdCode", "")),
+            ad.get("AdCode", ""), ad.get("AdNomComplet", ""), ad.get("AdStatut", ""),
+            *_floats(ad, _AD_FLOATS), ad.get("HorCode", ""),
+            ad.get("Carburant", ""), ad.get("CarburantRem", ""),
+            ad.get("MetCentre", ""), ad.get("MetBriefing", ""),
+            ad.get("CatSSLIA", ""), ad.get("Gestionnaire", ""),
+            ad.get("Telephone", ""), ad.get("Remarques", ""))
+
+
+def _rwy_params(rwy: dict, keys: dict[str, _PkAllocator]) -> tuple:
+    return (keys["Ad"].ref(rwy.get("AdCode", "")),
+            rwy.get("AdCode", ""), rwy.get("Identifiant", ""),
+            _float(rwy.get("Longueur")), _float(rwy.get("Largeur")),
+            _int(rwy.get("Principal")),
+            rwy.get("Revetement", ""), rwy.get("PCN", ""),
+            *_floats(rwy, _RWY_THRESHOLD_FLOATS))
+
+
+_ROW_PARAMS = {
+    "Espace": _espace_params,
+    "Partie": _partie_params,
+    "Volume": _volume_params,
+    "Geometrie": _geometrie_params,
+    "Service": _service_params,
+    "Frequence": _frequence_params,
+    "Ad": _ad_params,
+    "Rwy": _rwy_params,
+}
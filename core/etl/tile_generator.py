@@ -2,10 +2,16 @@
 
 from __future__ import annotations
 
+import gzip
 import json
 import logging
 import math
+import os
 import sqlite3
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -17,6 +23,107 @@ ZOOM_CONFIG: list[tuple[tuple[int, int], list[str] | None, float]] = [
     ((9, 12), None, 0.0001),  # None = all types
 ]
 
+# Rows pulled from SQLite per fetchmany while streaming a tile
+_FETCH_SIZE = 256
+
+def _json_scalar(value: object) -> str:
+    """Serialize one SQLite column value (str / int / float / NULL) as JSON."""
+    if value is None:
+        return "null"
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return "null"
+    return repr(value)
+
+
+# Property keys are fixed: format the six column values straight into the
+# feature text instead of building and dumping a dict per row.
+_FEATURE_TEMPLATE = (
+    '{{"type":"Feature","properties":{{"id":{},"name":{},"type":{},"class":{},'
+    '"floor_ft":{},"ceiling_ft":{}}},"geometry":{}}}'
+)
+
+
+_READ_PRAGMAS = """
+    PRAGMA mmap_size = 1073741824;
+    PRAGMA cache_size = -262144;
+    PRAGMA query_only = 1;
+    PRAGMA temp_store = MEMORY;
+"""
+
+# R-tree created by SpatiaLiteBuilder._create_spatial_index
+_RTREE_TABLE = "idx_airspace_spatial_indexed_geom_spatial"
+
+# The type filter is bound as a JSON array so the SQL text never depends
+# on which types are listed; unfiltered zooms leave the clause out entirely.
+_TYPE_FILTER = " AND espace_type IN (SELECT value FROM json_each(:types))"
+
+_TILE_SELECT = """
+    SELECT
+        espace_pk, espace_nom, espace_type, Classe,
+        altitude_floor_ft_amsl, altitude_ceiling_ft_amsl,
+        AsGeoJSON(SimplifyPreserveTopology(geom_spatial, :tolerance)) AS geojson
+    FROM airspace_spatial_indexed
+    WHERE geom_spatial IS NOT NULL
+      AND MbrIntersects(
+          geom_spatial,
+          BuildMbr(:lon_min, :lat_min, :lon_max, :lat_max, 4326)
+      )
+"""
+
+# R-tree prefilter, used when the spatial index exists
+_RTREE_FILTER = f"""
+      AND ROWID IN (
+          SELECT pkid FROM {_RTREE_TABLE}
+          WHERE xmin <= :lon_max AND xmax >= :lon_min
+            AND ymin <= :lat_max AND ymax >= :lat_min
+      )
+"""
+
+# (use_rtree, filtered) -> tile query, assembled once at import
+_TILE_SQL: dict[tuple[bool, bool], str] = {
+    (use_rtree, filtered): (
+        _TILE_SELECT + (_RTREE_FILTER if use_rtree else "") + (_TYPE_FILTER if filtered else "")
+    )
+    for use_rtree in (False, True)
+    for filtered in (False, True)
+}
+
+
+# Feature MBRs overlapping a lon band (one work unit's x-stripe), the
+# R-tree variant reading no geometry outside the band
+_OCCUPIED_SELECT = """
+    SELECT MbrMinX(geom_spatial), MbrMinY(geom_spatial),
+           MbrMaxX(geom_spatial), MbrMaxY(geom_spatial)
+    FROM airspace_spatial_indexed
+    WHERE geom_spatial IS NOT NULL
+"""
+_OCCUPIED_LON_FILTER = """
+      AND MbrMaxX(geom_spatial) >= :lon_min AND MbrMinX(geom_spatial) <= :lon_max
+"""
+_OCCUPIED_RTREE_FILTER = f"""
+      AND ROWID IN (
+          SELECT pkid FROM {_RTREE_TABLE}
+          WHERE xmin <= :lon_max AND xmax >= :lon_min
+      )
+"""
+
+# (use_rtree, filtered) -> occupied-tiles query
+_OCCUPIED_SQL: dict[tuple[bool, bool], str] = {
+    (use_rtree, filtered): (
+        _OCCUPIED_SELECT
+        + (_OCCUPIED_RTREE_FILTER if use_rtree else _OCCUPIED_LON_FILTER)
+        + (_TYPE_FILTER if filtered else "")
+    )
+    for use_rtree in (False, True)
+    for filtered in (False, True)
+}
+
+
+def _types_param(type_filter: list[str] | None) -> str | None:
+    return json.dumps(type_filter) if type_filter else None
+
 
 class TileGenerator:
     """Generates GeoJSON tiles from a SpatiaLite database."""
@@ -25,108 +132,176 @@ class TileGenerator:
         self._db_path = db_path
         self._output_dir = output_dir
 
-    def generate_all(self) -> int:
-        """Generate all tiles across all zoom levels. Returns total tile count."""
+    def generate_all(self, workers: int | None = None) -> int:
+        """Generate all tiles across all zoom levels. Returns total tile count.
+
+        Work is split into (zoom, x-stripe) units spread over a process
+        pool of ``workers`` processes (default: one per CPU); each process
+        keeps its own read-only connection. ``workers=1`` runs in-process.
+        """
+        workers = workers or os.cpu_count() or 1
+        units = list(self._work_units(workers))
+
         total = 0
-        for (z_min, z_max), type_filter, tolerance in ZOOM_CONFIG:
-            for z in range(z_min, z_max + 1):
-                total += self._generate_zoom_level(z, type_filter, tolerance)
+        if workers == 1:
+            conn = self._connect()
+            try:
+                for z, x_range, type_filter, tolerance in units:
+                    total += self._generate_zoom_level(conn, z, type_filter, tolerance, x_range)
+            finally:
+                conn.close()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self._db_path, self._output_dir),
+            ) as pool:
+                total = sum(pool.map(_generate_unit, units))
+
         self._write_tileset_json()
         logger.info("Generated %d total tiles in %s", total, self._output_dir)
         return total
 
+    def _work_units(
+        self, workers: int,
+    ) -> Iterator[tuple[int, range, list[str] | None, float]]:
+        """Yield (z, x_range, type_filter, tolerance), a few stripes per worker."""
+        for (z_min, z_max), type_filter, tolerance in ZOOM_CONFIG:
+            for z in range(z_min, z_max + 1):
+                n_tiles = 2 ** z
+                stripes = min(n_tiles, workers * 4)
+                step = -(-n_tiles // stripes)
+                for x_start in range(0, n_tiles, step):
+                    x_range = range(x_start, min(x_start + step, n_tiles))
+                    yield z, x_range, type_filter, tolerance
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a read-only connection, reused for every unit of its process.
+
+        One connection means one SpatiaLite load and a page cache that
+        stays warm from zoom to zoom. ``immutable=1`` lets SQLite skip
+        locking entirely since nothing writes the DB during generation.
+        """
+        conn = sqlite3.connect(f"file:{self._db_path}?mode=ro&immutable=1", uri=True)
+        conn.executescript(_READ_PRAGMAS)
+        try:
+            from core.persistence.spatialite.spatialite_loader import enable_spatialite
+            enable_spatialite(conn)
+        except Exception:
+            logger.warning("SpatiaLite not available — tiles will have unsimplified geometries")
+        return conn
+
     def _generate_zoom_level(
         self,
+        conn: sqlite3.Connection,
         z: int,
         type_filter: list[str] | None,
         tolerance: float,
+        x_range: range | None = None,
     ) -> int:
-        """Generate all tiles at a zoom level. Returns tile count."""
-        conn = sqlite3.connect(str(self._db_path))
-        conn.enable_load_extension(True)
-        try:
-            from core.persistence.spatialite.db_manager import _load_spatialite
-            _load_spatialite(conn)
-        except Exception:
-            logger.warning("SpatiaLite not available — tiles will have unsimplified geometries")
-
+        """Generate the tiles of a zoom level (optionally one x-stripe). Returns tile count."""
         count = 0
-        n_tiles = 2 ** z
-        for x in range(n_tiles):
-            for y in range(n_tiles):
-                bbox = tile_bbox(z, x, y)
-                features = self._query_tile(conn, bbox, type_filter, tolerance)
-                if features:
-                    self._write_tile(z, x, y, features)
+        lons, lats = tile_edges(z)
+        types = _types_param(type_filter)
+        use_rtree = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (_RTREE_TABLE,)
+        ).fetchone() is not None
+        # Same SQL text for every tile of the zoom: one cursor, one prepared plan
+        sql = _TILE_SQL[use_rtree, types is not None]
+        cur = conn.cursor()
+        cur.arraysize = _FETCH_SIZE
+        try:
+            occupied = self._occupied_tiles(conn, z, types, x_range, use_rtree)
+            for x, y in sorted(occupied):
+                bbox = (lons[x], lats[y + 1], lons[x + 1], lats[y])
+                features = self._query_tile(cur, sql, bbox, types, tolerance)
+                first = next(features, None)
+                if first is not None:
+                    self._write_tile(z, x, y, chain((first,), features))
                     count += 1
+        finally:
+            cur.close()
 
-        conn.close()
         return count
 
-    def _query_tile(
+    def _occupied_tiles(
         self,
         conn: sqlite3.Connection,
+        z: int,
+        types: str | None,
+        x_range: range | None = None,
+        use_rtree: bool = False,
+    ) -> set[tuple[int, int]]:
+        """Tiles touched by at least one feature MBR — the only ones worth querying.
+
+        Only features overlapping the lon band of ``x_range`` are read, so
+        each stripe scans its own slice of the layer rather than all of it.
+        """
+        n = 2 ** z
+        if x_range is None:
+            x_range = range(n)
+        params = {
+            "lon_min": x_range.start / n * 360.0 - 180.0,
+            "lon_max": x_range.stop / n * 360.0 - 180.0,
+            "types": types,
+        }
+        tiles: set[tuple[int, int]] = set()
+        sql = _OCCUPIED_SQL[use_rtree, types is not None]
+        for lon_min, lat_min, lon_max, lat_max in conn.execute(sql, params):
+            x_lo, x_hi, y_lo, y_hi = tile_range(z, lon_min, lat_min, lon_max, lat_max)
+            x_lo, x_hi = max(x_lo, x_range.start), min(x_hi, x_range.stop - 1)
+            tiles.update(
+                (x, y) for x in range(x_lo, x_hi + 1) for y in range(y_lo, y_hi + 1)
+            )
+        return tiles
+
+    def _query_tile(
+        self,
+        cur: sqlite3.Cursor,
+        sql: str,
         bbox: tuple[float, float, float, float],
-        type_filter: list[str] | None,
+        types: str | None,
         tolerance: float,
-    ) -> list[dict]:
-        """Query airspaces intersecting a tile bbox."""
+    ) -> Iterator[str]:
+        """Yield airspaces intersecting a tile bbox, as serialized GeoJSON features."""
         lon_min, lat_min, lon_max, lat_max = bbox
+        cur.execute(sql, {
+            "tolerance": tolerance,
+            "lon_min": lon_min,
+            "lat_min": lat_min,
+            "lon_max": lon_max,
+            "lat_max": lat_max,
+            "types": types,
+        })
 
-        sql = """
-            SELECT
-                espace_pk, espace_nom, espace_type, Classe,
-                altitude_floor_ft_amsl, altitude_ceiling_ft_amsl,
-                AsGeoJSON(SimplifyPreserveTopology(geom_spatial, ?)) AS geojson
-            FROM airspace_spatial_indexed
-            WHERE geom_spatial IS NOT NULL
-              AND MbrIntersects(
-                  geom_spatial,
-                  BuildMbr(?, ?, ?, ?, 4326)
-              )
-        """
-        params: list = [tolerance, lon_min, lat_min, lon_max, lat_max]
-
-        if type_filter:
-            placeholders = ",".join("?" for _ in type_filter)
-            sql += f" AND espace_type IN ({placeholders})"
-            params.extend(type_filter)
-
-        features: list[dict] = []
-        for row in conn.execute(sql, params):
-            geojson_str = row[6]
-            if not geojson_str:
-                continue
-            features.append({
-                "type": "Feature",
-                "properties": {
-                    "id": row[0],
-                    "name": row[1],
-                    "type": row[2],
-                    "class": row[3],
-                    "floor_ft": row[4],
-                    "ceiling_ft": row[5],
-                },
-                "geometry": json.loads(geojson_str),
-            })
-
-        return features
-
-    def _write_tile(self, z: int, x: int, y: int, features: list[dict]) -> None:
+        # AsGeoJSON output is already valid JSON: splice it in verbatim
+        # rather than parsing it only to serialize it again.
+        while rows := cur.fetchmany():
+            for row in rows:
+                geojson_str = row[6]
+                if not geojson_str:
+                    continue
+                yield _FEATURE_TEMPLATE.format(*map(_json_scalar, row[:6]), geojson_str)
+
+    def _write_tile(self, z: int, x: int, y: int, features: Iterable[str]) -> None:
+        """Stream features into the tile file without holding the whole tile."""
         tile_dir = self._output_dir / "airspaces" / str(z) / str(x)
         tile_dir.mkdir(parents=True, exist_ok=True)
-        tile_path = tile_dir / f"{y}.json"
-        geojson = {
-            "type": "FeatureCollection",
-            "features": features,
-        }
-        tile_path.write_text(json.dumps(geojson), encoding="utf-8")
+        # Compressed once here instead of on every HTTP request
+        with gzip.open(tile_dir / f"{y}.json.gz", "wb", compresslevel=6) as fh:
+            fh.write(b'{"type":"FeatureCollection","features":[')
+            for i, feature in enumerate(features):
+                if i:
+                    fh.write(b",")
+                fh.write(feature.encode("utf-8"))
+            fh.write(b"]}")
 
     def _write_tileset_json(self) -> None:
         """Write a tileset metadata file."""
         meta = {
             "format": "geojson",
-            "tile_url": "airspaces/{z}/{x}/{y}.json",
+            "tile_url": "airspaces/{z}/{x}/{y}.json.gz",
+            "content_encoding": "gzip",
             "zoom_levels": {
                 "0-5": {"types": ["FIR", "TMA"], "tolerance": 0.01},
                 "6-8": {"types": ["TMA", "CTR", "SIV", "D", "R", "P"], "tolerance": 0.001},
@@ -137,6 +312,25 @@ class TileGenerator:
         meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
 
 
+# Per-process state for the tile worker pool
+_worker_generator: TileGenerator | None = None
+_worker_conn: sqlite3.Connection | None = None
+
+
+def _init_worker(db_path: Path, output_dir: Path) -> None:
+    global _worker_generator, _worker_conn
+    _worker_generator = TileGenerator(db_path, output_dir)
+    _worker_conn = _worker_generator._connect()
+
+
+def _generate_unit(unit: tuple[int, range, list[str] | None, float]) -> int:
+    assert _worker_generator is not None and _worker_conn is not None, "_init_worker not run"
+    z, x_range, type_filter, tolerance = unit
+    return _worker_generator._generate_zoom_level(
+        _worker_conn, z, type_filter, tolerance, x_range,
+    )
+
+
 def tile_bbox(z: int, x: int, y: int) -> tuple[float, float, float, float]:
     """Convert tile coordinates to (lon_min, lat_min, lon_max, lat_max).
 
@@ -148,3 +342,60 @@ def tile_bbox(z: int, x: int, y: int) -> tuple[float, float, float, float]:
     lat_max = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
     lat_min = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
     return (lon_min, lat_min, lon_max, lat_max)
+
+
+# Web Mercator latitude limit — the poles are unreachable
+_MAX_LAT = math.degrees(math.atan(math.sinh(math.pi)))
+
+
+def tile_range(
+    z: int, lon_min: float, lat_min: float, lon_max: float, lat_max: float,
+) -> tuple[int, int, int, int]:
+    """Inclusive (x_lo, x_hi, y_lo, y_hi) of the tiles a bbox touches at zoom ``z``.
+
+    Inverse of ``tile_bbox``; a bbox edge lying exactly on a tile edge also
+    counts the neighbouring tile, matching ``MbrIntersects`` semantics.
+    """
+    n: int = 2 ** z
+
+    def fx(lon: float) -> float:
+        return (lon + 180.0) / 360.0 * n
+
+    def fy(lat: float) -> float:
+        lat_rad = math.radians(max(-_MAX_LAT, min(_MAX_LAT, lat)))
+        return (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
+
+    def clamp(i: int) -> int:
+        return max(0, min(n - 1, i))
+
+    return (
+        clamp(math.ceil(fx(lon_min)) - 1),
+        clamp(math.floor(fx(lon_max))),
+        clamp(math.ceil(fy(lat_max)) - 1),
+        clamp(math.floor(fy(lat_min))),
+    )
+
+
+def tile_edges(z: int) -> tuple[list[float], list[float]]:
+    """Tile edge coordinates at zoom ``z``: (lons by x, lats by y).
+
+    Tile (x, y) spans ``lons[x]..lons[x + 1]`` and ``lats[y + 1]..lats[y]``.
+    Computing the 2^z + 1 edges once per zoom avoids re-running the
+    Mercator trig for every tile; ``tile_bbox`` stays for single tiles.
+    Vectorised with numpy when the optional dependency is installed.
+    """
+    n = 2.0 ** z
+    count = 2 ** z + 1
+    try:
+        import numpy as np
+    except ImportError:
+        lons = [i / n * 360.0 - 180.0 for i in range(count)]
+        lats = [
+            math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * j / n)))) for j in range(count)
+        ]
+        return lons, lats
+
+    i = np.arange(count, dtype=np.float64)
+    lon_edges = i / n * 360.0 - 180.0
+    lat_edges = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * i / n))))
+    return lon_edges.tolist(), lat_edges.tolist()
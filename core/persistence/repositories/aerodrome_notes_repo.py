@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
+
 from core.contracts.aerodrome_notes import AerodromeNotes
+from core.persistence.firestore_client import get_firestore_client
 from core.persistence.repositories.base import BaseRepository
 
 
@@ -33,10 +36,27 @@ class AerodromeNotesRepository(BaseRepository[AerodromeNotes]):
     async def get_multiple(
         self, user_id: str, icao_codes: list[str]
     ) -> dict[str, AerodromeNotes]:
-        """Fetch notes for multiple aerodromes. Returns a dict keyed by ICAO."""
-        result: dict[str, AerodromeNotes] = {}
-        for icao in icao_codes:
-            notes = await self.get_by_icao(user_id, icao)
-            if notes:
-                result[icao.upper()] = notes
-        return result
+        """Fetch notes for multiple aerodromes. Returns a dict keyed by ICAO.
+
+        One batched ``get_all`` round trip; concurrent single gets if the
+        client lacks it.
+        """
+        codes = list(dict.fromkeys(icao.upper() for icao in icao_codes))
+        if not codes:
+            return {}
+
+        db = get_firestore_client()
+        if not hasattr(db, "get_all"):
+            found = await asyncio.gather(*(self.get(user_id, c) for c in codes))
+            return {c: notes for c, notes in zip(codes, found) if notes}
+
+        col = self._collection_ref(user_id)
+        ids: list[str] = []
+        docs: list[dict] = []
+        async for doc in db.get_all([col.document(c) for c in codes]):
+            if doc.exists:
+                data = doc.to_dict()
+                data["id"] = doc.id
+                ids.append(doc.id)
+                docs.append(data)
+        return dict(zip(ids, AerodromeNotes.from_firestore_many(docs)))
@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
-from typing import Generic, TypeVar, Type
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any, Generic, TypeVar, Type
 
 from core.contracts.common import FirestoreModel
 from core.persistence.firestore_client import get_firestore_client
 
 T = TypeVar("T", bound=FirestoreModel)
 
+# Documents per page for paginated queries
+_PAGE_SIZE = 300
+
+# Result sets up to this size are validated inline: a worker thread costs
+# more than it saves on the event loop
+_INLINE_DECODE_MAX = 32
+
 
 class BaseRepository(Generic[T]):
     """CRUD for a Firestore subcollection under ``/users/{user_id}/``.
@@ -20,18 +29,40 @@ class BaseRepository(Generic[T]):
     def __init__(self, model_class: Type[T], collection_name: str):
         self._model_class = model_class
         self._collection_name = collection_name
+        # (user_id, collection) → reference, valid for one client instance
+        self._ref_client: Any = None
+        self._ref_cache: dict[tuple[str, str], Any] = {}
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
     def _collection_ref(self, user_id: str):
+        return self._user_collection(user_id, self._collection_name)
+
+    def _user_collection(self, user_id: str, name: str):
+        """Cached reference to ``/users/{user_id}/{name}``."""
         db = get_firestore_client()
-        return (
-            db.collection("users")
-            .document(user_id)
-            .collection(self._collection_name)
-        )
+        if db is not self._ref_client:
+            # New client (first call, or reset in tests): drop stale refs
+            self._ref_client = db
+            self._ref_cache.clear()
+        key = (user_id, name)
+        ref = self._ref_cache.get(key)
+        if ref is None:
+            ref = self._ref_cache[key] = (
+                db.collection("users")
+                .document(user_id)
+                .collection(name)
+            )
+        return ref
+
+    async def _decode(self, docs: list[dict], model_class: Type[Any] | None = None) -> list:
+        """Validate document dicts, off the event loop for larger result sets."""
+        model_class = model_class or self._model_class
+        if len(docs) <= _INLINE_DECODE_MAX:
+            return model_class.from_firestore_many(docs)
+        return await asyncio.to_thread(model_class.from_firestore_many, docs)
 
     # ------------------------------------------------------------------
     # Read
@@ -48,12 +79,53 @@ class BaseRepository(Generic[T]):
 
     async def list_all(self, user_id: str) -> list[T]:
         """Stream every document in the collection."""
-        results: list[T] = []
+        docs: list[dict] = []
         async for doc in self._collection_ref(user_id).stream():
             data = doc.to_dict()
             data["id"] = doc.id
-            results.append(self._model_class.from_firestore(data))
-        return results
+            docs.append(data)
+        return await self._decode(docs)
+
+    async def _list_paged(self, query, page_size: int | None = None) -> list[T]:
+        """Run *query* page by page, fetching the next page while one is decoded.
+
+        Model validation of full pages runs in a worker thread so it overlaps
+        the next page's network round trip instead of blocking the event loop.
+        """
+        return [entity async for entity in self._iter_paged(query, page_size)]
+
+    async def _iter_paged(self, query, page_size: int | None = None) -> AsyncIterator[T]:
+        """Streaming form of ``_list_paged``: only one decoded page is held at a time."""
+        async for docs in self._pages(query, page_size):
+            for entity in await self._decode(docs):
+                yield entity
+
+    async def _pages(self, query, page_size: int | None = None) -> AsyncIterator[list[dict]]:
+        """Yield the document dicts of *query* one page at a time.
+
+        Pages are ordered by document ID and chained with ``start_after``;
+        the next page is already in flight while the caller handles one.
+        """
+        page_size = page_size or _PAGE_SIZE
+        query = query.order_by("__name__")
+        pending = asyncio.ensure_future(query.limit(page_size).get())
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                if len(page) == page_size:
+                    pending = asyncio.ensure_future(
+                        query.start_after(page[-1]).limit(page_size).get()
+                    )
+                docs: list[dict] = []
+                for doc in page:
+                    data = doc.to_dict()
+                    data["id"] = doc.id
+                    docs.append(data)
+                yield docs
+        finally:
+            if pending is not None:
+                pending.cancel()
 
     # ------------------------------------------------------------------
     # Write
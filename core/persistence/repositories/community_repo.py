@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Any
 
 from core.persistence.firestore_client import get_firestore_client
 
@@ -10,21 +11,48 @@ from core.persistence.firestore_client import get_firestore_client
 class CommunityRepository:
     """CRUD for ``/community/`` collections — not scoped by user_id."""
 
+    def __init__(self):
+        # name → /community/{name}/entries reference, valid for one client
+        self._ref_client: Any = None
+        self._ref_cache: dict[str, Any] = {}
+
+    def _entries(self, db, name: str):
+        if db is not self._ref_client:
+            self._ref_client = db
+            self._ref_cache.clear()
+        ref = self._ref_cache.get(name)
+        if ref is None:
+            ref = self._ref_cache[name] = (
+                db.collection("community").document(name).collection("entries")
+            )
+        return ref
+
+    async def _get_bulk(self, name: str, icaos: list[str]) -> dict[str, dict]:
+        """Fetch several entries in one ``get_all`` round trip, keyed by ICAO."""
+        codes = list(dict.fromkeys(icao.upper() for icao in icaos))
+        if not codes:
+            return {}
+        db = get_firestore_client()
+        entries = self._entries(db, name)
+        return {
+            doc.id: doc.to_dict()
+            async for doc in db.get_all([entries.document(c) for c in codes])
+            if doc.exists
+        }
+
     # ------------------------------------------------------------------
     # VAC notes
     # ------------------------------------------------------------------
 
     async def get_vac_notes(self, icao: str) -> dict | None:
         db = get_firestore_client()
-        doc = await (
-            db.collection("community")
-            .document("vac_notes")
-            .collection("entries")
-            .document(icao.upper())
-            .get()
-        )
+        doc = await self._entries(db, "vac_notes").document(icao.upper()).get()
         return doc.to_dict() if doc.exists else None
 
+    async def get_vac_notes_bulk(self, icaos: list[str]) -> dict[str, dict]:
+        """VAC notes for several aerodromes; ICAOs without notes are omitted."""
+        return await self._get_bulk("vac_notes", icaos)
+
     async def set_vac_notes(
         self, icao: str, data: dict, user_id: str
     ) -> None:
@@ -32,13 +60,7 @@ class CommunityRepository:
         db = get_firestore_client()
         data["updated_by"] = user_id
         data["updated_at"] = datetime.now(timezone.utc).isoformat()
-        await (
-            db.collection("community")
-            .document("vac_notes")
-            .collection("entries")
-            .document(icao.upper())
-            .set(data, merge=True)
-        )
+        await self._entries(db, "vac_notes").document(icao.upper()).set(data, merge=True)
 
     # ------------------------------------------------------------------
     # TDP database
@@ -46,11 +68,9 @@ class CommunityRepository:
 
     async def get_tdp(self, icao: str) -> dict | None:
         db = get_firestore_client()
-        doc = await (
-            db.collection("community")
-            .document("tdp_database")
-            .collection("entries")
-            .document(icao.upper())
-            .get()
-        )
+        doc = await self._entries(db, "tdp_database").document(icao.upper()).get()
         return doc.to_dict() if doc.exists else None
+
+    async def get_tdp_bulk(self, icaos: list[str]) -> dict[str, dict]:
+        """TDP entries for several aerodromes; unknown ICAOs are omitted."""
+        return await self._get_bulk("tdp_database", icaos)
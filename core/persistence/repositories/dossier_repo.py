@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from typing import Any
+
 from core.contracts.enums import DossierStatus, SectionCompletion, SectionId
 from core.contracts.dossier import Dossier
 from core.contracts.weather import WeatherSimulation
-from core.persistence.firestore_client import get_firestore_client
 from core.persistence.repositories.base import BaseRepository
 
 
@@ -14,18 +16,85 @@ class DossierRepository(BaseRepository[Dossier]):
         super().__init__(Dossier, "dossiers")
 
     async def list_by_status(
-        self, user_id: str, status: DossierStatus
+        self,
+        user_id: str,
+        status: DossierStatus,
+        *,
+        limit: int | None = None,
+        start_after: str | None = None,
     ) -> list[Dossier]:
-        """Return all dossiers with a given status."""
-        query = self._collection_ref(user_id).where(
-            "status", "==", status.value
+        """Return dossiers with a given status.
+
+        Without *limit* / *start_after*, every match is fetched page by page.
+        With either, a single page is read newest first (``created_at``
+        descending, backed by the ``status, created_at`` composite index),
+        resuming after the dossier ID *start_after*; an unknown cursor ID
+        yields an empty page.
+        """
+        if limit is None and start_after is None:
+            return [d async for d in self.list_by_status_iter(user_id, status)]
+        return await self._decode(
+            await self._status_page(user_id, status, limit, start_after)
         )
-        results: list[Dossier] = []
-        async for doc in query.stream():
+
+    async def list_by_status_fields(
+        self,
+        user_id: str,
+        status: DossierStatus,
+        fields: list[str],
+        *,
+        limit: int | None = None,
+        start_after: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Like ``list_by_status``, reading only *fields* (Firestore projection).
+
+        Returns plain dicts with ``id`` plus the requested fields — partial
+        documents skip ``from_firestore`` validation.
+        """
+        if limit is not None or start_after is not None:
+            return await self._status_page(user_id, status, limit, start_after, fields)
+        results: list[dict[str, Any]] = []
+        async for docs in self._pages(self._status_query(user_id, status).select(fields)):
+            results.extend(docs)
+        return results
+
+    async def _status_page(
+        self,
+        user_id: str,
+        status: DossierStatus,
+        limit: int | None,
+        start_after: str | None,
+        fields: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """One newest-first page of raw documents with a given status."""
+        query = self._status_query(user_id, status).order_by(
+            "created_at", direction="DESCENDING"
+        )
+        if start_after is not None:
+            cursor = await self._collection_ref(user_id).document(start_after).get()
+            if not cursor.exists:
+                return []
+            query = query.start_after(cursor)
+        if limit is not None:
+            query = query.limit(limit)
+        if fields is not None:
+            query = query.select(fields)
+        docs: list[dict[str, Any]] = []
+        for doc in await query.get():
             data = doc.to_dict()
             data["id"] = doc.id
-            results.append(Dossier.from_firestore(data))
-        return results
+            docs.append(data)
+        return docs
+
+    async def list_by_status_iter(
+        self, user_id: str, status: DossierStatus
+    ) -> AsyncIterator[Dossier]:
+        """Yield dossiers with a given status as pages arrive, without collecting them."""
+        async for dossier in self._iter_paged(self._status_query(user_id, status)):
+            yield dossier
+
+    def _status_query(self, user_id: str, status: DossierStatus):
+        return self._collection_ref(user_id).where("status", "==", status.value)
 
     async def update_section(
         self,
@@ -35,13 +104,7 @@ class DossierRepository(BaseRepository[Dossier]):
         completion: SectionCompletion,
     ) -> None:
         """Update the completion status of a single section."""
-        db = get_firestore_client()
-        ref = (
-            db.collection("users")
-            .document(user_id)
-            .collection("dossiers")
-            .document(dossier_id)
-        )
+        ref = self._collection_ref(user_id).document(dossier_id)
         await ref.update({f"sections.{section.value}": completion.value})
 
     # ------------------------------------------------------------------
@@ -83,9 +146,9 @@ class DossierRepository(BaseRepository[Dossier]):
         self, user_id: str, dossier_id: str
     ) -> list[WeatherSimulation]:
         """List all simulations for a dossier."""
-        results: list[WeatherSimulation] = []
+        docs: list[dict] = []
         async for doc in self._sim_collection(user_id, dossier_id).stream():
             data = doc.to_dict()
             data["id"] = doc.id
-            results.append(WeatherSimulation.from_firestore(data))
-        return results
+            docs.append(data)
+        return await self._decode(docs, WeatherSimulation)
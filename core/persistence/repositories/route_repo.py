@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
+from typing import Any
+
 from core.contracts.route import Route
 from core.contracts.waypoint import UserWaypoint
 from core.persistence.firestore_client import get_firestore_client
@@ -24,35 +27,71 @@ class RouteRepository(BaseRepository[Route]):
     ) -> str:
         """Atomically promote ephemeral waypoints and save the route.
 
-        Uses a Firestore batch write (up to 500 operations) to guarantee
-        that a persisted route never references non-persisted waypoints.
+        Uses a Firestore batch write to guarantee that a persisted route
+        never references non-persisted waypoints. Beyond the 500-operation
+        batch limit, waypoints are committed first in concurrent batches
+        and the route last, so it still only appears once they all exist.
+        Commits are retried with backoff on contention errors.
         Returns the route document ID.
         """
         db = get_firestore_client()
-        batch = db.batch()
+        writes: list[tuple[Any, dict]] = []
 
         # Promote waypoints
-        wp_col = (
-            db.collection("users")
-            .document(user_id)
-            .collection("user_waypoints")
-        )
-        for wp in waypoints:
-            data = wp.to_firestore()
+        wp_col = self._user_collection(user_id, "user_waypoints")
+        for data in UserWaypoint.to_firestore_many(waypoints):
             wp_id = data.pop("id")
-            batch.set(wp_col.document(wp_id), data)
+            writes.append((wp_col.document(wp_id), data))
 
         # Save route
         route_data = route.to_firestore()
         route_id = route_data.pop("id", None)
         route_col = self._collection_ref(user_id)
-        if route_id:
-            batch.set(route_col.document(route_id), route_data)
+        route_ref = route_col.document(route_id) if route_id else route_col.document()
+        route_write = (route_ref, route_data)
+
+        if len(writes) < _BATCH_LIMIT:
+            await _commit_with_retry(db, [*writes, route_write])
         else:
-            route_ref = route_col.document()
-            route_id = route_ref.id
-            batch.set(route_ref, route_data)
+            await asyncio.gather(*(
+                _commit_with_retry(db, writes[i:i + _BATCH_LIMIT])
+                for i in range(0, len(writes), _BATCH_LIMIT)
+            ))
+            await _commit_with_retry(db, [route_write])
+        return route_ref.id
+
+
+# Firestore's maximum number of operations in one batch
+_BATCH_LIMIT = 500
 
-        await batch.commit()
-        return route_id
+# Commit attempts for contended writes, with exponential backoff from 50 ms
+_COMMIT_ATTEMPTS = 5
+_COMMIT_BACKOFF_S = 0.05
 
+
+def _retryable_errors() -> tuple[type[Exception], ...]:
+    try:
+        from google.api_core.exceptions import Aborted, Conflict
+    except ImportError:
+        return ()
+    return (Aborted, Conflict)
+
+
+async def _commit_with_retry(db: Any, writes: list[tuple[Any, dict]]) -> None:
+    """Commit ``(ref, data)`` sets as one batch, retrying contention errors.
+
+    The batch is rebuilt on each attempt since a failed batch cannot be
+    committed again.
+    """
+    retryable = _retryable_errors()
+    for attempt in range(_COMMIT_ATTEMPTS):
+        batch = db.batch()
+        for ref, data in writes:
+            batch.set(ref, data)
+        try:
+            await batch.commit()
+            return
+        except retryable:
+            if attempt == _COMMIT_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(_COMMIT_BACKOFF_S * 2 ** attempt)
@@ -2,10 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
+
 from core.contracts.waypoint import UserWaypoint
 from core.persistence.firestore_client import get_firestore_client
 from core.persistence.repositories.base import BaseRepository
 
+# Document refs per get_all call in get_by_ids
+_GET_ALL_CHUNK = 100
+
+
+async def _collect(snapshots) -> list[dict]:
+    """Drain a get_all stream into dicts (with ``id``) for existing documents."""
+    docs: list[dict] = []
+    async for doc in snapshots:
+        if doc.exists:
+            data = doc.to_dict()
+            data["id"] = doc.id
+            docs.append(data)
+    return docs
+
 
 class WaypointRepository(BaseRepository[UserWaypoint]):
     def __init__(self):
@@ -14,19 +30,23 @@ class WaypointRepository(BaseRepository[UserWaypoint]):
     async def get_by_ids(
         self, user_id: str, waypoint_ids: list[str]
     ) -> dict[str, UserWaypoint]:
-        """Batch-fetch waypoints by ID. Returns ``{id: UserWaypoint}``."""
+        """Batch-fetch waypoints by ID. Returns ``{id: UserWaypoint}``.
+
+        IDs are split into chunks of ``_GET_ALL_CHUNK`` fetched concurrently,
+        so a long route costs one round trip rather than one long stream.
+        """
         if not waypoint_ids:
             return {}
-        col = self._collection_ref(user_id)
-        refs = [col.document(wid) for wid in waypoint_ids]
+        document = self._collection_ref(user_id).document
+        refs = [document(wid) for wid in waypoint_ids]
         db = get_firestore_client()
-        result: dict[str, UserWaypoint] = {}
-        async for doc in db.get_all(refs):
-            if doc.exists:
-                data = doc.to_dict()
-                data["id"] = doc.id
-                result[doc.id] = UserWaypoint.from_firestore(data)
-        return result
+        pages = await asyncio.gather(*(
+            _collect(db.get_all(refs[i:i + _GET_ALL_CHUNK]))
+            for i in range(0, len(refs), _GET_ALL_CHUNK)
+        ))
+        docs = [data for page in pages for data in page]
+        ids = [data["id"] for data in docs]
+        return dict(zip(ids, UserWaypoint.from_firestore_many(docs)))
 
     async def find_by_tag(
         self, user_id: str, tag: str
@@ -35,9 +55,9 @@ class WaypointRepository(BaseRepository[UserWaypoint]):
         query = self._collection_ref(user_id).where(
             "tags", "array_contains", tag.lower()
         )
-        results: list[UserWaypoint] = []
+        docs: list[dict] = []
         async for doc in query.stream():
             data = doc.to_dict()
             data["id"] = doc.id
-            results.append(UserWaypoint.from_firestore(data))
-        return results
+            docs.append(data)
+        return UserWaypoint.from_firestore_many(docs)
@@ -2,7 +2,15 @@
 
 from __future__ import annotations
 
+import logging
+import math
 import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from itertools import pairwise
+from operator import itemgetter
+from pathlib import Path
 
 from core.contracts.aerodrome import (
     AerodromeFrequency,
@@ -13,6 +21,244 @@ from core.contracts.aerodrome import (
 from core.contracts.enums import AerodromeStatus
 from core.persistence.spatialite.db_manager import SpatiaLiteManager
 
+logger = logging.getLogger(__name__)
+
+_EARTH_RADIUS_NM = 3440.065
+_METRES_PER_NM = 1852.0
+
+# Appended to the bbox searches: ellipsoidal distance (metres) to the route
+# line, with (route WKT, buffer in metres) bound as extra parameters
+_NEAR_ROUTE_SQL = """
+              AND ST_Distance(MakePoint({lon}, {lat}, 4326), GeomFromText(?, 4326), 1) <= ?
+            """
+
+# Aerodromes + runways + services + frequencies in one round trip. The two
+# one-to-many joins multiply out (runways x service frequencies); rows are
+# folded back by ``_fold_joined_rows``. ORDER BY keeps the table order the
+# separate per-table queries used to return
+_AD_JOINED_SQL_NEW = """
+    SELECT a.icao, a.name, a.status, a.vfr, a.private, a.latitude, a.longitude,
+           a.elevation_ft, a.mag_variation, a.ref_temperature,
+           r.rowid AS rwy_id, r.designator, r.length_m, r.width_m, r.is_main,
+           r.surface, r.lda1_m, r.lda2_m,
+           s.pk AS svc_pk, s.service_type, s.callsign, s.hours_code, s.hours_text,
+           f.Frequence, f.Espacement
+    FROM aerodrome a
+    LEFT JOIN aerodrome_runway r ON r.icao = a.icao
+    LEFT JOIN aerodrome_service s ON s.icao = a.icao
+    LEFT JOIN Frequence f ON f.ServiceRef = s.pk
+    WHERE a.icao IN ({placeholders})
+    ORDER BY r.rowid, s.pk, f.rowid
+    """
+
+_AD_JOINED_SQL_LEGACY = """
+    SELECT a.AdCode, a.AdNomComplet, a.AdNomCarto, a.AdStatut, a.TfcVfr, a.TfcPrive,
+           a.ArpLat, a.ArpLong, a.AdRefAltFt, a.AdMagVar, a.AdRefTemp,
+           r.rowid AS rwy_id, r.Rwy, r.Longueur, r.Largeur, r.Principale,
+           r.Revetement, r.Lda1, r.Lda2,
+           s.pk AS svc_pk, s.Service, s.IndicLieu, s.HorCode, s.HorTxt,
+           f.Frequence, f.Espacement
+    FROM Ad a
+    LEFT JOIN Rwy r ON r.Ad_pk = a.pk
+    LEFT JOIN Service s ON s.Ad_pk = a.pk
+    LEFT JOIN Frequence f ON f.Service_pk = s.pk
+    WHERE a.AdCode IN ({placeholders})
+    ORDER BY r.rowid, s.pk, f.rowid
+    """
+
+_AD_BBOX_SQL_NEW = """
+            SELECT icao, name, latitude, longitude, elevation_ft, status, vfr, private
+            FROM aerodrome
+            """
+
+_AD_BBOX_FILTER_NEW = """
+              AND latitude BETWEEN ? AND ?
+              AND longitude BETWEEN ? AND ?
+              AND latitude IS NOT NULL
+              AND longitude IS NOT NULL
+              -- Skip invalid ICAO codes (e.g., numeric codes like "41"):
+              -- short codes get the LF prefix, full codes are kept as is
+              AND (icao GLOB '[A-Z][A-Z]' OR icao GLOB '[A-Z][A-Z][A-Z][A-Z]')
+            """
+
+_AD_BBOX_SQL_LEGACY = """
+            SELECT AdCode, AdNomComplet, AdNomCarto, ArpLat, ArpLong,
+                   AdRefAltFt, AdStatut, TfcVfr, TfcPrive
+            FROM Ad
+            WHERE ArpLat BETWEEN ? AND ?
+              AND ArpLong BETWEEN ? AND ?
+              AND ArpLat IS NOT NULL
+              AND ArpLong IS NOT NULL
+            """
+
+# R-tree prefilter for the bbox search, used when the reference DB ships an
+# ``aerodrome_rtree(id, min_lat, max_lat, min_lon, max_lon)`` table keyed by
+# aerodrome rowid. R-tree bounds are float32 rounded outwards, so the box is
+# matched by overlap and the exact BETWEEN on the aerodrome columns still
+# applies afterwards
+_AD_RTREE_JOIN = """
+            JOIN aerodrome_rtree r ON r.id = aerodrome.rowid
+            WHERE r.max_lat >= ? AND r.min_lat <= ?
+              AND r.max_lon >= ? AND r.min_lon <= ?
+            """
+
+# Runway / service columns of the joined rows, fetched in one C-level call
+_RUNWAY_FIELDS_NEW = itemgetter(
+    "designator", "length_m", "width_m", "is_main", "surface", "lda1_m", "lda2_m",
+)
+_SERVICE_FIELDS_NEW = itemgetter("service_type", "callsign", "hours_code", "hours_text")
+_RUNWAY_FIELDS_LEGACY = itemgetter(
+    "Rwy", "Longueur", "Largeur", "Principale", "Revetement", "Lda1", "Lda2",
+)
+_SERVICE_FIELDS_LEGACY = itemgetter("Service", "IndicLieu", "HorCode", "HorTxt")
+
+# Upper-cased status codes of both schemas; anything else maps to CAP
+_STATUS_MAP: dict[str, AerodromeStatus] = {
+    "CAP": AerodromeStatus.CAP,
+    "MIL": AerodromeStatus.MILITARY,
+    "MILITARY": AerodromeStatus.MILITARY,
+    "RES": AerodromeStatus.RESTRICTED,
+    "RESTRICTED": AerodromeStatus.RESTRICTED,
+    "RESTREINT": AerodromeStatus.RESTRICTED,
+}
+
+# Stay well below SQLITE_MAX_VARIABLE_NUMBER (999 on older builds)
+_IN_CHUNK = 500
+
+# Full aerodrome records by (DB file version, lookup code). Reference data
+# only changes with the AIRAC cycle, and a new cycle is a new DB file (or a
+# rewritten one, with a new mtime), so stale entries are never hit again and
+# just age out of the LRU.
+_CACHE_SIZE = 2048
+_cache: OrderedDict[tuple[tuple[Path, int] | None, str], AerodromeInfo] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def invalidate_cache() -> None:
+    """Drop every cached aerodrome record."""
+    with _cache_lock:
+        _cache.clear()
+
+
+# Route segment, all angles in radians: (lat_lo, lat_hi, lon_lo, lon_hi) box
+# padded by the buffer, then (lat1, lon1, cos lat1, lat2, lon2, cos lat2) and
+# the segment length in nm
+_Segment = tuple[float, float, float, float, float, float, float, float, float, float, float]
+
+# Safety factor on the bounding-box padding: the box only has to be
+# conservative, never tight
+_BOX_PAD = 1.05
+
+
+def _haversine_nm(
+    la1: float, lo1: float, cos1: float, la2: float, lo2: float, cos2: float,
+) -> float:
+    """Great-circle distance between points given in radians with their cosines."""
+    a = math.sin((la2 - la1) / 2) ** 2 + cos1 * cos2 * math.sin((lo2 - lo1) / 2) ** 2
+    return 2 * math.asin(math.sqrt(a)) * _EARTH_RADIUS_NM
+
+
+def _arc_lat_range(la1: float, lo1: float, la2: float, lo2: float) -> tuple[float, float]:
+    """Latitude span of the short great-circle arc between two points (radians).
+
+    Long arcs bow poleward of their endpoints; the span then reaches the
+    great circle's vertex if that vertex lies on the arc.
+    """
+    lo, hi = min(la1, la2), max(la1, la2)
+    p1 = (math.cos(la1) * math.cos(lo1), math.cos(la1) * math.sin(lo1), math.sin(la1))
+    p2 = (math.cos(la2) * math.cos(lo2), math.cos(la2) * math.sin(lo2), math.sin(la2))
+    n = _cross(p1, p2)
+    nn = n[0] * n[0] + n[1] * n[1] + n[2] * n[2]
+    if nn < 1e-18:
+        return lo, hi
+    # Northernmost point of the full circle: the pole axis projected onto its plane
+    k = n[2] / nn
+    north = (-k * n[0], -k * n[1], 1 - k * n[2])
+    for sign in (1, -1):
+        v = (sign * north[0], sign * north[1], sign * north[2])
+        if _dot(_cross(p1, v), n) > 0 and _dot(_cross(v, p2), n) > 0:
+            lat = math.atan2(v[2], math.hypot(v[0], v[1]))
+            lo, hi = min(lo, lat), max(hi, lat)
+    return lo, hi
+
+
+def _cross(a: tuple[float, ...], b: tuple[float, ...]) -> tuple[float, float, float]:
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def _dot(a: tuple[float, ...], b: tuple[float, ...]) -> float:
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _iter_tuples(conn: sqlite3.Connection, sql: str, params: tuple) -> Iterator[tuple]:
+    """Run *sql* yielding plain tuples, bypassing the connection's ``sqlite3.Row``.
+
+    For wide scans unpacked positionally: name lookups on ``Row`` cost a
+    scan of the column names per access. Rows are streamed from SQLite as
+    they are consumed, never held as a whole list.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        yield from cur.execute(sql, params)
+    finally:
+        cur.close()
+
+
+def _fold_joined_rows(
+    rows: list[sqlite3.Row],
+    runway: Callable[[sqlite3.Row], Runway],
+    service: Callable[[sqlite3.Row], AerodromeService],
+) -> tuple[list[Runway], list[AerodromeService]]:
+    """Split the rows of an ``_AD_JOINED_SQL_*`` query into runways and services.
+
+    Every (service, frequency) pair repeats once per runway, so services and
+    frequencies are only read from the rows of the first runway.
+    """
+    runways: dict[int, Runway] = {}
+    services: dict[int, AerodromeService] = {}
+    first_rwy = rows[0]["rwy_id"]
+    for r in rows:
+        rwy_id = r["rwy_id"]
+        if rwy_id is not None and rwy_id not in runways:
+            runways[rwy_id] = runway(r)
+        s_pk = r["svc_pk"]
+        if rwy_id != first_rwy or s_pk is None:
+            continue
+        svc = services.get(s_pk)
+        if svc is None:
+            svc = services[s_pk] = service(r)
+        frequency = r["Frequence"]
+        if frequency:
+            svc.frequencies.append(
+                AerodromeFrequency(frequency_mhz=frequency, spacing=r["Espacement"])
+            )
+    return list(runways.values()), list(services.values())
+
+
+def _segment_distance_nm(d1: float, d2: float, d12: float) -> float:
+    """Approximate cross-track distance from a point to a segment of length ``d12``.
+
+    ``d1`` / ``d2`` are the distances to the endpoints. Uses the triangle
+    height (Heron) when the point projects onto the segment, else the
+    nearest endpoint.
+    """
+    s = (d1 + d2 + d12) / 2
+    if s <= d1 or s <= d2 or s <= d12:
+        return min(d1, d2)
+    area_sq = s * (s - d1) * (s - d2) * (s - d12)
+    if area_sq <= 0:
+        return min(d1, d2)
+    height = 2 * math.sqrt(area_sq) / d12
+
+    # If along1 + along2 ≈ d12, the point projects onto the segment
+    along1 = math.sqrt(max(0, d1 * d1 - height * height))
+    along2 = math.sqrt(max(0, d2 * d2 - height * height))
+    if along1 <= d12 and along2 <= d12 and abs(along1 + along2 - d12) < d12 * 0.5:
+        return height
+
+    return min(d1, d2)
+
 
 class AerodromeQueryService:
     """Read-only aerodrome lookups backed by SpatiaLite.
@@ -27,18 +273,15 @@ class AerodromeQueryService:
 
     def __init__(self, manager: SpatiaLiteManager):
         self._manager = manager
-        self._use_new_schema: bool | None = None  # Detect on first query
 
     # ------------------------------------------------------------------
     # Schema detection
     # ------------------------------------------------------------------
 
-    def _detect_schema(self, conn: sqlite3.Connection) -> bool:
-        """Check if new aerodrome tables exist. Returns True for new schema."""
-        cursor = conn.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='aerodrome'"
-        )
-        return cursor.fetchone() is not None
+    @property
+    def _use_new_schema(self) -> bool:
+        """True when the new aerodrome tables exist (cached by the manager per DB)."""
+        return self._manager.has_table("aerodrome")
 
     @staticmethod
     def _strip_icao_prefix(icao: str) -> str:
@@ -61,41 +304,66 @@ class AerodromeQueryService:
             return f"LF{short_icao}"
         return short_icao
 
-    @staticmethod
-    def _is_valid_icao(icao: str) -> bool:
-        """Check if ICAO code is valid (4 uppercase letters)."""
-        return len(icao) == 4 and icao.isalpha() and icao.isupper()
-
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def get_by_icao(self, icao: str) -> AerodromeInfo | None:
         """Lookup a single aerodrome by ICAO code (full join)."""
-        conn = self._manager.get_connection()
-        try:
-            # Detect schema on first use
-            if self._use_new_schema is None:
-                self._use_new_schema = self._detect_schema(conn)
+        return next(iter(self.get_by_icaos([icao]).values()), None)
 
-            if self._use_new_schema:
-                return self._get_by_icao_new(conn, icao)
-            else:
-                return self._get_by_icao_legacy(conn, icao)
-        finally:
-            conn.close()
+    def get_by_icaos(self, icaos: list[str]) -> dict[str, AerodromeInfo]:
+        """Lookup many aerodromes at once, keyed by their full ICAO code.
 
-    def _get_by_icao_new(self, conn: sqlite3.Connection, icao: str) -> AerodromeInfo | None:
-        """Query using new aerodrome schema."""
-        short_icao = self._strip_icao_prefix(icao)
-        row = conn.execute(
-            "SELECT * FROM aerodrome WHERE icao = ?", (short_icao,)
-        ).fetchone()
-        if row is None:
-            return None
-
-        runways = self._get_runways_new(conn, short_icao)
-        services = self._get_services_new(conn, short_icao)
+        Runs one joined query per ``_IN_CHUNK`` codes instead of one per
+        aerodrome; unknown codes are simply absent from the result. Found
+        aerodromes are served from the module LRU on later lookups; callers
+        get their own deep copies, never the cached records.
+        """
+        if self._use_new_schema:
+            keys = [self._strip_icao_prefix(icao) for icao in icaos]
+            sql, build = _AD_JOINED_SQL_NEW, self._aerodrome_new
+        else:
+            keys = [icao.upper() for icao in icaos]
+            sql, build = _AD_JOINED_SQL_LEGACY, self._aerodrome_legacy
+
+        db = self._manager.db_version
+        results: dict[str, AerodromeInfo] = {}
+        misses: list[str] = []
+        with _cache_lock:
+            for key in dict.fromkeys(keys):
+                info = _cache.get((db, key))
+                if info is None:
+                    misses.append(key)
+                else:
+                    _cache.move_to_end((db, key))
+                    results[info.icao] = info
+
+        grouped: dict[str, list[sqlite3.Row]] = {}
+        if misses:
+            conn = self._manager.acquire()
+            try:
+                for i in range(0, len(misses), _IN_CHUNK):
+                    chunk = misses[i:i + _IN_CHUNK]
+                    query = sql.format(placeholders=",".join("?" * len(chunk)))
+                    for row in conn.execute(query, chunk):
+                        grouped.setdefault(row[0], []).append(row)
+            finally:
+                self._manager.release(conn)
+
+        fetched = {key: build(rows) for key, rows in grouped.items()}
+        with _cache_lock:
+            for key, info in fetched.items():
+                _cache[(db, key)] = info
+                results[info.icao] = info
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+        return {icao: info.model_copy(deep=True) for icao, info in results.items()}
+
+    def _aerodrome_new(self, rows: list[sqlite3.Row]) -> AerodromeInfo:
+        """Build one aerodrome from its joined rows (new aerodrome schema)."""
+        row = rows[0]
+        runways, services = _fold_joined_rows(rows, self._runway_new, self._service_new)
 
         return AerodromeInfo(
             icao=self._add_icao_prefix(row["icao"]),
@@ -112,17 +380,12 @@ class AerodromeQueryService:
             services=services,
         )
 
-    def _get_by_icao_legacy(self, conn: sqlite3.Connection, icao: str) -> AerodromeInfo | None:
-        """Query using legacy Ad schema."""
-        row = conn.execute(
-            "SELECT * FROM Ad WHERE AdCode = ?", (icao.upper(),)
-        ).fetchone()
-        if row is None:
-            return None
-
-        ad_pk = row["pk"]
-        runways = self._get_runways_legacy(conn, ad_pk)
-        services = self._get_services_legacy(conn, ad_pk)
+    def _aerodrome_legacy(self, rows: list[sqlite3.Row]) -> AerodromeInfo:
+        """Build one aerodrome from its joined rows (legacy Ad schema)."""
+        row = rows[0]
+        runways, services = _fold_joined_rows(
+            rows, self._runway_legacy, self._service_legacy,
+        )
 
         return AerodromeInfo(
             icao=row["AdCode"],
@@ -147,18 +410,14 @@ class AerodromeQueryService:
         lon_max: float,
     ) -> list[AerodromeInfo]:
         """Find aerodromes within a bounding box (lightweight, no joins)."""
-        conn = self._manager.get_connection()
+        conn = self._manager.acquire()
         try:
-            # Detect schema on first use
-            if self._use_new_schema is None:
-                self._use_new_schema = self._detect_schema(conn)
-
             if self._use_new_schema:
                 return self._search_bbox_new(conn, lat_min, lon_min, lat_max, lon_max)
             else:
                 return self._search_bbox_legacy(conn, lat_min, lon_min, lat_max, lon_max)
         finally:
-            conn.close()
+            self._manager.release(conn)
 
     def _search_bbox_new(
         self,
@@ -167,39 +426,38 @@ class AerodromeQueryService:
         lon_min: float,
         lat_max: float,
         lon_max: float,
+        near: tuple[str, float] | None = None,
     ) -> list[AerodromeInfo]:
-        """Search using new aerodrome schema."""
-        rows = conn.execute(
-            """
-            SELECT icao, name, latitude, longitude, elevation_ft, status, vfr, private
-            FROM aerodrome
-            WHERE latitude BETWEEN ? AND ?
-              AND longitude BETWEEN ? AND ?
-              AND latitude IS NOT NULL
-              AND longitude IS NOT NULL
-            """,
-            (lat_min, lat_max, lon_min, lon_max),
-        ).fetchall()
-
-        results = []
-        for r in rows:
-            full_icao = self._add_icao_prefix(r["icao"])
-            # Skip entries with invalid ICAO codes (e.g., numeric codes like "41")
-            if not self._is_valid_icao(full_icao):
-                continue
-            results.append(
-                AerodromeInfo(
-                    icao=full_icao,
-                    name=r["name"] or "",
-                    latitude=r["latitude"],
-                    longitude=r["longitude"],
-                    elevation_ft=int(r["elevation_ft"]) if r["elevation_ft"] else None,
-                    status=self._map_status(r["status"]),
-                    vfr=r["vfr"] == "oui" if r["vfr"] else True,
-                    private=r["private"] == "oui" if r["private"] else False,
-                )
+        """Search using new aerodrome schema.
+
+        *near* is an optional ``(route WKT, buffer in metres)`` distance filter.
+        """
+        params: tuple = (lat_min, lat_max, lon_min, lon_max)
+        sql = _AD_BBOX_SQL_NEW
+        if self._manager.has_table("aerodrome_rtree"):
+            sql += _AD_RTREE_JOIN
+            params += params
+        else:
+            sql += "WHERE 1"
+        sql += _AD_BBOX_FILTER_NEW
+        if near is not None:
+            sql += _NEAR_ROUTE_SQL.format(lon="longitude", lat="latitude")
+            params += near
+        rows = _iter_tuples(conn, sql, params)
+
+        return [
+            AerodromeInfo(
+                icao=self._add_icao_prefix(icao),
+                name=name or "",
+                latitude=lat,
+                longitude=lon,
+                elevation_ft=int(elevation) if elevation else None,
+                status=self._map_status(status),
+                vfr=vfr == "oui" if vfr else True,
+                private=private == "oui" if private else False,
             )
-        return results
+            for icao, name, lat, lon, elevation, status, vfr, private in rows
+        ]
 
     def _search_bbox_legacy(
         self,
@@ -208,161 +466,89 @@ class AerodromeQueryService:
         lon_min: float,
         lat_max: float,
         lon_max: float,
+        near: tuple[str, float] | None = None,
     ) -> list[AerodromeInfo]:
         """Search using legacy Ad schema."""
-        rows = conn.execute(
-            """
-            SELECT AdCode, AdNomComplet, AdNomCarto, ArpLat, ArpLong,
-                   AdRefAltFt, AdStatut, TfcVfr, TfcPrive
-            FROM Ad
-            WHERE ArpLat BETWEEN ? AND ?
-              AND ArpLong BETWEEN ? AND ?
-              AND ArpLat IS NOT NULL
-              AND ArpLong IS NOT NULL
-            """,
-            (lat_min, lat_max, lon_min, lon_max),
-        ).fetchall()
+        sql = _AD_BBOX_SQL_LEGACY
+        params: tuple = (lat_min, lat_max, lon_min, lon_max)
+        if near is not None:
+            sql += _NEAR_ROUTE_SQL.format(lon="ArpLong", lat="ArpLat")
+            params += near
+        rows = _iter_tuples(conn, sql, params)
 
         return [
             AerodromeInfo(
-                icao=r["AdCode"],
-                name=r["AdNomComplet"] or r["AdNomCarto"] or "",
-                latitude=r["ArpLat"],
-                longitude=r["ArpLong"],
-                elevation_ft=r["AdRefAltFt"],
-                status=self._map_status(r["AdStatut"]),
-                vfr=r["TfcVfr"] == "OUI" if r["TfcVfr"] else True,
-                private=r["TfcPrive"] == "OUI" if r["TfcPrive"] else False,
+                icao=code,
+                name=full_name or short_name or "",
+                latitude=lat,
+                longitude=lon,
+                elevation_ft=elevation,
+                status=self._map_status(status),
+                vfr=vfr == "OUI" if vfr else True,
+                private=private == "OUI" if private else False,
             )
-            for r in rows
+            for code, full_name, short_name, lat, lon, elevation, status, vfr, private in rows
         ]
 
     # ------------------------------------------------------------------
     # Private - New schema helpers
     # ------------------------------------------------------------------
 
-    def _get_runways_new(self, conn: sqlite3.Connection, short_icao: str) -> list[Runway]:
-        """Get runways using new aerodrome_runway schema."""
-        rows = conn.execute(
-            """
-            SELECT designator, length_m, width_m, is_main, surface, lda1_m, lda2_m
-            FROM aerodrome_runway
-            WHERE icao = ?
-            """,
-            (short_icao,),
-        ).fetchall()
-
-        return [
-            Runway(
-                designator=r["designator"] or "",
-                length_m=r["length_m"],
-                width_m=r["width_m"],
-                is_main=r["is_main"] == "oui" if r["is_main"] else False,
-                surface=r["surface"],
-                lda1_m=r["lda1_m"],
-                lda2_m=r["lda2_m"],
-            )
-            for r in rows
-        ]
+    @staticmethod
+    def _runway_new(r: sqlite3.Row) -> Runway:
+        """Runway from the aerodrome_runway columns of a joined row."""
+        designator, length, width, is_main, surface, lda1, lda2 = _RUNWAY_FIELDS_NEW(r)
+        return Runway(
+            designator=designator or "",
+            length_m=length,
+            width_m=width,
+            is_main=is_main == "oui" if is_main else False,
+            surface=surface,
+            lda1_m=lda1,
+            lda2_m=lda2,
+        )
 
-    def _get_services_new(self, conn: sqlite3.Connection, short_icao: str) -> list[AerodromeService]:
-        """Get services using new aerodrome_service schema with frequencies from Frequence table."""
-        # Query services with frequencies via Frequence.ServiceRef -> aerodrome_service.pk join
-        rows = conn.execute(
-            """
-            SELECT s.pk, s.service_type, s.callsign, s.hours_code, s.hours_text,
-                   f.Frequence, f.Espacement
-            FROM aerodrome_service s
-            LEFT JOIN Frequence f ON f.ServiceRef = s.pk
-            WHERE s.icao = ?
-            """,
-            (short_icao,),
-        ).fetchall()
-
-        # Group frequencies by service
-        services: dict[int, AerodromeService] = {}
-        for r in rows:
-            s_pk = r["pk"]
-            if s_pk not in services:
-                services[s_pk] = AerodromeService(
-                    service_type=r["service_type"] or "",
-                    callsign=r["callsign"] or "",
-                    hours_code=r["hours_code"],
-                    hours_text=r["hours_text"],
-                    frequencies=[],
-                )
-            if r["Frequence"]:
-                services[s_pk].frequencies.append(
-                    AerodromeFrequency(
-                        frequency_mhz=r["Frequence"],
-                        spacing=r["Espacement"],
-                    )
-                )
-        return list(services.values())
+    @staticmethod
+    def _service_new(r: sqlite3.Row) -> AerodromeService:
+        """Service (without frequencies) from the aerodrome_service columns of a joined row."""
+        service_type, callsign, hours_code, hours_text = _SERVICE_FIELDS_NEW(r)
+        return AerodromeService(
+            service_type=service_type or "",
+            callsign=callsign or "",
+            hours_code=hours_code,
+            hours_text=hours_text,
+            frequencies=[],
+        )
 
     # ------------------------------------------------------------------
     # Private - Legacy schema helpers
     # ------------------------------------------------------------------
 
-    def _get_runways_legacy(self, conn: sqlite3.Connection, ad_pk: int) -> list[Runway]:
-        """Get runways using legacy Rwy schema."""
-        rows = conn.execute(
-            """
-            SELECT Rwy, Longueur, Largeur, Principale, Revetement,
-                   Lda1, Lda2
-            FROM Rwy
-            WHERE Ad_pk = ?
-            """,
-            (ad_pk,),
-        ).fetchall()
-
-        return [
-            Runway(
-                designator=r["Rwy"] or "",
-                length_m=r["Longueur"],
-                width_m=r["Largeur"],
-                is_main=r["Principale"] == "OUI" if r["Principale"] else False,
-                surface=r["Revetement"],
-                lda1_m=r["Lda1"],
-                lda2_m=r["Lda2"],
-            )
-            for r in rows
-        ]
+    @staticmethod
+    def _runway_legacy(r: sqlite3.Row) -> Runway:
+        """Runway from the Rwy columns of a joined row."""
+        designator, length, width, is_main, surface, lda1, lda2 = _RUNWAY_FIELDS_LEGACY(r)
+        return Runway(
+            designator=designator or "",
+            length_m=length,
+            width_m=width,
+            is_main=is_main == "OUI" if is_main else False,
+            surface=surface,
+            lda1_m=lda1,
+            lda2_m=lda2,
+        )
 
-    def _get_services_legacy(
-        self, conn: sqlite3.Connection, ad_pk: int
-    ) -> list[AerodromeService]:
-        """Get services using legacy Service/Frequence schema."""
-        rows = conn.execute(
-            """
-            SELECT s.pk, s.Service, s.IndicLieu, s.HorCode, s.HorTxt,
-                   f.Frequence, f.Espacement
-            FROM Service s
-            LEFT JOIN Frequence f ON f.Service_pk = s.pk
-            WHERE s.Ad_pk = ?
-            """,
-            (ad_pk,),
-        ).fetchall()
-
-        services: dict[int, AerodromeService] = {}
-        for r in rows:
-            s_pk = r["pk"]
-            if s_pk not in services:
-                services[s_pk] = AerodromeService(
-                    service_type=r["Service"] or "",
-                    callsign=r["IndicLieu"] or "",
-                    hours_code=r["HorCode"],
-                    hours_text=r["HorTxt"],
-                    frequencies=[],
-                )
-            if r["Frequence"]:
-                services[s_pk].frequencies.append(
-                    AerodromeFrequency(
-                        frequency_mhz=r["Frequence"],
-                        spacing=r["Espacement"],
-                    )
-                )
-        return list(services.values())
+    @staticmethod
+    def _service_legacy(r: sqlite3.Row) -> AerodromeService:
+        """Service (without frequencies) from the Service columns of a joined row."""
+        service_type, callsign, hours_code, hours_text = _SERVICE_FIELDS_LEGACY(r)
+        return AerodromeService(
+            service_type=service_type or "",
+            callsign=callsign or "",
+            hours_code=hours_code,
+            hours_text=hours_text,
+            frequencies=[],
+        )
 
     def search_near_route(
         self,
@@ -389,92 +575,148 @@ class AerodromeQueryService:
         # ~1 degree latitude = 60 nm, ~1 degree longitude = 60 * cos(lat) nm
         avg_lat = sum(lats) / len(lats)
         lat_buffer = buffer_nm / 60.0
-        lon_buffer = buffer_nm / (60.0 * max(0.1, abs(__import__("math").cos(__import__("math").radians(avg_lat)))))
+        lon_buffer = buffer_nm / (60.0 * max(0.1, abs(math.cos(math.radians(avg_lat)))))
 
         lat_min = min(lats) - lat_buffer
         lat_max = max(lats) + lat_buffer
         lon_min = min(lons) - lon_buffer
         lon_max = max(lons) + lon_buffer
 
-        # Get all aerodromes in bounding box
-        candidates = self.search_bbox(lat_min, lon_min, lat_max, lon_max)
+        exclude_set = set(ic.upper() for ic in (exclude_icaos or []))
+        bbox = (lat_min, lon_min, lat_max, lon_max)
+        # Geodesic distance to the route line, evaluated inside SpatiaLite
+        route_wkt = "LINESTRING({})".format(
+            ", ".join(f"{lon!r} {lat!r}" for lat, lon in route_coords)
+        )
+        near = (route_wkt, buffer_nm * _METRES_PER_NM)
+
+        search = self._search_bbox_new if self._use_new_schema else self._search_bbox_legacy
+        conn = self._manager.acquire()
+        try:
+            try:
+                found = search(conn, *bbox, near=near)
+                return [ad for ad in found if ad.icao not in exclude_set]
+            except sqlite3.OperationalError:
+                # SpatiaLite built without geodesic support: filter in Python
+                logger.debug("ST_Distance unavailable, filtering route buffer in Python")
+                candidates = search(conn, *bbox)
+        finally:
+            self._manager.release(conn)
 
         # Filter to those actually within buffer distance of the route
-        exclude_set = set(ic.upper() for ic in (exclude_icaos or []))
-        results = []
-        for ad in candidates:
-            if ad.icao in exclude_set:
-                continue
-            # Check if aerodrome is within buffer of any route segment
-            if self._is_within_buffer(ad.latitude, ad.longitude, route_coords, buffer_nm):
-                results.append(ad)
+        candidates = [ad for ad in candidates if ad.icao not in exclude_set]
+        mask = self._within_buffer_mask(
+            [ad.latitude for ad in candidates],
+            [ad.longitude for ad in candidates],
+            route_coords,
+            buffer_nm,
+        )
+        return [ad for ad, keep in zip(candidates, mask) if keep]
+
+    @classmethod
+    def _within_buffer_mask(
+        cls,
+        lats: list[float],
+        lons: list[float],
+        route_coords: list[tuple[float, float]],
+        buffer_nm: float,
+    ) -> list[bool]:
+        """``_is_within_buffer`` for many points at once.
+
+        Vectorised over every (point, segment) pair with numpy when the
+        optional dependency is installed; point by point otherwise.
+        """
+        if not lats:
+            return []
+        try:
+            import numpy as np
+        except ImportError:
+            segments = cls._route_segments(route_coords, buffer_nm)
+            return [
+                cls._is_within_buffer(lat, lon, segments, buffer_nm)
+                for lat, lon in zip(lats, lons)
+            ]
+
+        route = np.radians(np.asarray(route_coords, dtype=np.float64))
+        la1, lo1 = route[:-1, 0], route[:-1, 1]  # (S,)
+        la2, lo2 = route[1:, 0], route[1:, 1]
+        plat = np.radians(np.asarray(lats, dtype=np.float64))[:, None]  # (N, 1)
+        plon = np.radians(np.asarray(lons, dtype=np.float64))[:, None]
+
+        def haversine_nm(a_lat, a_lon, b_lat, b_lon):
+            a = (np.sin((b_lat - a_lat) / 2) ** 2
+                 + np.cos(a_lat) * np.cos(b_lat) * np.sin((b_lon - a_lon) / 2) ** 2)
+            return 2 * np.arcsin(np.sqrt(a)) * 3440.065
+
+        d1 = haversine_nm(plat, plon, la1, lo1)  # (N, S)
+        d2 = haversine_nm(plat, plon, la2, lo2)
+        d12 = haversine_nm(la1, lo1, la2, lo2)  # (S,)
+        nearest = np.minimum(d1, d2)
+
+        # Same triangle-height estimate as _is_within_buffer, branch-free
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s = (d1 + d2 + d12) / 2
+            area_sq = s * (s - d1) * (s - d2) * (s - d12)
+            height = 2 * np.sqrt(area_sq) / d12
+            along1 = np.sqrt(np.maximum(0, d1 * d1 - height * height))
+            along2 = np.sqrt(np.maximum(0, d2 * d2 - height * height))
+        triangle = (s > d1) & (s > d2) & (s > d12) & (area_sq > 0)
+        projects = (
+            (along1 <= d12) & (along2 <= d12) & (np.abs(along1 + along2 - d12) < d12 * 0.5)
+        )
+        dist = np.where(triangle & projects, height, nearest)
+        dist = np.where(d12 < 0.1, d1, dist)
+        return (dist <= buffer_nm).any(axis=1).tolist()
 
-        return results
+    @staticmethod
+    def _route_segments(
+        route_coords: list[tuple[float, float]], buffer_nm: float,
+    ) -> list[_Segment]:
+        """Per-segment constants, computed once per route rather than per candidate."""
+        points = [
+            (la, lo, math.cos(la))
+            for la, lo in ((math.radians(lat), math.radians(lon)) for lat, lon in route_coords)
+        ]
+        segments: list[_Segment] = []
+        for a, b in pairwise(points):
+            d12 = _haversine_nm(*a, *b)
+            lat_pad = buffer_nm / _EARTH_RADIUS_NM * _BOX_PAD
+            arc_lo, arc_hi = _arc_lat_range(a[0], a[1], b[0], b[1])
+            lat_lo = arc_lo - lat_pad
+            lat_hi = arc_hi + lat_pad
+            cos_edge = max(math.cos(min(max(abs(lat_lo), abs(lat_hi)), math.pi / 2)), 1e-6)
+            lon_pad = buffer_nm / (_EARTH_RADIUS_NM * cos_edge) * _BOX_PAD
+            segments.append((
+                lat_lo, lat_hi, min(a[1], b[1]) - lon_pad, max(a[1], b[1]) + lon_pad,
+                *a, *b, d12,
+            ))
+        return segments
 
     @staticmethod
     def _is_within_buffer(
         lat: float,
         lon: float,
-        route_coords: list[tuple[float, float]],
+        segments: list[_Segment],
         buffer_nm: float,
     ) -> bool:
-        """Check if a point is within buffer distance of any route segment."""
-        import math
-
-        def haversine_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-            la1, lo1 = math.radians(lat1), math.radians(lon1)
-            la2, lo2 = math.radians(lat2), math.radians(lon2)
-            dlat = la2 - la1
-            dlon = lo2 - lo1
-            a = math.sin(dlat / 2) ** 2 + math.cos(la1) * math.cos(la2) * math.sin(dlon / 2) ** 2
-            return 2 * math.asin(math.sqrt(a)) * 3440.065
-
-        def point_to_segment_dist_nm(
-            plat: float, plon: float, lat1: float, lon1: float, lat2: float, lon2: float
-        ) -> float:
-            """Approximate cross-track distance from point to segment."""
-            # Distance to endpoints
-            d1 = haversine_nm(plat, plon, lat1, lon1)
-            d2 = haversine_nm(plat, plon, lat2, lon2)
-            seg_len = haversine_nm(lat1, lon1, lat2, lon2)
-
-            if seg_len < 0.1:
-                return d1
-
-            # Check if point projects onto segment (using along-track position)
-            # Simplified: if d1 or d2 is less than buffer, it's close enough
-            # Otherwise, estimate cross-track distance
-            d12 = haversine_nm(lat1, lon1, lat2, lon2)
-            if d12 < 0.1:
-                return d1
+        """Check if a point is within buffer distance of any route segment.
 
-            # Cross-track distance approximation using triangle area
-            # area = 0.5 * base * height => height = 2 * area / base
-            # For small distances, we can approximate
-            s = (d1 + d2 + d12) / 2
-            if s <= d1 or s <= d2 or s <= d12:
-                return min(d1, d2)
-            area_sq = s * (s - d1) * (s - d2) * (s - d12)
-            if area_sq <= 0:
-                return min(d1, d2)
-            area = math.sqrt(area_sq)
-            height = 2 * area / d12
-
-            # Check if point is "between" the segment endpoints
-            # by checking if along-track distance is within segment
-            along1 = math.sqrt(max(0, d1 * d1 - height * height))
-            along2 = math.sqrt(max(0, d2 * d2 - height * height))
-
-            # If along1 + along2 ≈ d12, point projects onto segment
-            if along1 <= d12 and along2 <= d12 and abs(along1 + along2 - d12) < d12 * 0.5:
-                return height
-
-            return min(d1, d2)
-
-        for i in range(len(route_coords) - 1):
-            lat1, lon1 = route_coords[i]
-            lat2, lon2 = route_coords[i + 1]
-            dist = point_to_segment_dist_nm(lat, lon, lat1, lon1, lat2, lon2)
+        ``segments`` comes from ``_route_segments`` for the same buffer; each
+        segment's padded box rejects far-away points before any trig.
+        """
+        plat, plon = math.radians(lat), math.radians(lon)
+        point: tuple[float, float, float] | None = None
+
+        for lat_lo, lat_hi, lon_lo, lon_hi, la1, lo1, cos1, la2, lo2, cos2, d12 in segments:
+            if not (lat_lo <= plat <= lat_hi and lon_lo <= plon <= lon_hi):
+                continue
+            if point is None:
+                point = (plat, plon, math.cos(plat))
+            d1 = _haversine_nm(*point, la1, lo1, cos1)
+            if d12 < 0.1:
+                dist = d1
+            else:
+                dist = _segment_distance_nm(d1, _haversine_nm(*point, la2, lo2, cos2), d12)
             if dist <= buffer_nm:
                 return True
 
@@ -485,11 +727,4 @@ class AerodromeQueryService:
         """Map status string to enum. Case-insensitive for compatibility."""
         if not raw:
             return AerodromeStatus.CAP
-        status = raw.upper().strip()
-        if status == "CAP":
-            return AerodromeStatus.CAP
-        if status in ("MIL", "MILITARY"):
-            return AerodromeStatus.MILITARY
-        if status in ("RES", "RESTRICTED", "RESTREINT"):
-            return AerodromeStatus.RESTRICTED
-        return AerodromeStatus.CAP
+        return _STATUS_MAP.get(raw.upper().strip(), AerodromeStatus.CAP)
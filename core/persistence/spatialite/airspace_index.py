@@ -0,0 +1,253 @@
+"""In-memory indexes of the airspace volumes: static packed R-tree of their boxes, parsed shapes."""
+
+from __future__ import annotations
+
+import sqlite3
+
+# Bounding box and altitude band of every airspace volume, keyed by rowid
+_BOXES_SQL = """
+    SELECT rowid,
+           MbrMinX(geometry), MbrMinY(geometry), MbrMaxX(geometry), MbrMaxY(geometry),
+           altitude_floor_ft_amsl, altitude_ceiling_ft_amsl
+    FROM airspace_spatial_indexed
+    WHERE geometry IS NOT NULL
+    """
+
+# Hilbert grid resolution (bits per axis) used to order the boxes
+_HILBERT_ORDER = 16
+
+_Box = tuple[float, float, float, float]
+
+
+def _hilbert(x: int, y: int) -> int:
+    """Distance of grid cell (x, y) along the Hilbert curve."""
+    n = 1 << _HILBERT_ORDER
+    d = 0
+    s = n >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        if not ry:
+            if rx:
+                x, y = n - 1 - x, n - 1 - y
+            x, y = y, x
+        s >>= 1
+    return d
+
+
+def _union(boxes: list[_Box]) -> _Box:
+    return (
+        min(b[0] for b in boxes),
+        min(b[1] for b in boxes),
+        max(b[2] for b in boxes),
+        max(b[3] for b in boxes),
+    )
+
+
+class AirspaceBoxIndex:
+    """Static R-tree over airspace bounding boxes, with their altitude bands.
+
+    Packed the Flatbush way: boxes are sorted along a Hilbert curve of their
+    centres, then grouped ``node_size`` at a time into parent boxes, level
+    after level up to a single root. Reference data never changes within a
+    cycle, so the tree is built once and only searched afterwards.
+
+    With the optional numpy dependency, searches instead test every volume
+    at once on column arrays (one per bound); a few thousand volumes are
+    scanned faster that way than the tree is walked in Python.
+    """
+
+    def __init__(
+        self,
+        ids: list[int],
+        boxes: list[_Box],
+        floors: list[float],
+        ceilings: list[float],
+        node_size: int = 16,
+    ):
+        self._node_size = node_size
+        order = list(range(len(ids)))
+        if boxes:
+            min_x, min_y, max_x, max_y = _union(boxes)
+            scale_x = ((1 << _HILBERT_ORDER) - 1) / ((max_x - min_x) or 1.0)
+            scale_y = ((1 << _HILBERT_ORDER) - 1) / ((max_y - min_y) or 1.0)
+            order.sort(key=lambda i: _hilbert(
+                int(((boxes[i][0] + boxes[i][2]) / 2 - min_x) * scale_x),
+                int(((boxes[i][1] + boxes[i][3]) / 2 - min_y) * scale_y),
+            ))
+        self._ids = [ids[i] for i in order]
+        self._floors = [floors[i] for i in order]
+        self._ceilings = [ceilings[i] for i in order]
+        # _levels[0] holds the item boxes; entry j of level k bounds entries
+        # j * node_size to (j + 1) * node_size - 1 of level k - 1
+        self._levels: list[list[_Box]] = [[boxes[i] for i in order]]
+        while len(self._levels[-1]) > 1:
+            below = self._levels[-1]
+            self._levels.append([
+                _union(below[j:j + node_size]) for j in range(0, len(below), node_size)
+            ])
+        self._columns = self._column_arrays(ids, boxes, floors, ceilings)
+
+    @staticmethod
+    def _column_arrays(
+        ids: list[int], boxes: list[_Box], floors: list[float], ceilings: list[float]
+    ) -> tuple | None:
+        """Arrays ``(ids, min_x, min_y, max_x, max_y, floor, ceiling)``, ``None`` without numpy."""
+        try:
+            import numpy as np
+        except ImportError:
+            return None
+        # float64: float32 would round bounds inwards and drop edge matches
+        bounds = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+        return (
+            np.array(ids, dtype=np.int64),
+            *(np.ascontiguousarray(bounds[:, k]) for k in range(4)),
+            np.array(floors, dtype=np.float64),
+            np.array(ceilings, dtype=np.float64),
+        )
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> AirspaceBoxIndex:
+        """Build the index from ``airspace_spatial_indexed``."""
+        ids: list[int] = []
+        boxes: list[_Box] = []
+        floors: list[float] = []
+        ceilings: list[float] = []
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        for rowid, min_x, min_y, max_x, max_y, floor, ceiling in cursor.execute(_BOXES_SQL):
+            if min_x is None or floor is None or ceiling is None:
+                continue  # Invalid geometry or no vertical limits: never matched
+            ids.append(rowid)
+            boxes.append((min_x, min_y, max_x, max_y))
+            floors.append(floor)
+            ceilings.append(ceiling)
+        return cls(ids, boxes, floors, ceilings)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(
+        self, min_x: float, min_y: float, max_x: float, max_y: float, altitude_ft: float
+    ) -> list[int]:
+        """Rowids of the volumes whose box overlaps the query box at *altitude_ft*."""
+        if not self._ids:
+            return []
+        if self._columns is not None:
+            return self._search_columns(min_x, min_y, max_x, max_y, altitude_ft)
+        return self._search_tree(min_x, min_y, max_x, max_y, altitude_ft)
+
+    def _search_columns(
+        self, min_x: float, min_y: float, max_x: float, max_y: float, altitude_ft: float
+    ) -> list[int]:
+        ids, box_min_x, box_min_y, box_max_x, box_max_y, floors, ceilings = self._columns
+        mask = (
+            (box_min_x <= max_x) & (box_max_x >= min_x)
+            & (box_min_y <= max_y) & (box_max_y >= min_y)
+            & (floors <= altitude_ft) & (ceilings >= altitude_ft)
+        )
+        return sorted(ids[mask].tolist())
+
+    def _search_tree(
+        self, min_x: float, min_y: float, max_x: float, max_y: float, altitude_ft: float
+    ) -> list[int]:
+        found: list[int] = []
+        size = self._node_size
+        stack = [(len(self._levels) - 1, 0)]
+        while stack:
+            level, node = stack.pop()
+            box = self._levels[level][node]
+            if box[2] < min_x or box[0] > max_x or box[3] < min_y or box[1] > max_y:
+                continue
+            if level:
+                below = len(self._levels[level - 1])
+                stack.extend(
+                    (level - 1, child)
+                    for child in range(node * size, min((node + 1) * size, below))
+                )
+            elif self._floors[node] <= altitude_ft <= self._ceilings[node]:
+                found.append(self._ids[node])
+        found.sort()
+        return found
+
+
+# Geometry of every airspace volume as WKB, keyed by rowid
+_SHAPES_SQL = """
+    SELECT rowid, AsBinary(geometry)
+    FROM airspace_spatial_indexed
+    WHERE geometry IS NOT NULL
+    """
+
+
+class AirspaceShapes:
+    """Airspace geometries parsed once into prepared shapely (GEOS) objects.
+
+    Every SpatiaLite predicate call rebuilds a GEOS geometry from the stored
+    BLOB; with the geometries kept parsed, the exact tests of a leg run in
+    one vectorized shapely call per predicate over its candidates. Needs the
+    optional shapely dependency (``geo`` extra).
+    """
+
+    def __init__(self, ids: list[int], wkbs: list[bytes]):
+        import numpy as np
+        import shapely
+
+        self._positions = {rowid: i for i, rowid in enumerate(ids)}
+        self._ids = np.array(ids, dtype=np.int64)
+        self._geoms = shapely.from_wkb(np.array(wkbs, dtype=object))
+        shapely.prepare(self._geoms)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> AirspaceShapes | None:
+        """Parse the geometries of ``airspace_spatial_indexed``; ``None`` without shapely."""
+        try:
+            import shapely  # noqa: F401
+        except ImportError:
+            return None
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(_SHAPES_SQL).fetchall()
+        return cls([rowid for rowid, _ in rows], [wkb for _, wkb in rows])
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def classify_leg(
+        self,
+        ids: list[int],
+        lon1: float,
+        lat1: float,
+        lon2: float,
+        lat2: float,
+        buffer_deg: float | None = None,
+    ) -> tuple[list[tuple[int, bool, bool, bool]], list[int]]:
+        """Exact tests of the leg against the candidate volumes *ids*.
+
+        Returns the volumes the leg intersects, as ``(id, crosses,
+        start_inside, end_inside)``, and the ids of those within
+        *buffer_deg* of it without touching it (none without
+        *buffer_deg*); both in *ids* order.
+        """
+        import shapely
+
+        positions = [self._positions[i] for i in ids if i in self._positions]
+        if not positions:
+            return [], []
+        ids_found = self._ids[positions]
+        geoms = self._geoms[positions]
+        line = shapely.LineString([(lon1, lat1), (lon2, lat2)])
+        hit = shapely.intersects(geoms, line)
+
+        crossed = geoms[hit]
+        route = list(zip(
+            ids_found[hit].tolist(),
+            shapely.crosses(line, crossed).tolist(),
+            shapely.contains(crossed, shapely.Point(lon1, lat1)).tolist(),
+            shapely.contains(crossed, shapely.Point(lon2, lat2)).tolist(),
+        ))
+        if buffer_deg is None:
+            return route, []
+        missed = ~hit
+        near = shapely.distance(geoms[missed], line) <= buffer_deg
+        return route, ids_found[missed][near].tolist()
@@ -4,7 +4,15 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import sqlite3
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from json import JSONDecodeError
+from operator import itemgetter
+from pathlib import Path
+from typing import Any
 
 from core.contracts.airspace import (
     AirspaceIntersection,
@@ -13,12 +21,23 @@ from core.contracts.airspace import (
     ServiceInfo,
 )
 from core.contracts.enums import AirspaceType, IntersectionType
+from core.persistence.spatialite.airspace_index import AirspaceBoxIndex, AirspaceShapes
 from core.persistence.spatialite.db_manager import SpatiaLiteManager
 
+# Optional C parser for the GeoJSON of drawn airspaces (one per row);
+# its decode error subclasses json.JSONDecodeError
+_json_loads: Callable[[str | bytes], Any]
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
-# Maps SIA TypeEspace values to SkyWeb enums.
-_TYPE_MAP: dict[str, AirspaceType] = {
+# Maps SIA TypeEspace values to SkyWeb enums; unknown types map to OTHER.
+_TYPE_MAP: dict[str | None, AirspaceType] = {
     "TMA": AirspaceType.TMA,
     "CTR": AirspaceType.CTR,
     "SIV": AirspaceType.SIV,
@@ -33,9 +52,12 @@ _TYPE_MAP: dict[str, AirspaceType] = {
     "TMZ": AirspaceType.TMZ,
     "CTA": AirspaceType.CTA,
 }
+# Bound once so the per-row builders skip the attribute lookups
+_GET_TYPE = _TYPE_MAP.get
+_OTHER = AirspaceType.OTHER
 
 # SIA airspace types to exclude from VFR analysis (IFR/high-level only).
-_EXCLUDED_TYPES: set[str] = {
+_EXCLUDED_TYPES: frozenset[str] = frozenset({
     "CTL",   # Control sectors (ATC sectors, not relevant for VFR)
     "ACC",   # Area Control Center
     "UAC",   # Upper Area Control
@@ -44,8 +66,295 @@ _EXCLUDED_TYPES: set[str] = {
     "FRA",   # Free Route Airspace (IFR concept)
     "LTA",   # Lower Traffic Area (IFR)
     "OCA",   # Oceanic Control Area
+})
+
+# The exclusion as a SQL condition, so excluded rows never leave SQLite.
+# IFNULL keeps airspaces without a type, as NULL NOT IN (...) is not true
+_EXCLUDED_LIST = ", ".join(f"'{t}'" for t in sorted(_EXCLUDED_TYPES))
+_NOT_EXCLUDED_SQL = f"IFNULL(a.espace_type, '') NOT IN ({_EXCLUDED_LIST})"
+
+
+# Per-connection scratch table holding the legs of the route being analyzed,
+# with the ``line`` built once for both queries, the corridor half-width
+# ``buffer`` (degrees), and the waypoints ``wp1`` / ``wp2`` at its ends
+_LEGS_TABLE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS route_legs (
+        seq INTEGER PRIMARY KEY,
+        alt REAL,
+        wp1 INTEGER,
+        wp2 INTEGER,
+        line BLOB,
+        buffer REAL
+    )
+    """
+
+# Candidate volumes of each leg, prefiltered in memory by ``AirspaceBoxIndex``
+# (corridor box and altitude), so GEOS only tests these
+_CANDIDATES_TABLE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS route_candidates (
+        seq INTEGER,
+        id INTEGER,
+        PRIMARY KEY (seq, id)
+    )
+    """
+
+_CANDIDATES_INSERT_SQL = "INSERT INTO temp.route_candidates (seq, id) VALUES (?, ?)"
+
+# Waypoint-in-volume tests still needed to classify route intersections.
+# Consecutive legs share a waypoint, so each (waypoint, volume) pair is
+# tested once per route instead of once per leg end
+_PROBES_TABLE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS route_probes (
+        wp INTEGER,
+        id INTEGER,
+        lon REAL,
+        lat REAL,
+        PRIMARY KEY (wp, id)
+    )
+    """
+
+_PROBES_INSERT_SQL = "INSERT INTO temp.route_probes (wp, id, lon, lat) VALUES (?, ?, ?, ?)"
+
+_PROBES_SQL = """
+    SELECT q.wp, q.id, ST_Contains(a.geometry, MakePoint(q.lon, q.lat, 4326))
+    FROM temp.route_probes q
+    JOIN airspace_spatial_indexed a ON a.rowid = q.id
+    """
+
+# Params: seq, altitude, wp1, wp2, lon1, lat1, lon2, lat2, corridor
+# half-width (deg). Numeric endpoints, no WKT to parse
+_LEGS_INSERT_SQL = """
+    INSERT INTO temp.route_legs (seq, alt, wp1, wp2, line, buffer)
+    VALUES (?, ?, ?, ?, MakeLine(MakePoint(?, ?, 4326), MakePoint(?, ?, 4326)), ?)
+    """
+
+# Geometry column of the route queries: GeoJSON text is the bulk of a row,
+# so it is only produced for callers that draw the airspaces
+_GEOMETRY_COLUMN = {True: "AsGeoJSON(a.geometry)", False: "NULL"}
+
+# The route, segment and volume queries all start with the same ten volume
+# columns (espace_nom ... geometry_json), read by position: see _ROUTE_FIELDS
+_ROUTE_LEGS_TEMPLATE = """
+    SELECT
+        a.espace_nom,
+        a.espace_type,
+        a.partie_nom,
+        a.Classe,
+        a.altitude_floor_ft_amsl,
+        a.altitude_ceiling_ft_amsl,
+        a.partie_pk,
+        a.volume_pk,
+        a.espace_pk,
+        {geometry} AS geometry_json,
+        ST_Crosses(l.line, a.geometry) AS crosses,
+        c.id,
+        l.wp1,
+        l.wp2,
+        l.seq
+    FROM temp.route_candidates c
+    JOIN temp.route_legs l ON l.seq = c.seq
+    JOIN airspace_spatial_indexed a ON a.rowid = c.id
+    WHERE ST_Intersects(a.geometry, l.line)
+      AND {excluded}
+    ORDER BY l.seq, a.rowid
+    """
+
+_CLEAR_LEGS_SQL = "DELETE FROM temp.route_legs"
+_CLEAR_CANDIDATES_SQL = "DELETE FROM temp.route_candidates"
+_CLEAR_PROBES_SQL = "DELETE FROM temp.route_probes"
+
+# Within the corridor half-width of the leg without touching it. A distance
+# test on the line instead of intersecting a buffered polygon: no GEOS
+# buffer to build, and the candidates are already cut down to the corridor box
+_CORRIDOR_LEGS_SQL = f"""
+    SELECT
+        l.seq,
+        a.espace_nom,
+        a.espace_type,
+        a.Classe,
+        a.altitude_floor_ft_amsl,
+        a.altitude_ceiling_ft_amsl,
+        a.partie_pk,
+        a.volume_pk
+    FROM temp.route_candidates c
+    JOIN temp.route_legs l ON l.seq = c.seq
+    JOIN airspace_spatial_indexed a ON a.rowid = c.id
+    WHERE ST_Distance(a.geometry, l.line) <= l.buffer
+      AND NOT ST_Intersects(a.geometry, l.line)
+      AND {_NOT_EXCLUDED_SQL}
+    ORDER BY l.seq, a.rowid
+    """
+
+# SpatiaLite R*Tree of airspace_spatial_indexed.geometry (CreateSpatialIndex);
+# when present, the segment query reads its candidates straight from the
+# R*Tree table by bounding box (min_x, max_x, min_y, max_y bound), with
+# ST_Intersects as the exact test on MBR hits only. Without it the query
+# scans every volume
+_SPATIAL_INDEX_TABLE = "idx_airspace_spatial_indexed_geometry"
+_SPATIAL_INDEX_FILTER = f"""
+      AND a.rowid IN (
+          SELECT pkid FROM {_SPATIAL_INDEX_TABLE}
+          WHERE xmax >= ? AND xmin <= ? AND ymax >= ? AND ymin <= ?
+      )"""
+
+# One segment: params (lon1, lat1, lon2, lat2) and the altitude twice, plus
+# the segment bounding box with the R-tree filter. The endpoints and the line are
+# built once in a materialized CTE, then shared by the intersection test
+# and the classification columns of every matched row
+_SEGMENT_TEMPLATE = """
+    WITH seg AS MATERIALIZED (
+        SELECT p1, p2, MakeLine(p1, p2) AS line
+        FROM (SELECT MakePoint(?, ?, 4326) AS p1, MakePoint(?, ?, 4326) AS p2)
+    )
+    SELECT
+        a.espace_nom,
+        a.espace_type,
+        a.partie_nom,
+        a.Classe,
+        a.altitude_floor_ft_amsl,
+        a.altitude_ceiling_ft_amsl,
+        a.partie_pk,
+        a.volume_pk,
+        a.espace_pk,
+        {geometry} AS geometry_json,
+        -- Intersection type, computed on the matched row
+        ST_Crosses(s.line, a.geometry) AS crosses,
+        ST_Contains(a.geometry, s.p1) AS start_inside,
+        ST_Contains(a.geometry, s.p2) AS end_inside
+    FROM seg s, airspace_spatial_indexed a
+    WHERE ST_Intersects(a.geometry, s.line)
+      AND a.altitude_floor_ft_amsl <= ?
+      AND a.altitude_ceiling_ft_amsl >= ?
+      AND {excluded}{spatial_index}
+    """
+
+# Every variant formatted once, so the statement text is stable
+# and the connection's statement cache keeps them parsed
+_ROUTE_LEGS_SQL = {
+    flag: _ROUTE_LEGS_TEMPLATE.format(geometry=column, excluded=_NOT_EXCLUDED_SQL)
+    for flag, column in _GEOMETRY_COLUMN.items()
+}
+# Keyed by (include_geometry, use the R-tree)
+_SEGMENT_SQL = {
+    (flag, indexed): _SEGMENT_TEMPLATE.format(
+        geometry=column,
+        excluded=_NOT_EXCLUDED_SQL,
+        spatial_index=_SPATIAL_INDEX_FILTER if indexed else "",
+    )
+    for flag, column in _GEOMETRY_COLUMN.items()
+    for indexed in (False, True)
 }
 
+# Services of an airspace, one statement per lookup strategy; the first
+# with rows wins:
+#   1. direct link via EspaceRef
+#   2. exact name (SIV/TMA without direct services)
+#   3. parent name, frequencies of the matching sector only
+#   4. parent name, all frequencies
+# A NULL param disables its strategy
+_SERVICE_STRATEGIES_SQL = (
+    """
+    SELECT 1 AS prio, s.IndicLieu, s.IndicService, f.Frequence, f.Espacement,
+           f.pk AS freq_pk
+    FROM Service s
+    LEFT JOIN Frequence f ON f.ServiceRef = s.pk
+    WHERE s.EspaceRef = ?
+    """,
+    """
+    SELECT 2 AS prio, s.IndicLieu, s.IndicService, f.Frequence, f.Espacement,
+           f.pk AS freq_pk
+    FROM Service s
+    LEFT JOIN Frequence f ON f.ServiceRef = s.pk
+    WHERE UPPER(s.IndicLieu) = UPPER(?)
+      AND s.IndicService = ?
+    """,
+    """
+    SELECT 3 AS prio, s.IndicLieu, s.IndicService, f.Frequence, f.Espacement,
+           f.pk AS freq_pk
+    FROM Service s
+    JOIN Frequence f ON f.ServiceRef = s.pk
+    WHERE UPPER(s.IndicLieu) = UPPER(?)
+      AND s.IndicService = ?
+      AND instr(UPPER(f.SecteurSituation), ?) > 0
+    """,
+    """
+    SELECT 4 AS prio, s.IndicLieu, s.IndicService, f.Frequence, f.Espacement,
+           f.pk AS freq_pk
+    FROM Service s
+    LEFT JOIN Frequence f ON f.ServiceRef = s.pk
+    WHERE UPPER(s.IndicLieu) = UPPER(?)
+      AND s.IndicService = ?
+    """,
+)
+# All strategies in one round trip, the lowest ``prio`` with rows wins;
+# params are the strategies' params concatenated
+_SERVICES_SQL = "UNION ALL".join(_SERVICE_STRATEGIES_SQL) + "ORDER BY prio, freq_pk"
+
+# Direct-link services of many airspaces at once (strategy 1 above), grouped
+# by airspace in Python; the name-based fallbacks stay per airspace
+_SERVICES_BULK_TEMPLATE = """
+    SELECT s.EspaceRef, s.IndicLieu, s.IndicService, f.Frequence, f.Espacement
+    FROM Service s
+    LEFT JOIN Frequence f ON f.ServiceRef = s.pk
+    WHERE s.EspaceRef IN ({placeholders})
+    ORDER BY s.EspaceRef, f.pk
+    """
+
+# Attributes of the volumes matched in memory by ``AirspaceShapes``
+_VOLUMES_TEMPLATE = """
+    SELECT
+        a.espace_nom,
+        a.espace_type,
+        a.partie_nom,
+        a.Classe,
+        a.altitude_floor_ft_amsl,
+        a.altitude_ceiling_ft_amsl,
+        a.partie_pk,
+        a.volume_pk,
+        a.espace_pk,
+        {geometry} AS geometry_json,
+        a.rowid AS id
+    FROM airspace_spatial_indexed a
+    WHERE a.rowid IN ({placeholders})
+      AND {excluded}
+    """
+
+# Columns read by the row builders, fetched by position from plain tuple
+# rows in one C-level call (sqlite3.Row looks names up column by column).
+# Volume columns: 0 espace_nom, 1 espace_type, 2 partie_nom, 3 Classe,
+# 4 floor, 5 ceiling, 6 partie_pk, 7 volume_pk, 8 espace_pk, 9 geometry_json
+_ROUTE_FIELDS = itemgetter(0, 1, 3, 4, 5, 6, 7, 8, 9)
+_SERVICE_KEY_FIELDS = itemgetter(8, 0, 1)
+_CORRIDOR_FIELDS = itemgetter(0, 1, 3, 4, 5, 6, 7)
+# Then per query: segment (crosses, start_inside, end_inside),
+# route legs (crosses, id, wp1, wp2, seq), volumes (id)
+_CLASSIFY_FIELDS = itemgetter(10, 11, 12)
+_PROBE_FIELDS = itemgetter(11, 12, 13)
+_CROSSES = 10
+_LEG_SEQ = 14
+_VOLUME_ID = 10
+
+# Legs handed to each worker thread (and pooled connection) by analyze_route;
+# shorter routes stay on a single connection
+_LEGS_PER_WORKER = 4
+
+# Box index of the current reference DB, keyed by its (path, mtime); built on
+# first use and replaced when the DB changes
+_box_indexes: dict[tuple[Path, int] | None, AirspaceBoxIndex] = {}
+# Same for the parsed shapes (None without shapely), under the same lock
+_airspace_shapes: dict[tuple[Path, int] | None, AirspaceShapes | None] = {}
+_box_index_lock = threading.Lock()
+
+
+def _fetch_tuples(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> list[tuple]:
+    """Run *sql* returning plain tuples, bypassing the connection's ``sqlite3.Row``."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        return cur.execute(sql, params).fetchall()
+    finally:
+        cur.close()
+
 
 class AirspaceQueryService:
     """Segment-to-airspace intersection queries backed by SpatiaLite."""
@@ -64,23 +373,28 @@ class AirspaceQueryService:
         lat2: float,
         lon2: float,
         altitude_ft: int,
+        include_geometry: bool = False,
     ) -> list[AirspaceIntersection]:
         """Find airspaces intersected by a segment at a given altitude.
 
         Uses the materialized view ``airspace_spatial_indexed`` for
         pre-joined Espace→Partie→Volume with altitudes in ft AMSL.
+        ``geometry_geojson`` is only filled with *include_geometry*.
         """
-        conn = self._manager.get_connection()
+        conn = self._manager.acquire()
         try:
-            return self._query_segment(conn, lat1, lon1, lat2, lon2, altitude_ft)
+            return self._query_segment(
+                conn, lat1, lon1, lat2, lon2, altitude_ft, include_geometry
+            )
         finally:
-            conn.close()
+            self._manager.release(conn)
 
     def analyze_route(
         self,
         waypoints: list[tuple[str, float, float]],
         legs: list[tuple[int, int, int]],
         corridor_nm: float = 2.5,
+        include_geometry: bool = False,
     ) -> list[LegAirspaces]:
         """Analyze all legs of a route.
 
@@ -88,46 +402,238 @@ class AirspaceQueryService:
             waypoints: ``[(name, lat, lon), ...]`` in sequence order (1-based index = position).
             legs: ``[(from_seq, to_seq, altitude_ft), ...]``.
             corridor_nm: half-width of the corridor for corridor airspaces.
+            include_geometry: fill ``geometry_geojson`` of route airspaces.
 
         Returns one :class:`LegAirspaces` per leg.
         """
-        # Build waypoint lookup (1-based)
-        wp_map: dict[int, tuple[str, float, float]] = {}
-        for i, (name, lat, lon) in enumerate(waypoints, start=1):
-            wp_map[i] = (name, lat, lon)
+        # Waypoint columns, indexed by sequence - 1
+        names = [w[0] for w in waypoints]
+        lats = [w[1] for w in waypoints]
+        lons = [w[2] for w in waypoints]
 
-        conn = self._manager.get_connection()
-        try:
-            results: list[LegAirspaces] = []
-            for from_seq, to_seq, alt_ft in legs:
-                name1, lat1, lon1 = wp_map[from_seq]
-                name2, lat2, lon2 = wp_map[to_seq]
+        # Convert NM to approximate degrees (1 NM ≈ 1/60°)
+        buffer_deg = corridor_nm / 60.0
+        leg_rows: list[tuple] = []
+        leg_boxes: list[tuple[float, float, float, float, int]] = []
+        for seq, (from_seq, to_seq, alt_ft) in enumerate(legs):
+            lat1, lon1 = lats[from_seq - 1], lons[from_seq - 1]
+            lat2, lon2 = lats[to_seq - 1], lons[to_seq - 1]
+            leg_rows.append((
+                seq, alt_ft, from_seq, to_seq, lon1, lat1, lon2, lat2, buffer_deg,
+            ))
+            # Box of the corridor, which contains the route segment too
+            leg_boxes.append((
+                min(lon1, lon2) - buffer_deg, min(lat1, lat2) - buffer_deg,
+                max(lon1, lon2) + buffer_deg, max(lat1, lat2) + buffer_deg,
+                alt_ft,
+            ))
+
+        route_by_leg: list[list[AirspaceIntersection]] = [[] for _ in legs]
+        corridor_by_leg: list[list[AirspaceIntersection]] = [[] for _ in legs]
+        # Airspaces spanning several legs look their services up once
+        services_cache: dict[tuple, list[ServiceInfo]] = {}
+        # Whether waypoint *wp* is inside volume *id*, by (wp, id)
+        inside_cache: dict[tuple[int, int], bool] = {}
+
+        # Long routes are spread over pooled connections, one per thread: the
+        # spatial predicates run inside SpatiaLite/GEOS, without the GIL
+        workers = min(os.cpu_count() or 1, -(-len(legs) // _LEGS_PER_WORKER))
+        if workers <= 1:
+            self._analyze_legs(
+                leg_rows, leg_boxes, include_geometry,
+                route_by_leg, corridor_by_leg, services_cache, inside_cache,
+            )
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._analyze_legs,
+                        leg_rows[i::workers], leg_boxes[i::workers], include_geometry,
+                        route_by_leg, corridor_by_leg, services_cache, inside_cache,
+                    )
+                    for i in range(workers)
+                ]
+                for future in futures:
+                    future.result()
 
-                route_airspaces = self._query_segment(
-                    conn, lat1, lon1, lat2, lon2, alt_ft
+        results: list[LegAirspaces] = []
+        for seq, (from_seq, to_seq, alt_ft) in enumerate(legs):
+            results.append(
+                LegAirspaces(
+                    from_waypoint=names[from_seq - 1],
+                    to_waypoint=names[to_seq - 1],
+                    from_seq=from_seq,
+                    to_seq=to_seq,
+                    planned_altitude_ft=alt_ft,
+                    route_airspaces=route_by_leg[seq],
+                    corridor_airspaces=corridor_by_leg[seq],
                 )
-                corridor_airspaces = self._query_corridor(
-                    conn, lat1, lon1, lat2, lon2, alt_ft, corridor_nm
+            )
+        return results
+
+    # ------------------------------------------------------------------
+    # Private
+    # ------------------------------------------------------------------
+
+    def _analyze_legs(
+        self,
+        leg_rows: list[tuple],
+        leg_boxes: list[tuple[float, float, float, float, int]],
+        include_geometry: bool,
+        route_by_leg: list[list[AirspaceIntersection]],
+        corridor_by_leg: list[list[AirspaceIntersection]],
+        services_cache: dict[tuple, list[ServiceInfo]],
+        inside_cache: dict[tuple[int, int], bool],
+    ) -> None:
+        """Run the route and corridor queries for some legs on one pooled connection.
+
+        Appends to the per-leg lists of *route_by_leg* / *corridor_by_leg*,
+        which other workers share but only ever for other legs.
+        *services_cache* and *inside_cache* are shared by all workers of the route.
+        """
+        conn = self._manager.acquire()
+        try:
+            index = self._box_index(conn)
+            shapes = self._shapes(conn)
+            if shapes is not None:
+                self._match_legs_in_memory(
+                    conn, shapes, index, leg_rows, leg_boxes, include_geometry,
+                    route_by_leg, corridor_by_leg, services_cache,
                 )
+            else:
+                self._match_legs_in_sql(
+                    conn, index, leg_rows, leg_boxes, include_geometry,
+                    route_by_leg, corridor_by_leg, services_cache, inside_cache,
+                )
+        finally:
+            self._manager.release(conn)
 
-                results.append(
-                    LegAirspaces(
-                        from_waypoint=name1,
-                        to_waypoint=name2,
-                        from_seq=from_seq,
-                        to_seq=to_seq,
-                        planned_altitude_ft=alt_ft,
-                        route_airspaces=route_airspaces,
-                        corridor_airspaces=corridor_airspaces,
-                    )
+    def _match_legs_in_sql(
+        self,
+        conn: sqlite3.Connection,
+        index: AirspaceBoxIndex,
+        leg_rows: list[tuple],
+        leg_boxes: list[tuple[float, float, float, float, int]],
+        include_geometry: bool,
+        route_by_leg: list[list[AirspaceIntersection]],
+        corridor_by_leg: list[list[AirspaceIntersection]],
+        services_cache: dict[tuple, list[ServiceInfo]],
+        inside_cache: dict[tuple[int, int], bool],
+    ) -> None:
+        """Exact tests in SpatiaLite, through the connection's scratch tables."""
+        try:
+            # All legs in one statement per query kind instead of two per leg
+            conn.execute(_LEGS_TABLE_SQL)
+            conn.execute(_CANDIDATES_TABLE_SQL)
+            conn.execute(_PROBES_TABLE_SQL)
+            conn.executemany(_LEGS_INSERT_SQL, leg_rows)
+            conn.executemany(_CANDIDATES_INSERT_SQL, (
+                (leg_row[0], rowid)
+                for leg_row, leg_box in zip(leg_rows, leg_boxes)
+                for rowid in index.search(*leg_box)
+            ))
+            rows = _fetch_tuples(conn, _ROUTE_LEGS_SQL[include_geometry])
+            self._load_services(conn, rows, services_cache)
+            self._load_inside(conn, rows, leg_rows, inside_cache)
+            for row in rows:
+                volume, wp1, wp2 = _PROBE_FIELDS(row)
+                intersection_type = self._classify_intersection(
+                    row[_CROSSES], inside_cache[wp1, volume], inside_cache[wp2, volume]
                 )
-            return results
+                route_by_leg[row[_LEG_SEQ]].append(
+                    self._route_intersection(row, intersection_type, services_cache)
+                )
+            for seq, *fields in _fetch_tuples(conn, _CORRIDOR_LEGS_SQL):
+                corridor_by_leg[seq].append(self._corridor_intersection(fields))
         finally:
-            conn.close()
+            conn.execute(_CLEAR_LEGS_SQL)
+            conn.execute(_CLEAR_CANDIDATES_SQL)
+            conn.execute(_CLEAR_PROBES_SQL)
+            conn.commit()
 
-    # ------------------------------------------------------------------
-    # Private
-    # ------------------------------------------------------------------
+    def _match_legs_in_memory(
+        self,
+        conn: sqlite3.Connection,
+        shapes: AirspaceShapes,
+        index: AirspaceBoxIndex,
+        leg_rows: list[tuple],
+        leg_boxes: list[tuple[float, float, float, float, int]],
+        include_geometry: bool,
+        route_by_leg: list[list[AirspaceIntersection]],
+        corridor_by_leg: list[list[AirspaceIntersection]],
+        services_cache: dict[tuple, list[ServiceInfo]],
+    ) -> None:
+        """Exact tests on the parsed shapes; SQLite only reads the matched volumes."""
+        route_hits: list[tuple[int, int, bool, bool, bool]] = []
+        corridor_hits: list[tuple[int, int]] = []
+        for leg_row, leg_box in zip(leg_rows, leg_boxes):
+            seq, _, _, _, lon1, lat1, lon2, lat2, buffer_deg = leg_row
+            route, corridor = shapes.classify_leg(
+                index.search(*leg_box), lon1, lat1, lon2, lat2, buffer_deg
+            )
+            route_hits.extend((seq, *hit) for hit in route)
+            corridor_hits.extend((seq, volume) for volume in corridor)
+
+        volumes = self._volumes(
+            conn,
+            {hit[1] for hit in route_hits} | {volume for _, volume in corridor_hits},
+            include_geometry,
+        )
+
+        route_rows = [volumes[volume] for _, volume, *_ in route_hits if volume in volumes]
+        self._load_services(conn, route_rows, services_cache)
+        for seq, volume, crosses, start_inside, end_inside in route_hits:
+            row = volumes.get(volume)
+            if row is not None:  # None: excluded type
+                route_by_leg[seq].append(self._route_intersection(
+                    row,
+                    self._classify_intersection(crosses, start_inside, end_inside),
+                    services_cache,
+                ))
+        for seq, volume in corridor_hits:
+            row = volumes.get(volume)
+            if row is not None:
+                corridor_by_leg[seq].append(self._corridor_intersection(_CORRIDOR_FIELDS(row)))
+
+    @staticmethod
+    def _volumes(
+        conn: sqlite3.Connection, ids: Iterable[int], include_geometry: bool
+    ) -> dict[int, tuple]:
+        """Attribute rows of the volumes *ids* matched in memory, minus excluded types."""
+        ids = tuple(set(ids))
+        if not ids:
+            return {}
+        sql = _VOLUMES_TEMPLATE.format(
+            geometry=_GEOMETRY_COLUMN[include_geometry],
+            placeholders=", ".join("?" * len(ids)),
+            excluded=_NOT_EXCLUDED_SQL,
+        )
+        return {row[_VOLUME_ID]: row for row in _fetch_tuples(conn, sql, ids)}
+
+    def _box_index(self, conn: sqlite3.Connection) -> AirspaceBoxIndex:
+        """Box index of the current DB, built from *conn* on first use."""
+        version = self._manager.db_version
+        with _box_index_lock:
+            index = _box_indexes.get(version)
+            if index is None:
+                _box_indexes.clear()
+                index = _box_indexes[version] = AirspaceBoxIndex.load(conn)
+                logger.info("Airspace box index built: %d volumes", len(index))
+        return index
+
+    def _shapes(self, conn: sqlite3.Connection) -> AirspaceShapes | None:
+        """Parsed shapes of the current DB, loaded from *conn* on first use.
+
+        ``None`` without shapely: the exact tests then run in SpatiaLite.
+        """
+        version = self._manager.db_version
+        with _box_index_lock:
+            if version not in _airspace_shapes:
+                _airspace_shapes.clear()
+                shapes = _airspace_shapes[version] = AirspaceShapes.load(conn)
+                if shapes is not None:
+                    logger.info("Airspace shapes loaded: %d volumes", len(shapes))
+            return _airspace_shapes[version]
 
     def _query_segment(
         self,
@@ -137,165 +643,174 @@ class AirspaceQueryService:
         lat2: float,
         lon2: float,
         altitude_ft: int,
+        include_geometry: bool = False,
     ) -> list[AirspaceIntersection]:
-        """Core spatial query: segment × airspace_spatial_indexed."""
-        segment_wkt = f"LINESTRING({lon1} {lat1}, {lon2} {lat2})"
-
-        rows = conn.execute(
-            """
-            SELECT
-                a.espace_nom,
-                a.espace_type,
-                a.partie_nom,
-                a.Classe,
-                a.altitude_floor_ft_amsl,
-                a.altitude_ceiling_ft_amsl,
-                a.partie_pk,
-                a.volume_pk,
-                a.espace_pk,
-                AsGeoJSON(a.geometry) AS geometry_json
-            FROM airspace_spatial_indexed a
-            WHERE ST_Intersects(a.geometry, GeomFromText(?, 4326))
-              AND a.altitude_floor_ft_amsl <= ?
-              AND a.altitude_ceiling_ft_amsl >= ?
-            """,
-            (segment_wkt, altitude_ft, altitude_ft),
-        ).fetchall()
-
-        results: list[AirspaceIntersection] = []
-        for row in rows:
-            # Skip excluded types (IFR/high-level only)
-            if row["espace_type"] in _EXCLUDED_TYPES:
-                continue
+        """Core spatial query: segment × airspace_spatial_indexed.
 
-            # Determine intersection type (crosses vs inside)
-            intersection_type = self._classify_intersection(
-                conn, lat1, lon1, lat2, lon2, row["partie_pk"]
+        On parsed shapes when shapely is available, else in SpatiaLite.
+        """
+        shapes = self._shapes(conn)
+        if shapes is not None:
+            route, _ = shapes.classify_leg(
+                self._box_index(conn).search(
+                    min(lon1, lon2), min(lat1, lat2), max(lon1, lon2), max(lat1, lat2),
+                    altitude_ft,
+                ),
+                lon1, lat1, lon2, lat2,
             )
+            volumes = self._volumes(conn, [hit[0] for hit in route], include_geometry)
+            hits = [(volumes[hit[0]], hit[1:]) for hit in route if hit[0] in volumes]
+            services_cache: dict[tuple, list[ServiceInfo]] = {}
+            self._load_services(conn, [row for row, _ in hits], services_cache)
+            return [
+                self._route_intersection(
+                    row, self._classify_intersection(*flags), services_cache
+                )
+                for row, flags in hits
+            ]
 
-            services = self._get_services(
-                conn, row["espace_pk"], row["espace_nom"], row["espace_type"]
-            )
+        params: tuple = (lon1, lat1, lon2, lat2, altitude_ft, altitude_ft)
+        indexed = self._manager.has_table(_SPATIAL_INDEX_TABLE)
+        if indexed:
+            params += (min(lon1, lon2), max(lon1, lon2), min(lat1, lat2), max(lat1, lat2))
 
-            # Parse GeoJSON geometry
-            geometry_geojson = None
-            if row["geometry_json"]:
-                try:
-                    geometry_geojson = json.loads(row["geometry_json"])
-                except json.JSONDecodeError:
-                    pass
+        rows = _fetch_tuples(conn, _SEGMENT_SQL[include_geometry, indexed], params)
 
-            results.append(
-                AirspaceIntersection(
-                    identifier=row["espace_nom"],
-                    airspace_type=_TYPE_MAP.get(row["espace_type"], AirspaceType.OTHER),
-                    airspace_class=row["Classe"],
-                    lower_limit_ft=row["altitude_floor_ft_amsl"],
-                    upper_limit_ft=row["altitude_ceiling_ft_amsl"],
-                    intersection_type=intersection_type,
-                    partie_id=str(row["partie_pk"]),
-                    volume_id=str(row["volume_pk"]),
-                    services=services,
-                    geometry_geojson=geometry_geojson,
-                )
+        services_cache = {}
+        self._load_services(conn, rows, services_cache)
+        return [
+            self._route_intersection(
+                row, self._classify_intersection(*_CLASSIFY_FIELDS(row)), services_cache
             )
-        return results
+            for row in rows
+        ]
 
-    def _classify_intersection(
+    def _load_inside(
         self,
         conn: sqlite3.Connection,
-        lat1: float,
-        lon1: float,
-        lat2: float,
-        lon2: float,
-        partie_pk: int,
-    ) -> IntersectionType:
-        """Determine if the segment crosses or is inside the airspace."""
-        row = conn.execute(
-            """
-            SELECT
-                ST_Crosses(
-                    MakeLine(MakePoint(?, ?), MakePoint(?, ?)),
-                    a.geometry
-                ) AS crosses,
-                ST_Contains(a.geometry, MakePoint(?, ?)) AS start_inside,
-                ST_Contains(a.geometry, MakePoint(?, ?)) AS end_inside
-            FROM airspace_spatial_indexed a
-            WHERE a.partie_pk = ?
-            """,
-            (lon1, lat1, lon2, lat2, lon1, lat1, lon2, lat2, partie_pk),
-        ).fetchone()
-
-        if row is None:
-            return IntersectionType.CROSSES
+        rows: list[tuple],
+        leg_rows: list[tuple],
+        inside_cache: dict[tuple[int, int], bool],
+    ) -> None:
+        """Fill *inside_cache* for the leg ends of route query *rows* not in it yet.
+
+        The missing (waypoint, volume) pairs are tested in one statement.
+        """
+        points = {}
+        for _, _, wp1, wp2, lon1, lat1, lon2, lat2, _ in leg_rows:
+            points[wp1] = (lon1, lat1)
+            points[wp2] = (lon2, lat2)
+        missing = set()
+        for volume, wp1, wp2 in map(_PROBE_FIELDS, rows):
+            for wp in (wp1, wp2):
+                if (wp, volume) not in inside_cache:
+                    missing.add((wp, volume))
+        if not missing:
+            return
+        conn.executemany(
+            _PROBES_INSERT_SQL, ((wp, volume, *points[wp]) for wp, volume in missing)
+        )
+        for wp, volume, inside in _fetch_tuples(conn, _PROBES_SQL):
+            inside_cache[wp, volume] = bool(inside)
+
+    def _load_services(
+        self,
+        conn: sqlite3.Connection,
+        rows: list[tuple],
+        services_cache: dict[tuple, list[ServiceInfo]],
+    ) -> None:
+        """Fill *services_cache* for the airspaces of *rows* not in it yet.
+
+        Keyed by ``(espace_pk, espace_nom, espace_type)``. Direct links are
+        fetched for all airspaces in one statement; only SIV/TMA without
+        any fall back to the name-based lookup.
+        """
+        missing = {
+            key for key in map(_SERVICE_KEY_FIELDS, rows) if key not in services_cache
+        }
+        if not missing:
+            return
+        direct = self._get_services_bulk(
+            conn, {espace_pk for espace_pk, _, _ in missing if espace_pk is not None}
+        )
+        for key in missing:
+            espace_pk, espace_nom, espace_type = key
+            services = direct.get(espace_pk)
+            if services is None:
+                services = (
+                    self._get_services(conn, espace_pk, espace_nom, espace_type)
+                    if espace_nom and espace_type in ("SIV", "TMA")
+                    else []
+                )
+            services_cache[key] = services
 
-        if row["start_inside"] and row["end_inside"]:
+    @staticmethod
+    def _route_intersection(
+        row: tuple,
+        intersection_type: IntersectionType,
+        services_cache: dict[tuple, list[ServiceInfo]],
+    ) -> AirspaceIntersection:
+        """Build a route intersection from a segment query row.
+
+        Services come from *services_cache* (see :meth:`_load_services`).
+        """
+        (
+            name, espace_type, airspace_class, floor, ceiling,
+            partie_pk, volume_pk, espace_pk, geometry_json,
+        ) = _ROUTE_FIELDS(row)
+
+        services = services_cache[espace_pk, name, espace_type]
+
+        # Parse GeoJSON geometry
+        geometry_geojson = None
+        if geometry_json:
+            try:
+                geometry_geojson = _json_loads(geometry_json)
+            except JSONDecodeError:
+                pass
+
+        return AirspaceIntersection(
+            identifier=name,
+            airspace_type=_GET_TYPE(espace_type, _OTHER),
+            airspace_class=airspace_class,
+            lower_limit_ft=floor,
+            upper_limit_ft=ceiling,
+            intersection_type=intersection_type,
+            partie_id=str(partie_pk),
+            volume_id=str(volume_pk),
+            services=services,
+            geometry_geojson=geometry_geojson,
+        )
+
+    @staticmethod
+    def _classify_intersection(
+        crosses: bool, start_inside: bool, end_inside: bool
+    ) -> IntersectionType:
+        """Crosses vs inside, from the segment/volume predicates."""
+        if start_inside and end_inside:
             return IntersectionType.INSIDE
-        if row["crosses"]:
+        if crosses:
             return IntersectionType.CROSSES
-        if row["start_inside"]:
+        if start_inside:
             return IntersectionType.EXIT
-        if row["end_inside"]:
+        if end_inside:
             return IntersectionType.ENTRY
         return IntersectionType.CROSSES
 
-    def _query_corridor(
-        self,
-        conn: sqlite3.Connection,
-        lat1: float,
-        lon1: float,
-        lat2: float,
-        lon2: float,
-        altitude_ft: int,
-        corridor_nm: float,
-    ) -> list[AirspaceIntersection]:
-        """Find airspaces in the corridor but NOT on the direct route."""
-        # Convert NM to approximate degrees (1 NM ≈ 1/60°)
-        buffer_deg = corridor_nm / 60.0
-
-        rows = conn.execute(
-            """
-            SELECT
-                a.espace_nom,
-                a.espace_type,
-                a.Classe,
-                a.altitude_floor_ft_amsl,
-                a.altitude_ceiling_ft_amsl,
-                a.partie_pk,
-                a.volume_pk
-            FROM airspace_spatial_indexed a
-            WHERE ST_Intersects(
-                    a.geometry,
-                    ST_Buffer(MakeLine(MakePoint(?, ?), MakePoint(?, ?)), ?)
-                  )
-              AND NOT ST_Intersects(
-                    a.geometry,
-                    MakeLine(MakePoint(?, ?), MakePoint(?, ?))
-                  )
-              AND a.altitude_floor_ft_amsl <= ?
-              AND a.altitude_ceiling_ft_amsl >= ?
-            """,
-            (
-                lon1, lat1, lon2, lat2, buffer_deg,
-                lon1, lat1, lon2, lat2,
-                altitude_ft, altitude_ft,
-            ),
-        ).fetchall()
-
-        return [
-            AirspaceIntersection(
-                identifier=row["espace_nom"],
-                airspace_type=_TYPE_MAP.get(row["espace_type"], AirspaceType.OTHER),
-                airspace_class=row["Classe"],
-                lower_limit_ft=row["altitude_floor_ft_amsl"],
-                upper_limit_ft=row["altitude_ceiling_ft_amsl"],
-                intersection_type=IntersectionType.NEARBY,
-                partie_id=str(row["partie_pk"]),
-                volume_id=str(row["volume_pk"]),
-            )
-            for row in rows
-            if row["espace_type"] not in _EXCLUDED_TYPES
-        ]
+    @staticmethod
+    def _corridor_intersection(fields: Sequence) -> AirspaceIntersection:
+        """Build a corridor (nearby) airspace from a corridor query row, minus ``seq``."""
+        name, espace_type, airspace_class, floor, ceiling, partie_pk, volume_pk = fields
+        return AirspaceIntersection(
+            identifier=name,
+            airspace_type=_GET_TYPE(espace_type, _OTHER),
+            airspace_class=airspace_class,
+            lower_limit_ft=floor,
+            upper_limit_ft=ceiling,
+            intersection_type=IntersectionType.NEARBY,
+            partie_id=str(partie_pk),
+            volume_id=str(volume_pk),
+        )
 
     def _get_services(
         self,
@@ -306,92 +821,91 @@ class AirspaceQueryService:
     ) -> list[ServiceInfo]:
         """Fetch ATC services and frequencies for an airspace.
 
-        For SIV/TMA types without direct services, falls back to name-based lookup.
+        For SIV/TMA types without direct services, falls back to name-based lookup,
+        all in one query (see ``_SERVICES_SQL``), or one strategy at a time
+        when that query fails.
         Returns empty list if services lookup fails (graceful degradation).
         """
-        rows: list = []
-
-        # Strategy 1: Direct link via EspaceRef
-        if espace_pk is not None:
-            try:
-                rows = conn.execute(
-                    """
-                    SELECT s.IndicLieu, s.IndicService,
-                           f.Frequence, f.Espacement
-                    FROM Service s
-                    LEFT JOIN Frequence f ON f.ServiceRef = s.pk
-                    WHERE s.EspaceRef = ?
-                    ORDER BY f.pk
-                    """,
-                    (espace_pk,),
-                ).fetchall()
-            except sqlite3.OperationalError as e:
-                logger.warning("Service lookup failed with EspaceRef: %s", e)
-
-        # Strategy 2: Name-based fallback for SIV/TMA without direct services
-        if not rows and espace_nom and espace_type in ("SIV", "TMA"):
+        service_type = parent_name = sector = None
+        if espace_nom and espace_type in ("SIV", "TMA"):
             service_type = "Information" if espace_type == "SIV" else "Approche"
-            # Extract sector suffix if present (e.g., "PARIS NORD" → sector "NORD")
-            sector_filter = None
-            parent_name = espace_nom
+            # Sector suffix if present (e.g., "PARIS NORD" → parent "PARIS", sector "NORD")
             if " " in espace_nom:
                 parts = espace_nom.split()
                 parent_name = parts[0]
-                sector_filter = parts[-1].upper()  # Last word as sector (NORD, SUD, OUEST, etc.)
-
-            # Try exact match first
+                sector = parts[-1].upper()
+
+        strategy_params = (
+            (espace_pk,),
+            (espace_nom, service_type),
+            (parent_name, service_type, sector),
+            (parent_name, service_type),
+        )
+        try:
+            rows = conn.execute(
+                _SERVICES_SQL, tuple(p for params in strategy_params for p in params)
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            # One strategy's schema is missing: run the others on their own
+            logger.warning("Service lookup failed, querying strategies separately: %s", e)
+            rows = self._get_services_by_strategy(conn, strategy_params)
+        # Keep only the first strategy that found anything
+        return self._build_services([row for row in rows if row["prio"] == rows[0]["prio"]])
+
+    @staticmethod
+    def _get_services_by_strategy(
+        conn: sqlite3.Connection, strategy_params: tuple[tuple[Any, ...], ...]
+    ) -> list[sqlite3.Row]:
+        """Rows of the first service strategy with any, skipping failing ones."""
+        for sql, params in zip(_SERVICE_STRATEGIES_SQL, strategy_params, strict=True):
             try:
-                rows = conn.execute(
-                    """
-                    SELECT s.IndicLieu, s.IndicService,
-                           f.Frequence, f.Espacement, f.SecteurSituation
-                    FROM Service s
-                    LEFT JOIN Frequence f ON f.ServiceRef = s.pk
-                    WHERE UPPER(s.IndicLieu) = UPPER(?)
-                      AND s.IndicService = ?
-                    ORDER BY f.pk
-                    """,
-                    (espace_nom, service_type),
-                ).fetchall()
+                rows = conn.execute(sql + "ORDER BY freq_pk", params).fetchall()
             except sqlite3.OperationalError as e:
-                logger.debug("Exact name service lookup failed: %s", e)
-
-            # Fallback to parent name with sector filtering
-            if not rows and parent_name != espace_nom:
-                try:
-                    all_rows = conn.execute(
-                        """
-                        SELECT s.IndicLieu, s.IndicService,
-                               f.Frequence, f.Espacement, f.SecteurSituation
-                        FROM Service s
-                        LEFT JOIN Frequence f ON f.ServiceRef = s.pk
-                        WHERE UPPER(s.IndicLieu) = UPPER(?)
-                          AND s.IndicService = ?
-                        ORDER BY f.pk
-                        """,
-                        (parent_name, service_type),
-                    ).fetchall()
-                    # Filter by sector if available
-                    if sector_filter and all_rows:
-                        rows = [r for r in all_rows if r["SecteurSituation"] and sector_filter in r["SecteurSituation"].upper()]
-                    if not rows:
-                        rows = all_rows  # Fallback to all if no sector match
-                except sqlite3.OperationalError as e:
-                    logger.debug("Parent name service lookup failed: %s", e)
+                logger.warning("Service lookup failed: %s", e)
+                continue
+            if rows:
+                return rows
+        return []
+
+    def _get_services_bulk(
+        self, conn: sqlite3.Connection, espace_pks: set[int]
+    ) -> dict[int, list[ServiceInfo]]:
+        """Directly linked services of several airspaces, in one query.
+
+        Airspaces without any are left out of the result.
+        """
+        if not espace_pks:
+            return {}
+        sql = _SERVICES_BULK_TEMPLATE.format(placeholders=", ".join("?" * len(espace_pks)))
+        try:
+            rows = conn.execute(sql, tuple(espace_pks)).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning("Service lookup failed: %s", e)
+            return {}
+        by_espace: dict[int, list[sqlite3.Row]] = {}
+        for row in rows:
+            by_espace.setdefault(row["EspaceRef"], []).append(row)
+        return {pk: self._build_services(pk_rows) for pk, pk_rows in by_espace.items()}
 
+    @staticmethod
+    def _build_services(rows: list[sqlite3.Row]) -> list[ServiceInfo]:
+        """Group service/frequency rows into one :class:`ServiceInfo` per service."""
         services: dict[str, ServiceInfo] = {}
         for row in rows:
-            key = f"{row['IndicLieu']}:{row['IndicService']}"
-            if key not in services:
-                services[key] = ServiceInfo(
-                    callsign=row["IndicLieu"] or "",
-                    service_type=row["IndicService"] or "",
+            callsign, service_type = row["IndicLieu"], row["IndicService"]
+            key = f"{callsign}:{service_type}"
+            svc = services.get(key)
+            if svc is None:
+                svc = services[key] = ServiceInfo(
+                    callsign=callsign or "",
+                    service_type=service_type or "",
                     frequencies=[],
                 )
-            if row["Frequence"]:
-                services[key].frequencies.append(
+            frequency = row["Frequence"]
+            if frequency:
+                svc.frequencies.append(
                     FrequencyInfo(
-                        frequency_mhz=str(row["Frequence"]),
+                        frequency_mhz=str(frequency),
                         spacing=row["Espacement"],
                     )
                 )
@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import logging
+import queue
 import sqlite3
 import tempfile
+import threading
+from contextlib import closing
 from pathlib import Path
 
 from core.persistence.errors import SpatiaLiteNotReadyError
@@ -12,13 +15,35 @@ from core.persistence.spatialite.spatialite_loader import enable_spatialite
 
 logger = logging.getLogger(__name__)
 
+# How long acquire() blocks on a full pool before re-checking it
+_POOL_WAIT_S = 0.05
+
+# Reference DB files are written once (download) and then only read:
+# ``immutable`` lets SQLite skip file locking and change detection, so a
+# file rebuilt in place is never seen by an already open connection.
+# Rewriting a DB under live readers is unsupported; the pool only notices
+# the new mtime on the next ``acquire()`` and reopens from there.
+_URI_PARAMS = "mode=ro&immutable=1"
+
+# Per-connection pragmas for read-heavy spatial scans: memory-map the DB
+# (up to 1 GiB) and keep the route scratch tables in memory
+_CONNECTION_PRAGMAS = (
+    "PRAGMA mmap_size = 1073741824",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Prepared statements kept per connection, keyed by SQL text: the query
+# services run a small fixed set of statements, so they all stay parsed
+_STATEMENT_CACHE_SIZE = 256
+
 
 class SpatiaLiteManager:
     """Manages the read-only SpatiaLite reference database lifecycle.
 
     - Downloads the current AIRAC database from GCS (or uses a local path).
     - Opens read-only connections with SpatiaLite loaded.
-    - Thread-safe: each caller gets its own connection (read-only = no locks).
+    - Thread-safe: each caller gets its own connection (read-only = no locks),
+      or borrows one from a bounded pool via ``acquire()`` / ``release()``.
     """
 
     def __init__(
@@ -27,6 +52,7 @@ class SpatiaLiteManager:
         db_prefix: str = "airac",
         db_filename: str = "skypath.db",
         local_dir: str | None = None,
+        max_connections: int = 8,
     ):
         self._bucket_name = bucket_name
         self._db_prefix = db_prefix
@@ -34,6 +60,17 @@ class SpatiaLiteManager:
         self._local_dir = Path(local_dir or tempfile.gettempdir())
         self._current_cycle: str | None = None
         self._local_path: Path | None = None
+        self._tables: frozenset[str] | None = None  # Schema of the current DB
+        # Bumped whenever a DB is (re)selected or its mtime changes:
+        # connections are immutable snapshots of the file they were opened on
+        self._db_generation = 0
+        self._db_mtime_ns: int | None = None
+        # Connection pool: idle connections, plus the DB generation of each open one
+        self._max_connections = max_connections
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._pool_generations: dict[int, int] = {}
+        self._pool_open = 0
+        self._pool_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Properties
@@ -43,6 +80,24 @@ class SpatiaLiteManager:
     def current_cycle(self) -> str | None:
         return self._current_cycle
 
+    @property
+    def db_path(self) -> Path | None:
+        """Local file of the database currently served (changes on cycle swap)."""
+        return self._local_path
+
+    @property
+    def db_version(self) -> tuple[Path, int] | None:
+        """``(path, mtime_ns)`` of the served database, ``None`` when not ready.
+
+        Changes on a cycle swap and when the file is rewritten in place.
+        """
+        if self._local_path is None:
+            return None
+        try:
+            return self._local_path, self._local_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
     @property
     def is_ready(self) -> bool:
         return self._local_path is not None and self._local_path.exists()
@@ -72,8 +127,7 @@ class SpatiaLiteManager:
 
         if local_path.exists():
             logger.info("SpatiaLite DB already cached: %s", local_path)
-            self._current_cycle = cycle
-            self._local_path = local_path
+            self._set_db(local_path, cycle)
             return local_path
 
         gcs_path = f"{self._db_prefix}/{cycle}/{self._db_filename}"
@@ -82,8 +136,7 @@ class SpatiaLiteManager:
         blob = bucket.blob(gcs_path)
         blob.download_to_filename(str(local_path))
 
-        self._current_cycle = cycle
-        self._local_path = local_path
+        self._set_db(local_path, cycle)
         logger.info("Downloaded SpatiaLite DB: %s (%d bytes)", local_path, local_path.stat().st_size)
         return local_path
 
@@ -91,8 +144,26 @@ class SpatiaLiteManager:
         """Use a local database file directly (for dev/testing)."""
         if not path.exists():
             raise FileNotFoundError(f"SpatiaLite DB not found: {path}")
+        self._set_db(path, cycle)
+
+    def _set_db(self, path: Path, cycle: str) -> None:
         self._local_path = path
         self._current_cycle = cycle
+        self._tables = None
+        self._db_generation += 1
+        self._db_mtime_ns = path.stat().st_mtime_ns
+
+    def _check_mtime(self) -> None:
+        """Start a new DB generation when the served file changed on disk."""
+        version = self.db_version
+        if version is None or version[1] == self._db_mtime_ns:
+            return
+        with self._pool_lock:
+            if version[1] != self._db_mtime_ns:
+                logger.warning("SpatiaLite DB rewritten in place: %s", version[0])
+                self._tables = None
+                self._db_generation += 1
+                self._db_mtime_ns = version[1]
 
     # ------------------------------------------------------------------
     # Connection
@@ -104,13 +175,100 @@ class SpatiaLiteManager:
         Each call returns a fresh connection. The caller is responsible
         for closing it (use ``with`` or ``try/finally``).
         """
+        self._check_ready()
+        return self._open()
+
+    def _check_ready(self) -> None:
         if not self.is_ready:
             raise SpatiaLiteNotReadyError(
                 "SpatiaLite database not available. Call download() or use_local() first."
             )
 
-        uri = f"file:{self._local_path}?mode=ro"
-        conn = sqlite3.connect(uri, uri=True)
+    def _uri(self) -> str:
+        return f"file:{self._local_path}?{_URI_PARAMS}"
+
+    def _open(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._uri(),
+            uri=True,
+            check_same_thread=check_same_thread,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+        )
         conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
         enable_spatialite(conn)
         return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Borrow a pooled read-only connection; hand it back with ``release()``.
+
+        Idle connections are reused with SpatiaLite already loaded. Up to
+        ``max_connections`` are opened on demand, after which callers wait
+        for one to be released. Connections opened before the last
+        ``download()`` / ``use_local()`` (cycle swap), or before the file's
+        mtime last changed (rebuilt in place), are closed instead of reused.
+        """
+        self._check_ready()
+        self._check_mtime()
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                conn = self._open_pooled()
+                if conn is None:
+                    try:
+                        conn = self._pool.get(timeout=_POOL_WAIT_S)
+                    except queue.Empty:
+                        continue
+            if self._pool_generations.get(id(conn)) == self._db_generation:
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection obtained from ``acquire()`` to the pool."""
+        if self._pool_generations.get(id(conn)) == self._db_generation:
+            self._pool.put(conn)
+        else:
+            self._discard(conn)
+
+    def _open_pooled(self) -> sqlite3.Connection | None:
+        """Open a pool connection if below capacity, else ``None``."""
+        generation = self._db_generation
+        with self._pool_lock:
+            if self._pool_open >= self._max_connections:
+                return None
+            self._pool_open += 1  # Reserve the slot before the slow extension load
+        try:
+            # A leased connection is only used by one thread at a time
+            conn = self._open(check_same_thread=False)
+        except BaseException:
+            with self._pool_lock:
+                self._pool_open -= 1
+            raise
+        with self._pool_lock:
+            self._pool_generations[id(conn)] = generation
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._pool_lock:
+            if self._pool_generations.pop(id(conn), None) is not None:
+                self._pool_open -= 1
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Schema
+    # ------------------------------------------------------------------
+
+    def has_table(self, name: str) -> bool:
+        """Whether the current DB has a table or view *name* (read once per DB)."""
+        self._check_mtime()
+        if self._tables is None:
+            self._check_ready()
+            with closing(sqlite3.connect(self._uri(), uri=True)) as conn:
+                self._tables = frozenset(
+                    row[0] for row in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
+                    )
+                )
+        return name in self._tables
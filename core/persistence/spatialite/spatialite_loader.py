@@ -24,10 +24,14 @@ import sys
 import sqlite3
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Path or library name that loaded successfully in this process. Later
+# connections load it directly instead of probing the filesystem again.
+_resolved_library: Optional[str] = None
+
 
 class SpatiaLiteLoader:
     """Cross-platform SpatiaLite extension loader with auto-detection."""
@@ -60,8 +64,17 @@ class SpatiaLiteLoader:
         except Exception as e:
             raise RuntimeError(f"Cannot enable SQLite extensions: {e}")
 
+        global _resolved_library
+
+        # Fast path: reuse what worked for a previous connection
+        if _resolved_library is not None:
+            if self._try_load_by_name(conn, _resolved_library):
+                return True
+            _resolved_library = None
+
         # Try loading with different strategies
         loaded = False
+        source: Optional[str] = None
 
         # Strategy 1: Environment variable override
         env_path = os.environ.get("SPATIALITE_LIBRARY_PATH")
@@ -69,6 +82,7 @@ class SpatiaLiteLoader:
             if self._try_load_from_path(conn, Path(env_path)):
                 logger.info(f"Loaded SpatiaLite from SPATIALITE_LIBRARY_PATH: {env_path}")
                 loaded = True
+                source = env_path
 
         # Strategy 2: Platform-specific paths
         if not loaded:
@@ -78,6 +92,7 @@ class SpatiaLiteLoader:
                     if self._try_load_from_path(conn, path):
                         logger.info(f"Loaded SpatiaLite from: {path}")
                         loaded = True
+                        source = str(path)
                         break
                 else:
                     logger.debug(f"Path does not exist: {path}")
@@ -89,6 +104,7 @@ class SpatiaLiteLoader:
                 if self._try_load_by_name(conn, name):
                     logger.info(f"Loaded SpatiaLite using library name: {name}")
                     loaded = True
+                    source = name
                     break
 
         if not loaded:
@@ -101,10 +117,12 @@ class SpatiaLiteLoader:
             version = cursor.fetchone()
             if version:
                 logger.info(f"SpatiaLite version: {version[0]}")
-            return True
         except Exception as e:
             raise RuntimeError(f"SpatiaLite loaded but not functional: {e}")
 
+        _resolved_library = source
+        return True
+
     def _get_platform_search_paths(self) -> List[Path]:
         """Get platform-specific search paths for SpatiaLite library."""
         if self._platform == "win32":
@@ -6,11 +6,13 @@ from datetime import datetime, timezone
 
 import httpx
 
-from core.contracts.enums import CloudCover
+from core.contracts.enums import VALUE_MAPS, CloudCover
 from core.contracts.weather import CloudLayer, ObservationData
 
 BASE_URL = "https://aviationweather.gov/api/data/metar"
 
+_CLOUD_COVERS = VALUE_MAPS[CloudCover]
+
 
 class MetarClient:
     """Async HTTP client for METAR observations."""
@@ -76,9 +78,7 @@ def _parse_metar(raw: dict) -> ObservationData:
     for layer in raw.get("clouds", []):
         cover_str = layer.get("cover", "")
         base = layer.get("base")
-        cover_map = {"CLR": CloudCover.CLR, "FEW": CloudCover.FEW, "SCT": CloudCover.SCT,
-                     "BKN": CloudCover.BKN, "OVC": CloudCover.OVC}
-        cover = cover_map.get(cover_str)
+        cover = _CLOUD_COVERS.get(cover_str)
         if cover is not None and base is not None:
             clouds.append(CloudLayer(cover=cover, base_ft=base))
 
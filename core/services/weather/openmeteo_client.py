@@ -12,6 +12,9 @@ from core.services.weather.model_selector import MODEL_SLUGS
 
 BASE_URL = "https://api.open-meteo.com"
 
+# Pressure levels fetched for every point; ForecastData.*_levels follow this order.
+PRESSURE_LEVELS_HPA: tuple[int, ...] = (1000, 925, 850, 700)
+
 # Hourly variables to request
 _HOURLY_VARS = [
     "temperature_2m",
@@ -94,23 +97,10 @@ def _parse_forecast(data: dict) -> ForecastData:
         v = _first(key)
         return int(v) if v is not None else None
 
-    # Pressure level temperatures
-    temp_levels: dict[int, float] = {}
-    for hpa in [1000, 925, 850, 700]:
-        v = _first(f"temperature_{hpa}hPa")
-        if v is not None:
-            temp_levels[hpa] = v
-
-    # Pressure level winds
-    speed_levels: dict[int, float] = {}
-    dir_levels: dict[int, int] = {}
-    for hpa in [1000, 925, 850, 700]:
-        ws = _first(f"wind_speed_{hpa}hPa")
-        wd = _first(f"wind_direction_{hpa}hPa")
-        if ws is not None:
-            speed_levels[hpa] = ws
-        if wd is not None:
-            dir_levels[hpa] = int(wd)
+    # Pressure level values, aligned with PRESSURE_LEVELS_HPA
+    temp_levels = [_first(f"temperature_{hpa}hPa") for hpa in PRESSURE_LEVELS_HPA]
+    speed_levels = [_first(f"wind_speed_{hpa}hPa") for hpa in PRESSURE_LEVELS_HPA]
+    dir_levels = [_first_int(f"wind_direction_{hpa}hPa") for hpa in PRESSURE_LEVELS_HPA]
 
     return ForecastData(
         temperature_2m=_first("temperature_2m"),
@@ -17,7 +17,7 @@ from core.persistence.repositories.route_repo import RouteRepository
 from core.persistence.repositories.waypoint_repo import WaypointRepository
 from core.services.weather.metar_client import MetarClient
 from core.services.weather.model_selector import select_models
-from core.services.weather.openmeteo_client import OpenMeteoClient
+from core.services.weather.openmeteo_client import PRESSURE_LEVELS_HPA, OpenMeteoClient
 from core.services.weather.vfr_index import compute_vfr_index
 
 logger = logging.getLogger(__name__)
@@ -142,6 +142,7 @@ class SimulationService:
         return ModelResult(
             model=model,
             model_run_time=run_time,
+            pressure_levels_hpa=list(PRESSURE_LEVELS_HPA),
             points=points,
         )
 
@@ -215,6 +215,12 @@ class WeatherService:
         if "extra_vars" in model_config:
             base_variables.extend(model_config["extra_vars"])
 
+        # Levels used across the route, shared by every point's *_levels arrays
+        pressure_levels = sorted(
+            {self._altitude_to_pressure(wp.altitude_ft) for wp in waypoints},
+            reverse=True,
+        )
+
         # Query each waypoint separately with its specific altitude
         points: list[ModelPoint] = []
         for wp in waypoints:
@@ -245,7 +251,7 @@ class WeatherService:
 
                 hourly = data.get("hourly", {})
                 point = self._parse_waypoint_forecast_single(
-                    wp, hourly, pressure_level
+                    wp, hourly, pressure_level, pressure_levels
                 )
                 points.append(point)
             except httpx.HTTPError as e:
@@ -266,6 +272,7 @@ class WeatherService:
         return ModelResult(
             model=model_config["enum"],
             model_run_time=datetime.utcnow(),
+            pressure_levels_hpa=pressure_levels,
             points=points,
         )
 
@@ -274,9 +281,14 @@ class WeatherService:
         wp: WaypointContext,
         hourly: dict[str, Any],
         pressure_level: int,
+        pressure_levels: list[int],
         location_idx: int | None = None,
     ) -> ModelPoint:
-        """Parse forecast data for a single waypoint from hourly arrays."""
+        """Parse forecast data for a single waypoint from hourly arrays.
+
+        Only *pressure_level* is fetched for this waypoint; the other slots of
+        the ``*_levels`` arrays (aligned with *pressure_levels*) stay ``None``.
+        """
         # Find closest time index
         times = hourly.get("time", [])
         target_time = wp.estimated_time_utc.strftime("%Y-%m-%dT%H:00")
@@ -297,6 +309,11 @@ class WeatherService:
                 return vals[time_idx]
             return None
 
+        def at_level(value: Any) -> list[Any]:
+            return [value if p == pressure_level else None for p in pressure_levels]
+
+        wind_dir = get_value(f"wind_direction_{pressure_level}hPa")
+
         # Build forecast data
         forecast = ForecastData(
             temperature_2m=get_value("temperature_2m"),
@@ -312,15 +329,11 @@ class WeatherService:
             precipitation=get_value("precipitation"),
             pressure_msl=get_value("pressure_msl"),
             weather_code=get_value("weather_code"),
-            temperature_levels={
-                pressure_level: get_value(f"temperature_{pressure_level}hPa")
-            } if get_value(f"temperature_{pressure_level}hPa") is not None else {},
-            wind_speed_levels={
-                pressure_level: get_value(f"wind_speed_{pressure_level}hPa")
-            } if get_value(f"wind_speed_{pressure_level}hPa") is not None else {},
-            wind_direction_levels={
-                pressure_level: int(get_value(f"wind_direction_{pressure_level}hPa") or 0)
-            } if get_value(f"wind_direction_{pressure_level}hPa") is not None else {},
+            temperature_levels=at_level(get_value(f"temperature_{pressure_level}hPa")),
+            wind_speed_levels=at_level(get_value(f"wind_speed_{pressure_level}hPa")),
+            wind_direction_levels=at_level(
+                None if wind_dir is None else int(wind_dir)
+            ),
         )
 
         # Calculate VFR index
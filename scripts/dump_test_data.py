@@ -132,9 +132,10 @@ def main():
             forecast=ForecastData(
                 temperature_2m=8.0 - i * 0.5, wind_speed_10m=12.0, wind_direction_10m=270,
                 cloud_cover=30 + i * 5, visibility=8000, pressure_msl=1018.0,
-                temperature_levels={1000: 10.0, 925: 5.0, 850: 1.0},
-                wind_speed_levels={1000: 12.0, 925: 18.0, 850: 25.0},
-                wind_direction_levels={1000: 270, 925: 280, 850: 290},
+                # Aligned with ModelResult.pressure_levels_hpa below
+                temperature_levels=[10.0, 5.0, 1.0],
+                wind_speed_levels=[12.0, 18.0, 25.0],
+                wind_direction_levels=[270, 280, 290],
             ),
             vfr_index=VFRIndex(
                 status=VFRStatus.GREEN, visibility_ok=True,
@@ -148,6 +149,7 @@ def main():
         model_results=[ModelResult(
             model=ForecastModel.AROME_FRANCE,
             model_run_time=datetime(2026, 2, 5, 0, 0, tzinfo=timezone.utc),
+            pressure_levels_hpa=[1000, 925, 850],
             points=model_points,
         )],
     )
@@ -4,6 +4,7 @@ These tests parse the actual SD VFR KML file, build SkyWeb contract objects,
 and verify Firestore roundtrip serialization on the complete data graph.
 """
 
+import json
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -380,9 +381,9 @@ def _make_weather(route_data, route_id: str) -> WeatherSimulation:
                 cloud_cover=30 + i * 5,
                 visibility=8000,
                 pressure_msl=1018.0,
-                temperature_levels={1000: 10.0, 925: 5.0, 850: 1.0},
-                wind_speed_levels={1000: 12.0, 925: 18.0, 850: 25.0},
-                wind_direction_levels={1000: 270, 925: 280, 850: 290},
+                temperature_levels=[10.0, 5.0, 1.0],
+                wind_speed_levels=[12.0, 18.0, 25.0],
+                wind_direction_levels=[270, 280, 290],
             ),
             vfr_index=VFRIndex(
                 status=VFRStatus.GREEN,
@@ -402,6 +403,7 @@ def _make_weather(route_data, route_id: str) -> WeatherSimulation:
             ModelResult(
                 model=ForecastModel.AROME_FRANCE,
                 model_run_time=datetime(2026, 2, 5, 0, 0, tzinfo=timezone.utc),
+                pressure_levels_hpa=[1000, 925, 850],
                 points=model_points,
             ),
         ],
@@ -458,11 +460,12 @@ class TestEndToEndRoundtrip:
         data = weather.to_firestore()
         restored = WeatherSimulation.from_firestore(data)
 
-        # Pressure level dict keys survive JSON roundtrip (str→int coercion)
-        forecast = restored.model_results[0].points[0].forecast
-        assert 1000 in forecast.temperature_levels
-        assert 925 in forecast.wind_speed_levels
-        assert forecast.temperature_levels[1000] == 10.0
+        # Pressure level arrays stay aligned with the shared level list
+        result = restored.model_results[0]
+        forecast = result.points[0].forecast
+        assert result.pressure_levels_hpa == [1000, 925, 850]
+        assert result.level_values(forecast.temperature_levels)[1000] == 10.0
+        assert result.level_values(forecast.wind_speed_levels)[925] == 18.0
 
     def test_service_result_wraps_route(self, route_data):
         _, route = route_data
@@ -481,6 +484,14 @@ class TestEndToEndRoundtrip:
         assert result.error.code == "KML_PARSE_ERROR"
         assert result.error.details["line"] == 42
 
+    def test_service_result_to_json(self, route_data):
+        _, route = route_data
+        payload = json.loads(ServiceResult.ok(route, duration_ms=1.0).to_json())
+        assert payload["success"] is True
+        assert payload["data"]["name"] == ROUTE_NAME
+        assert payload["error"] is None
+        assert datetime.fromisoformat(payload["timestamp"]).tzinfo is not None
+
     def test_observation_enrichment(self):
         """Verify post-flight METAR observation attaches to WaypointContext."""
         ctx = WaypointContext(
@@ -276,3 +276,13 @@ class TestRouteProjection:
         assert data["assumptions"]["cruise_speed_kt"] == 100
         assert "total_fuel_liters" not in data  # None excluded
         assert "generated_at" in data
+
+
+class TestFirestoreMany:
+    def test_list_roundtrip_via_cached_adapter(self):
+        legs = [RouteLeg(from_seq=i, to_seq=i + 1, planned_altitude_ft=2500) for i in range(1, 4)]
+        docs = RouteLeg.to_firestore_many(legs)
+        assert docs == [leg.to_firestore() for leg in legs]
+        assert RouteLeg.from_firestore_many(docs) == legs
+        assert RouteLeg._list_adapter() is RouteLeg._list_adapter()
+        assert Route._list_adapter() is not RouteLeg._list_adapter()
@@ -30,6 +30,16 @@ class TestWaypoint:
         wp = Waypoint(name="LFXU", latitude=48.9986, longitude=1.9417)
         assert wp.id == waypoint_id("LFXU", 48.9986, 1.9417)
 
+    def test_waypoint_id_memoised(self):
+        waypoint_id.cache_clear()
+        waypoint_id("MOR1V", 48.9412, 1.9532)
+        waypoint_id("MOR1V", 48.9412, 1.9532)
+        assert waypoint_id.cache_info().hits == 1
+
+    def test_waypoint_id_cache_keeps_int_and_float_apart(self):
+        assert waypoint_id("X", 48, 2) != waypoint_id("X", 48.0, 2.0)
+        assert waypoint_id("X", 48.0, 2.0) == hashlib.md5(b"X:48.0:2.0").hexdigest()[:16]
+
     def test_default_location_type(self):
         wp = Waypoint(name="MOR1V", latitude=48.0, longitude=1.0)
         assert wp.location_type == LocationType.GPS_POINT
@@ -2,6 +2,8 @@
 
 from datetime import datetime, timezone
 
+import pytest
+
 from core.contracts.weather import (
     ForecastData,
     ModelPoint,
@@ -15,26 +17,78 @@ from core.contracts.enums import ForecastModel, VFRStatus
 
 
 class TestForecastData:
-    def test_pressure_level_dict(self):
+    def test_pressure_level_arrays(self):
         fd = ForecastData(
             temperature_2m=15.0,
-            temperature_levels={1000: 12.5, 925: 8.1, 850: 3.2},
-            wind_speed_levels={925: 12.0, 850: 18.0},
-            wind_direction_levels={925: 270, 850: 280},
+            temperature_levels=[12.5, 8.1, 3.2],
+            wind_speed_levels=[None, 12.0, 18.0],
+            wind_direction_levels=[None, 270, 280],
         )
-        assert fd.temperature_levels[925] == 8.1
-        assert fd.wind_speed_levels[850] == 18.0
+        assert fd.temperature_levels[1] == 8.1
+        assert fd.wind_speed_levels[2] == 18.0
 
     def test_pressure_level_serialization(self):
-        """Firestore stores dict keys as strings; Pydantic coerces back to int."""
-        fd = ForecastData(temperature_levels={1000: 12.5, 925: 8.1})
+        fd = ForecastData(temperature_levels=[12.5, 8.1])
         data = fd.to_firestore()
-        # JSON mode converts int keys to strings
-        assert "1000" in data["temperature_levels"]
+        assert data["temperature_levels"] == [12.5, 8.1]
 
         restored = ForecastData.from_firestore(data)
-        assert 1000 in restored.temperature_levels
-        assert restored.temperature_levels[1000] == 12.5
+        assert restored.temperature_levels == [12.5, 8.1]
+
+
+class TestModelResultLevels:
+    _RUN = datetime(2026, 3, 15, 6, 0, tzinfo=timezone.utc)
+    _VFR = {"status": "green", "visibility_ok": True, "ceiling_ok": True, "wind_ok": True}
+
+    def test_level_values_maps_back_to_hpa(self):
+        mr = ModelResult(
+            model=ForecastModel.AROME_FRANCE,
+            model_run_time=self._RUN,
+            pressure_levels_hpa=[1000, 925, 850],
+            points=[],
+        )
+        assert mr.level_values([12.5, None, 3.2]) == {1000: 12.5, 850: 3.2}
+
+    def test_legacy_level_dicts_upgraded(self):
+        """Documents stored before the array layout still load."""
+        data = {
+            "model": "arome_france",
+            "model_run_time": self._RUN.isoformat(),
+            "points": [
+                {
+                    "waypoint_index": 0,
+                    "forecast": {"temperature_levels": {"1000": 10.0, "925": 5.0}},
+                    "vfr_index": self._VFR,
+                },
+                {
+                    "waypoint_index": 1,
+                    "forecast": {"wind_speed_levels": {"850": 25.0}},
+                    "vfr_index": self._VFR,
+                },
+            ],
+        }
+        mr = ModelResult.from_firestore(data)
+        assert mr.pressure_levels_hpa == [1000, 925, 850]
+        assert mr.points[0].forecast.temperature_levels == [10.0, 5.0, None]
+        assert mr.points[1].forecast.wind_speed_levels == [None, None, 25.0]
+
+
+class TestObservationData:
+    _TIME = datetime(2026, 3, 15, 10, 0, tzinfo=timezone.utc)
+
+    def test_valid_icao_and_category(self):
+        obs = ObservationData(observation_time=self._TIME, icao="LFXU", flight_category="MVFR")
+        assert obs.icao == "LFXU"
+        assert obs.flight_category == "MVFR"
+
+    @pytest.mark.parametrize("icao", ["lfxu", "LFX", "LFXU1", "LF1U", "ÉFXU"])
+    def test_invalid_icao_rejected(self, icao):
+        with pytest.raises(Exception, match="icao"):
+            ObservationData(observation_time=self._TIME, icao=icao)
+
+    def test_invalid_flight_category_rejected(self):
+        with pytest.raises(Exception, match="flight_category"):
+            ObservationData(observation_time=self._TIME, icao="LFXU", flight_category="VMC")
 
 
 class TestVFRIndex:
@@ -155,6 +209,16 @@ class TestWeatherSimulation:
         assert len(restored.model_results) == 1
         assert restored.model_results[0].points[1].vfr_index.status == VFRStatus.YELLOW
 
+    def test_loads_iso_strings_and_native_datetimes(self):
+        """Stored docs carry ISO strings; Firestore Timestamps arrive as datetimes."""
+        sim = self._make_simulation()
+        data = sim.to_firestore()
+        assert isinstance(data["simulated_at"], str)
+        assert WeatherSimulation.from_firestore(data).simulated_at == sim.simulated_at
+
+        data["simulated_at"] = sim.simulated_at
+        assert WeatherSimulation.from_firestore(data).simulated_at == sim.simulated_at
+
     def test_observation_enrichment(self):
         """Waypoint context can carry actual observation after flight."""
         ctx = WaypointContext(
@@ -21,13 +21,15 @@ def _setup_mock_storage():
     sys.modules["google.cloud"] = mock_google.cloud
     sys.modules["google.cloud.storage"] = mock_storage
 
-    return mock_client
+    return mock_client, mock_storage
 
 
 class TestGCSUploader:
     def test_upload_cycle_calls_correct_paths(self, tmp_path: Path):
         """Verify upload constructs correct GCS blob paths."""
-        mock_client = _setup_mock_storage()
+        mock_client, mock_storage = _setup_mock_storage()
+        upload_many = mock_storage.transfer_manager.upload_many_from_filenames
+        upload_many.return_value = [None]
 
         # Create a fake DB file
         db_path = tmp_path / "skypath_2604.db"
@@ -35,7 +37,7 @@ class TestGCSUploader:
 
         # Create fake tile files
         tiles_dir = tmp_path / "tiles"
-        tile_path = tiles_dir / "airspaces" / "6" / "32" / "22.json"
+        tile_path = tiles_dir / "airspaces" / "6" / "32" / "22.json.gz"
         tile_path.parent.mkdir(parents=True)
         tile_path.write_text('{"type":"FeatureCollection","features":[]}')
 
@@ -54,10 +56,34 @@ class TestGCSUploader:
 
         assert summary["cycle"] == "2604"
         assert summary["db_uploaded"]
-        assert summary["tiles_uploaded"] >= 1
+        assert summary["tiles_uploaded"] == 1
+        assert summary["tiles_failed"] == 0
+
+        args, kwargs = upload_many.call_args
+        assert args == (mock_tiles_bucket, ["airspaces/6/32/22.json.gz"])
+        assert kwargs["source_directory"] == str(tiles_dir)
+        assert kwargs["blob_name_prefix"] == "2604/"
+        assert kwargs["additional_blob_attributes"]["content_encoding"] == "gzip"
+
+    def test_upload_cycle_counts_failed_tiles(self, tmp_path: Path):
+        _, mock_storage = _setup_mock_storage()
+        mock_storage.transfer_manager.upload_many_from_filenames.return_value = [
+            None, RuntimeError("503"),
+        ]
+        db_path = tmp_path / "skypath.db"
+        db_path.write_text("fake db")
+        tiles_dir = tmp_path / "tiles"
+        for name in ("a.json.gz", "b.json.gz"):
+            (tiles_dir / name).parent.mkdir(parents=True, exist_ok=True)
+            (tiles_dir / name).write_text("{}")
+
+        summary = GCSUploader().upload_cycle("2604", db_path, tiles_dir)
+
+        assert summary["tiles_uploaded"] == 1
+        assert summary["tiles_failed"] == 1
 
     def test_set_active_cycle(self):
-        mock_client = _setup_mock_storage()
+        mock_client, _ = _setup_mock_storage()
 
         uploader = GCSUploader()
         uploader.set_active_cycle("2604")
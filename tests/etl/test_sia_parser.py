@@ -6,7 +6,7 @@ from pathlib import Path
 
 import pytest
 
-from core.etl.sia_parser import ParsedSIA, parse_sia_xml
+from core.etl.sia_parser import ParsedSIA, iter_sia_rows, parse_sia_xml
 
 # Minimal SIA XML fixture
 MINIMAL_XML = """\
@@ -136,3 +136,19 @@ class TestSIAParser:
     def test_returns_parsed_sia_type(self, xml_path):
         data = parse_sia_xml(xml_path)
         assert isinstance(data, ParsedSIA)
+
+    def test_iter_rows_streams_in_document_order(self, xml_path):
+        tags = [tag for tag, _ in iter_sia_rows(xml_path)]
+        assert tags == [
+            "Espace", "Espace", "Partie", "Volume", "Geometrie",
+            "Service", "Frequence", "Ad", "Rwy",
+        ]
+
+    def test_parsed_rows_match_stream(self, xml_path):
+        assert list(parse_sia_xml(xml_path).rows()) == list(iter_sia_rows(xml_path))
+
+    def test_iter_rows_attaches_wkb(self, xml_path):
+        shapely = pytest.importorskip("shapely")
+        geometries = [row for tag, row in iter_sia_rows(xml_path, wkb=True) if tag == "Geometrie"]
+        geom = shapely.from_wkb(geometries[0]["WKB"])
+        assert geom.equals(shapely.from_wkt(geometries[0]["WKT"]))
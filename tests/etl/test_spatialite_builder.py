@@ -0,0 +1,90 @@
+"""Tests for the SpatiaLite builder's row loading.
+
+Runs on plain SQLite: mod_spatialite is not required, so these tests
+avoid Geometrie rows (their insert calls GeomFromText).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from core.etl.spatialite_builder import SpatiaLiteBuilder
+
+
+@pytest.fixture
+def conn(tmp_path):
+    builder = SpatiaLiteBuilder(tmp_path / "test.db")
+    c = sqlite3.connect(":memory:")
+    builder._create_tables(c)
+    yield builder, c
+    c.close()
+
+
+class TestInsertRows:
+    def test_children_linked_to_parents(self, conn):
+        builder, c = conn
+        builder._insert_rows(c, [
+            ("Espace", {"EspaceId": "ESP001", "Nom": "PARIS TMA 1"}),
+            ("Partie", {"PartieId": "P001", "EspaceId": "ESP001", "Nom": "Partie 1"}),
+            ("Volume", {"PartieId": "P001", "PlafondVal": "6500"}),
+            ("Ad", {"AdCode": "LFXU", "ArpLat": "48.9897"}),
+            ("Rwy", {"AdCode": "LFXU", "Identifiant": "12/30", "Longueur": "700"}),
+        ])
+        row = c.execute("""
+            SELECT e.Nom, v.PlafondVal FROM Volume v
+            JOIN Partie p ON v.partie_pk = p.pk
+            JOIN Espace e ON p.espace_pk = e.pk
+        """).fetchone()
+        assert row == ("PARIS TMA 1", "6500")
+        assert c.execute(
+            "SELECT r.Longueur, a.ArpLat FROM Rwy r JOIN Ad a ON r.ad_pk = a.pk"
+        ).fetchone() == (700.0, 48.9897)
+
+    def test_child_before_parent(self, conn):
+        builder, c = conn
+        builder._insert_rows(c, [
+            ("Partie", {"PartieId": "P001", "EspaceId": "ESP001"}),
+            ("Espace", {"EspaceId": "ESP001", "Nom": "LATE"}),
+        ])
+        assert c.execute(
+            "SELECT e.Nom FROM Partie p JOIN Espace e ON p.espace_pk = e.pk"
+        ).fetchone() == ("LATE",)
+
+    def test_unknown_parent_is_null(self, conn):
+        builder, c = conn
+        builder._insert_rows(c, [("Volume", {"PartieId": "MISSING", "PlafondVal": "6500"})])
+        assert c.execute("SELECT partie_pk FROM Volume").fetchone() == (None,)
+
+    def test_batches_flushed(self, conn, monkeypatch):
+        monkeypatch.setattr("core.etl.spatialite_builder._BATCH_SIZE", 3)
+        builder, c = conn
+        rows = [("Service", {"pk": str(i), "IndicLieu": "LFPG"}) for i in range(7)]
+        builder._insert_rows(c, rows)
+        assert c.execute("SELECT COUNT(*) FROM Service").fetchone() == (7,)
+
+    def test_numeric_columns_coerced(self, conn):
+        builder, c = conn
+        builder._insert_rows(c, [
+            ("Rwy", {"AdCode": "LFXU", "Principal": "1", "LatSeuil1": "48.99",
+                     "LonSeuil1": "", "LDA1": "n/a"}),
+        ])
+        assert c.execute(
+            "SELECT Principal, LatSeuil1, LonSeuil1, LDA1, LDA2 FROM Rwy"
+        ).fetchone() == (1, 48.99, None, None, None)
+
+
+class TestIndexes:
+    def test_fk_indexes_created(self, conn):
+        builder, c = conn
+        builder._create_fk_indexes(c)
+        names = {r[0] for r in c.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_partie_espace", "idx_volume_partie", "idx_geom_partie", "idx_rwy_ad"} <= names
+
+    def test_airspace_altitude_index_created(self, conn):
+        builder, c = conn
+        c.execute("ALTER TABLE Geometrie ADD COLUMN geom BLOB")  # AddGeometryColumn stand-in
+        builder._create_materialized_view(c)
+        names = {r[0] for r in c.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_airspace_alt" in names
@@ -2,9 +2,25 @@
 
 from __future__ import annotations
 
+import gzip
+import json
 import math
+import sqlite3
+import sys
 
-from core.etl.tile_generator import tile_bbox
+import pytest
+
+from core.etl.tile_generator import (
+    _FEATURE_TEMPLATE,
+    _TILE_SQL,
+    _TYPE_FILTER,
+    TileGenerator,
+    _json_scalar,
+    _types_param,
+    tile_bbox,
+    tile_edges,
+    tile_range,
+)
 
 
 class TestTileBbox:
@@ -47,3 +63,144 @@ class TestTileBbox:
         assert lon_max <= 10
         assert lat_min > 40
         assert lat_max < 55
+
+
+class TestTileEdges:
+    def test_edges_match_tile_bbox(self):
+        for z in range(5):
+            lons, lats = tile_edges(z)
+            for x in range(2**z):
+                for y in range(2**z):
+                    bbox = (lons[x], lats[y + 1], lons[x + 1], lats[y])
+                    # numpy and math trig may differ in the last ulp
+                    assert bbox == pytest.approx(tile_bbox(z, x, y), rel=1e-12, abs=1e-12)
+
+    def test_pure_python_fallback_matches(self, monkeypatch):
+        pytest.importorskip("numpy")
+        lons, lats = tile_edges(6)
+        monkeypatch.setitem(sys.modules, "numpy", None)
+        fallback = tile_edges(6)
+        assert fallback[0] == pytest.approx(lons, rel=1e-12, abs=1e-12)
+        assert fallback[1] == pytest.approx(lats, rel=1e-12, abs=1e-12)
+
+
+class TestTileRange:
+    def _touching(self, z, bbox):
+        lon_min, lat_min, lon_max, lat_max = bbox
+        hits = set()
+        for x in range(2**z):
+            for y in range(2**z):
+                t_lon_min, t_lat_min, t_lon_max, t_lat_max = tile_bbox(z, x, y)
+                if (t_lon_min <= lon_max and t_lon_max >= lon_min
+                        and t_lat_min <= lat_max and t_lat_max >= lat_min):
+                    hits.add((x, y))
+        return hits
+
+    def test_matches_brute_force(self):
+        for bbox in [(1.9, 48.5, 2.6, 49.1), (-5.0, 41.0, 9.5, 51.5), (2.3, 48.8, 2.3, 48.8)]:
+            for z in range(1, 8):
+                x_lo, x_hi, y_lo, y_hi = tile_range(z, *bbox)
+                got = {(x, y) for x in range(x_lo, x_hi + 1) for y in range(y_lo, y_hi + 1)}
+                assert got == self._touching(z, bbox)
+
+    def test_edge_on_tile_boundary_includes_neighbour(self):
+        # lon 0 is the edge between x=0 and x=1 at zoom 1
+        x_lo, x_hi, _, _ = tile_range(1, 0.0, 10.0, 5.0, 20.0)
+        assert (x_lo, x_hi) == (0, 1)
+
+
+class TestTypeFilter:
+    def test_json_bound_filter_matches_in_list(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (espace_type TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?)", [("TMA",), ("CTR",), ("FIR",)])
+        sql = f"SELECT espace_type FROM t WHERE 1{_TYPE_FILTER} ORDER BY rowid"
+
+        rows = conn.execute(sql, {"types": _types_param(["FIR", "TMA"])}).fetchall()
+        assert rows == [("TMA",), ("FIR",)]
+        assert _types_param(None) is None
+
+    def test_tile_sql_variants(self):
+        assert _TYPE_FILTER not in _TILE_SQL[False, False]
+        assert _TILE_SQL[True, True].rstrip().endswith(_TYPE_FILTER.strip())
+        assert "ROWID IN" in _TILE_SQL[True, False]
+
+
+class TestWorkUnits:
+    def test_stripes_cover_each_zoom_exactly_once(self, tmp_path):
+        gen = TileGenerator(tmp_path / "db", tmp_path / "tiles")
+        covered: dict[int, list[int]] = {}
+        for z, x_range, _, _ in gen._work_units(workers=3):
+            covered.setdefault(z, []).extend(x_range)
+        assert sorted(covered) == list(range(13))
+        for z, xs in covered.items():
+            assert xs == list(range(2**z))
+
+
+class TestOccupiedTiles:
+    @pytest.fixture
+    def conn(self):
+        # geom_spatial holds "lon_min lat_min lon_max lat_max"; plain SQLite
+        # functions stand in for SpatiaLite's MBR accessors
+        conn = sqlite3.connect(":memory:")
+        for i, name in enumerate(("MbrMinX", "MbrMinY", "MbrMaxX", "MbrMaxY")):
+            conn.create_function(name, 1, lambda g, i=i: float(g.split()[i]))
+        conn.execute(
+            "CREATE TABLE airspace_spatial_indexed (espace_type TEXT, geom_spatial TEXT)"
+        )
+        conn.executemany(
+            "INSERT INTO airspace_spatial_indexed VALUES (?, ?)",
+            [
+                ("TMA", "1.9 48.5 2.6 49.1"),
+                ("FIR", "-5.0 41.0 9.5 51.5"),
+                ("CTR", "-120.0 30.0 -110.0 40.0"),
+            ],
+        )
+        return conn
+
+    def test_stripes_match_full_scan(self, conn, tmp_path):
+        gen = TileGenerator(tmp_path / "db", tmp_path / "tiles")
+        for types in (None, _types_param(["TMA", "CTR"])):
+            full = gen._occupied_tiles(conn, 6, types)
+            striped: set[tuple[int, int]] = set()
+            for x_start in range(0, 64, 5):
+                striped |= gen._occupied_tiles(conn, 6, types, range(x_start, min(x_start + 5, 64)))
+            assert striped == full
+
+    def test_stripe_reads_only_its_lon_band(self, conn, tmp_path):
+        gen = TileGenerator(tmp_path / "db", tmp_path / "tiles")
+        seen: list[str] = []
+        conn.create_function("MbrMinY", 1, lambda g: seen.append(g) or float(g.split()[1]))
+        gen._occupied_tiles(conn, 6, None, range(8))  # lon -180..-135
+        assert seen == []
+
+
+class TestWriteTile:
+    def test_spliced_features_form_valid_geojson(self, tmp_path):
+        gen = TileGenerator(tmp_path / "db", tmp_path)
+        feature = (
+            '{"type":"Feature","properties":{"id":1,"name":"PARIS TMA"},'
+            '"geometry":{"type":"Point","coordinates":[2.3,48.8]}}'
+        )
+        gen._write_tile(6, 32, 22, [feature, feature])
+        tile_path = tmp_path / "airspaces" / "6" / "32" / "22.json.gz"
+        with gzip.open(tile_path, "rt", encoding="utf-8") as fh:
+            data = json.load(fh)
+        assert data["type"] == "FeatureCollection"
+        assert len(data["features"]) == 2
+        assert data["features"][0]["geometry"]["coordinates"] == [2.3, 48.8]
+
+
+class TestFeatureTemplate:
+    def test_matches_json_dumps(self):
+        row = (12, 'PARIS "TMA" 1 — Évry', "TMA", None, 0, 6500.5)
+        geometry = '{"type":"Point","coordinates":[2.3,48.8]}'
+        text = _FEATURE_TEMPLATE.format(*map(_json_scalar, row), geometry)
+        assert json.loads(text) == {
+            "type": "Feature",
+            "properties": {
+                "id": 12, "name": row[1], "type": "TMA", "class": None,
+                "floor_ft": 0, "ceiling_ft": 6500.5,
+            },
+            "geometry": {"type": "Point", "coordinates": [2.3, 48.8]},
+        }
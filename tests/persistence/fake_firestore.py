@@ -89,40 +89,113 @@ class FakeCollectionRef:
                     yield FakeDocumentSnapshot(dict(data), rest)
 
     def where(self, field: str, op: str, value: Any) -> "FakeQuery":
-        return FakeQuery(self._store, self._path, field, op, value)
+        return FakeQuery(self._store, self._path).where(field, op, value)
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return FakeQuery(self._store, self._path).order_by(field, direction)
+
+    def limit(self, count: int) -> "FakeQuery":
+        return FakeQuery(self._store, self._path).limit(count)
 
 
 class FakeQuery:
+    """Immutable query: each builder method returns a new instance."""
+
     def __init__(
         self,
         store: dict[str, dict],
         path: str,
-        field: str,
-        op: str,
-        value: Any,
+        filters: tuple[tuple[str, str, Any], ...] = (),
+        orders: tuple[tuple[str, str], ...] = (),
+        limit_count: int | None = None,
+        cursor: FakeDocumentSnapshot | None = None,
+        projection: tuple[str, ...] | None = None,
     ):
         self._store = store
         self._path = path
-        self._field = field
-        self._op = op
-        self._value = value
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit_count
+        self._cursor = cursor
+        self._projection = projection
+
+    def _replace(self, **changes: Any) -> "FakeQuery":
+        state = {
+            "filters": self._filters,
+            "orders": self._orders,
+            "limit_count": self._limit,
+            "cursor": self._cursor,
+            "projection": self._projection,
+        }
+        state.update(changes)
+        return FakeQuery(self._store, self._path, **state)
 
-    async def stream(self):
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        return self._replace(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return self._replace(orders=self._orders + ((field, direction),))
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._replace(limit_count=count)
+
+    def start_after(self, snapshot: FakeDocumentSnapshot) -> "FakeQuery":
+        return self._replace(cursor=snapshot)
+
+    def select(self, field_paths: list[str]) -> "FakeQuery":
+        return self._replace(projection=tuple(field_paths))
+
+    def _sort_key(self, doc_id: str, data: dict) -> tuple:
+        return tuple(
+            doc_id if field == "__name__" else data.get(field)
+            for field, _ in self._orders
+        ) + (doc_id,)
+
+    def _results(self) -> list[FakeDocumentSnapshot]:
         prefix = self._path + "/"
-        for path, data in sorted(self._store.items()):
-            if path.startswith(prefix):
-                rest = path[len(prefix):]
-                if "/" not in rest:
-                    if self._matches(data):
-                        yield FakeDocumentSnapshot(dict(data), rest)
-
-    def _matches(self, data: dict) -> bool:
-        val = data.get(self._field)
-        if self._op == "==":
-            return val == self._value
-        if self._op == "array_contains":
-            return isinstance(val, list) and self._value in val
-        return False
+        docs = [
+            FakeDocumentSnapshot(dict(data), path[len(prefix):])
+            for path, data in sorted(self._store.items())
+            if path.startswith(prefix)
+            and "/" not in path[len(prefix):]
+            and all(_matches(data, f, op, v) for f, op, v in self._filters)
+        ]
+        # Single-direction sort is enough for the fake
+        reverse = any(d == "DESCENDING" for _, d in self._orders)
+        docs.sort(key=lambda d: self._sort_key(d.id, d._data), reverse=reverse)
+        if self._cursor is not None:
+            after = self._sort_key(self._cursor.id, self._cursor._data)
+            docs = [
+                d for d in docs
+                if (self._sort_key(d.id, d._data) < after if reverse
+                    else self._sort_key(d.id, d._data) > after)
+            ]
+        if self._limit is not None:
+            docs = docs[: self._limit]
+        if self._projection is not None:
+            docs = [
+                FakeDocumentSnapshot(
+                    {f: d._data[f] for f in self._projection if f in d._data}, d.id
+                )
+                for d in docs
+            ]
+        return docs
+
+    async def stream(self):
+        for doc in self._results():
+            yield doc
+
+    async def get(self) -> list[FakeDocumentSnapshot]:
+        return self._results()
+
+
+def _matches(data: dict, field: str, op: str, value: Any) -> bool:
+    val = data.get(field)
+    if op == "==":
+        return val == value
+    if op == "array_contains":
+        return isinstance(val, list) and value in val
+    return False
 
 
 class FakeFirestoreClient:
@@ -0,0 +1,252 @@
+"""Unit tests for AerodromeQueryService helpers (no SpatiaLite needed)."""
+
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.contracts.enums import AerodromeStatus
+from core.persistence.spatialite import aerodrome_query
+from core.persistence.spatialite.aerodrome_query import AerodromeQueryService
+from core.persistence.spatialite.db_manager import SpatiaLiteManager
+
+# LFXU → LFRG → LFRK → LFOK: a zig-zag with a short leg and a long one
+ROUTE = [(48.9897, 1.8815), (49.3653, 0.1543), (49.1733, -0.4500), (48.7761, 4.1842)]
+
+
+def _random_points(n: int, seed: int = 42) -> tuple[list[float], list[float]]:
+    rng = random.Random(seed)
+    lats = [rng.uniform(47.5, 50.5) for _ in range(n)]
+    lons = [rng.uniform(-1.5, 5.5) for _ in range(n)]
+    return lats, lons
+
+
+class TestWithinBuffer:
+    def test_numpy_mask_matches_point_by_point(self):
+        pytest.importorskip("numpy")
+        lats, lons = _random_points(500)
+        segments = AerodromeQueryService._route_segments(ROUTE, 15.0)
+        expected = [
+            AerodromeQueryService._is_within_buffer(lat, lon, segments, 15.0)
+            for lat, lon in zip(lats, lons)
+        ]
+        mask = AerodromeQueryService._within_buffer_mask(lats, lons, ROUTE, 15.0)
+        assert mask == expected
+        assert 0 < sum(mask) < len(mask)
+
+    def test_box_covers_great_circle_bulge(self):
+        # A 30° east-west leg along 50°N peaks near 50.97°N at 5°E
+        segments = AerodromeQueryService._route_segments([(50.0, -10.0), (50.0, 20.0)], 2.0)
+        assert AerodromeQueryService._is_within_buffer(50.97, 5.0, segments, 2.0)
+        assert not AerodromeQueryService._is_within_buffer(50.0, 5.0, segments, 2.0)
+
+    def test_fallback_without_numpy(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "numpy", None)
+        mask = AerodromeQueryService._within_buffer_mask(
+            [48.99, 45.0], [1.88, 1.88], ROUTE, 15.0,
+        )
+        assert mask == [True, False]
+
+    def test_empty_candidates(self):
+        assert AerodromeQueryService._within_buffer_mask([], [], ROUTE, 15.0) == []
+
+
+class TestMapStatus:
+    def test_codes_of_both_schemas(self):
+        status = AerodromeQueryService._map_status
+        assert [status(raw) for raw in ("CAP", " mil ", "Militaire", "restreint", "RES")] == [
+            AerodromeStatus.CAP, AerodromeStatus.MILITARY, AerodromeStatus.CAP,
+            AerodromeStatus.RESTRICTED, AerodromeStatus.RESTRICTED,
+        ]
+        assert status(None) == status("") == AerodromeStatus.CAP
+
+
+class _PlainSQLiteManager(SpatiaLiteManager):
+    """Hands out plain sqlite connections (no SpatiaLite functions)."""
+
+    def _open(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self._local_path), check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+@pytest.fixture
+def service(tmp_path) -> AerodromeQueryService:
+    path = str(tmp_path / "ref.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE aerodrome (
+            icao TEXT, name TEXT, latitude REAL, longitude REAL,
+            elevation_ft REAL, status TEXT, vfr TEXT, private TEXT,
+            mag_variation REAL, ref_temperature REAL
+        );
+        CREATE TABLE aerodrome_runway (
+            icao TEXT, designator TEXT, length_m REAL, width_m REAL, is_main TEXT,
+            surface TEXT, lda1_m REAL, lda2_m REAL
+        );
+        CREATE TABLE aerodrome_service (
+            pk INTEGER PRIMARY KEY, icao TEXT, service_type TEXT, callsign TEXT,
+            hours_code TEXT, hours_text TEXT
+        );
+        CREATE TABLE Frequence (ServiceRef INTEGER, Frequence REAL, Espacement TEXT);
+    """)
+    conn.executemany(
+        "INSERT INTO aerodrome VALUES (?, ?, ?, ?, NULL, 'CAP', 'oui', 'non', NULL, NULL)",
+        [
+            ("XU", "LES MUREAUX", 48.9897, 1.8815),
+            ("RG", "DEAUVILLE", 49.3653, 0.1543),
+            ("TQ", "FAR NORTH", 49.95, 1.0),
+            ("41", "NUMERIC CODE", 49.0, 1.0),
+            ("xy", "LOWER CASE", 49.0, 1.0),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO aerodrome_runway VALUES (?, ?, ?, 30, ?, 'revêtue', NULL, NULL)",
+        [("XU", "12/30", 740, "oui"), ("XU", "12L/30R", 600, "non"), ("RG", "12/30", 2550, "oui")],
+    )
+    conn.executemany(
+        "INSERT INTO aerodrome_service VALUES (?, ?, ?, ?, 'HJ', NULL)",
+        [(1, "XU", "AFIS", "MUREAUX"), (2, "XU", "A/A", "MUREAUX"), (3, "RG", "TWR", "DEAUVILLE")],
+    )
+    conn.executemany(
+        "INSERT INTO Frequence VALUES (?, ?, '8.33')",
+        [(1, 123.5), (1, 118.225), (3, 118.45)],
+    )
+    conn.commit()
+    conn.close()
+    manager = _PlainSQLiteManager()
+    manager.use_local(Path(path))
+    aerodrome_query.invalidate_cache()
+    return AerodromeQueryService(manager)
+
+
+class TestGetByIcao:
+    def test_joined_rows_folded(self, service):
+        ad = service.get_by_icao("LFXU")
+        assert ad.icao == "LFXU" and ad.name == "LES MUREAUX"
+        assert [(r.designator, r.is_main) for r in ad.runways] == [
+            ("12/30", True), ("12L/30R", False),
+        ]
+        assert [(s.service_type, [f.frequency_mhz for f in s.frequencies]) for s in ad.services] == [
+            ("AFIS", [123.5, 118.225]), ("A/A", []),
+        ]
+
+    def test_unknown(self, service):
+        assert service.get_by_icao("LFZZ") is None
+
+    def test_batch_lookup(self, service, monkeypatch):
+        monkeypatch.setattr("core.persistence.spatialite.aerodrome_query._IN_CHUNK", 2)
+        found = service.get_by_icaos(["lfrg", "LFXU", "LFZZ", "LFXU", "LFTQ"])
+        assert sorted(found) == ["LFRG", "LFTQ", "LFXU"]
+        assert found["LFXU"] == service.get_by_icao("LFXU")
+        assert [s.callsign for s in found["LFRG"].services] == ["DEAUVILLE"]
+        assert found["LFTQ"].runways == [] and found["LFTQ"].services == []
+        assert service.get_by_icaos([]) == {}
+
+    def test_records_cached_per_db_file(self, service, tmp_path, monkeypatch):
+        first = service.get_by_icao("LFXU")
+        with monkeypatch.context() as m:
+            m.setattr(service._manager, "acquire", None)  # Served from the cache
+            assert service.get_by_icao("LFXU") == first
+
+        # Rewritten in place: the new mtime keys fresh entries
+        ref_db = tmp_path / "ref.db"
+        mtime_ns = ref_db.stat().st_mtime_ns
+        with sqlite3.connect(ref_db) as conn:
+            conn.execute("UPDATE aerodrome SET name = 'RENAMED' WHERE icao = 'XU'")
+        os.utime(ref_db, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        assert service.get_by_icao("LFXU").name == "RENAMED"
+
+        # A new cycle is another file: previous entries no longer apply
+        new_db = tmp_path / "next.db"
+        new_db.write_bytes((tmp_path / "ref.db").read_bytes())
+        service._manager.use_local(new_db, cycle="2611")
+        with sqlite3.connect(new_db) as conn:
+            conn.execute("UPDATE aerodrome SET name = 'NEXT CYCLE' WHERE icao = 'XU'")
+        assert service.get_by_icao("LFXU").name == "NEXT CYCLE"
+
+    def test_cached_records_not_shared(self, service):
+        first = service.get_by_icao("LFXU")
+        first.name = "CHANGED"
+        first.runways.clear()
+        again = service.get_by_icao("LFXU")
+        assert again.name == "LES MUREAUX" and len(again.runways) == 2
+
+    def test_legacy_schema(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE Ad (
+                pk INTEGER PRIMARY KEY, AdCode TEXT, AdNomComplet TEXT, AdNomCarto TEXT,
+                AdStatut TEXT, TfcVfr TEXT, TfcPrive TEXT, ArpLat REAL, ArpLong REAL,
+                AdRefAltFt INTEGER, AdMagVar REAL, AdRefTemp REAL
+            );
+            CREATE TABLE Rwy (
+                Ad_pk INTEGER, Rwy TEXT, Longueur REAL, Largeur REAL, Principale TEXT,
+                Revetement TEXT, Lda1 REAL, Lda2 REAL
+            );
+            CREATE TABLE Service (
+                pk INTEGER PRIMARY KEY, Ad_pk INTEGER, Service TEXT, IndicLieu TEXT,
+                HorCode TEXT, HorTxt TEXT
+            );
+            CREATE TABLE Frequence (Service_pk INTEGER, Frequence REAL, Espacement TEXT);
+            INSERT INTO Ad VALUES (1, 'LFXU', 'LES MUREAUX', NULL, 'CAP', 'OUI', 'NON',
+                                   48.9897, 1.8815, 89, NULL, NULL);
+            INSERT INTO Service VALUES (7, 1, 'AFIS', 'MUREAUX', 'HJ', NULL);
+            INSERT INTO Frequence VALUES (7, 123.5, '8.33');
+        """)
+        conn.close()
+        manager = _PlainSQLiteManager()
+        manager.use_local(path)
+        aerodrome_query.invalidate_cache()
+        svc = AerodromeQueryService(manager)
+        ad = svc.get_by_icao("lfxu")
+        assert (ad.icao, ad.elevation_ft, ad.runways) == ("LFXU", 89, [])
+        assert [f.frequency_mhz for f in ad.services[0].frequencies] == [123.5]
+        assert [(a.icao, a.name, a.vfr) for a in svc.search_bbox(48, 1, 50, 3)] == [
+            ("LFXU", "LES MUREAUX", True),
+        ]
+
+
+class TestSearchNearRoute:
+    def test_falls_back_to_python_filter_without_spatialite(self, service):
+        found = service.search_near_route(ROUTE[:2], buffer_nm=10.0, exclude_icaos=["lfrg"])
+        assert [ad.icao for ad in found] == ["LFXU"]
+
+    def test_search_bbox_rows(self, service):
+        found = service.search_bbox(48.0, 0.0, 50.0, 3.0)
+        assert [(ad.icao, ad.name, ad.elevation_ft, ad.private) for ad in found] == [
+            ("LFXU", "LES MUREAUX", None, False),
+            ("LFRG", "DEAUVILLE", None, False),
+            ("LFTQ", "FAR NORTH", None, False),
+        ]
+
+    def test_search_bbox_uses_rtree_when_present(self, service, tmp_path):
+        expected = service.search_bbox(48.0, 0.0, 50.0, 3.0)
+        with sqlite3.connect(tmp_path / "ref.db") as conn:
+            conn.executescript("""
+                CREATE VIRTUAL TABLE aerodrome_rtree
+                    USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+                INSERT INTO aerodrome_rtree
+                    SELECT rowid, latitude, latitude, longitude, longitude FROM aerodrome;
+            """)
+        service._manager.use_local(tmp_path / "ref.db")  # re-read the schema
+        assert service._manager.has_table("aerodrome_rtree")
+        assert service.search_bbox(48.0, 0.0, 50.0, 3.0) == expected
+        # Boundary points survive the float32 rounding of the R-tree bounds
+        assert [ad.icao for ad in service.search_bbox(48.9897, 1.8815, 48.9897, 1.8815)] == [
+            "LFXU",
+        ]
+
+    def test_pooled_connection_reused(self, service):
+        manager = service._manager
+        conn = manager.acquire()
+        manager.release(conn)
+        service.search_bbox(48.0, 0.0, 50.0, 3.0)
+        assert manager.acquire() is conn
+        assert manager.has_table("aerodrome") and not manager.has_table("Ad")
@@ -0,0 +1,79 @@
+"""Unit tests for the in-memory airspace box index."""
+
+from __future__ import annotations
+
+import random
+import sys
+
+import pytest
+
+from core.persistence.spatialite.airspace_index import AirspaceBoxIndex, AirspaceShapes
+
+
+def _random_volumes(rng: random.Random, n: int):
+    ids, boxes, floors, ceilings = [], [], [], []
+    for i in range(n):
+        x, y = rng.uniform(-5, 9), rng.uniform(41, 51)
+        boxes.append((x, y, x + rng.uniform(0, 1.5), y + rng.uniform(0, 1)))
+        floor = rng.choice([0, 1500, 3500, 6500])
+        ids.append(1000 + i)
+        floors.append(floor)
+        ceilings.append(floor + rng.choice([1000, 5000, 19500]))
+    return ids, boxes, floors, ceilings
+
+
+class TestAirspaceBoxIndex:
+    def test_search_matches_brute_force(self):
+        rng = random.Random(7)
+        ids, boxes, floors, ceilings = _random_volumes(rng, 700)
+        index = AirspaceBoxIndex(ids, boxes, floors, ceilings, node_size=8)
+        assert len(index) == 700
+        for _ in range(200):
+            x, y = rng.uniform(-6, 10), rng.uniform(40, 52)
+            query = (x, y, x + rng.uniform(0, 2), y + rng.uniform(0, 2))
+            alt = rng.choice([0, 1500, 2000, 4500, 9000, 30000])
+            expected = sorted(
+                rowid
+                for rowid, box, floor, ceiling in zip(ids, boxes, floors, ceilings)
+                if box[0] <= query[2] and box[2] >= query[0]
+                and box[1] <= query[3] and box[3] >= query[1]
+                and floor <= alt <= ceiling
+            )
+            assert index.search(*query, alt) == expected
+            assert index._search_tree(*query, alt) == expected
+
+    def test_edges_touching_and_degenerate(self):
+        index = AirspaceBoxIndex(
+            [1, 2], [(0.0, 0.0, 1.0, 1.0), (2.0, 2.0, 2.0, 2.0)], [0, 0], [5000, 5000]
+        )
+        for search in (index.search, index._search_tree):
+            assert search(1.0, 1.0, 2.0, 2.0, 1000) == [1, 2]
+            assert search(1.1, 1.1, 1.9, 1.9, 1000) == []
+            assert search(0.0, 0.0, 3.0, 3.0, 6000) == []
+
+    def test_search_without_numpy(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "numpy", None)
+        index = AirspaceBoxIndex([1], [(0.0, 0.0, 1.0, 1.0)], [0], [5000])
+        assert index._columns is None
+        assert index.search(0.5, 0.5, 2.0, 2.0, 1000) == [1]
+
+    def test_empty(self):
+        assert AirspaceBoxIndex([], [], [], []).search(0, 0, 1, 1, 0) == []
+
+
+class TestAirspaceShapes:
+    def test_classify_leg(self):
+        geometry = pytest.importorskip("shapely.geometry")
+        shapes = AirspaceShapes(
+            [1, 2, 3, 4],
+            [
+                geometry.box(0.0, -1.0, 2.0, 1.0).wkb,  # contains the leg
+                geometry.box(1.5, -1.0, 3.0, 1.0).wkb,  # contains its end
+                geometry.box(0.6, 0.02, 0.7, 0.03).wkb,  # 0.02 off the line
+                geometry.box(0.6, 0.2, 0.7, 0.3).wkb,  # too far
+            ],
+        )
+        route, corridor = shapes.classify_leg([1, 2, 3, 4, 99], 0.5, 0.0, 1.8, 0.0, 0.05)
+        assert route == [(1, False, True, True), (2, True, False, True)]
+        assert corridor == [3]
+        assert shapes.classify_leg([99], 0.5, 0.0, 1.8, 0.0, 0.05) == ([], [])
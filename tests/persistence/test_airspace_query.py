@@ -0,0 +1,342 @@
+"""Unit tests for AirspaceQueryService on plain SQLite.
+
+SpatiaLite is not available in CI, so the handful of spatial SQL functions
+the service uses are registered from shapely on each connection.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+shapely = pytest.importorskip("shapely")
+from shapely import wkb, wkt
+from shapely.geometry import LineString, Point, box, mapping
+
+from core.contracts.enums import IntersectionType
+from core.persistence.spatialite import airspace_query
+from core.persistence.spatialite.airspace_query import AirspaceQueryService
+from core.persistence.spatialite.db_manager import SpatiaLiteManager
+
+
+def _predicate(name: str):
+    def fn(a: bytes, b: bytes) -> int:
+        return int(getattr(wkb.loads(a), name)(wkb.loads(b)))
+    return fn
+
+
+_FUNCTIONS = {
+    ("GeomFromText", 2): lambda text, srid: wkt.loads(text).wkb,
+    ("MakePoint", 2): lambda x, y: Point(x, y).wkb,
+    ("MakePoint", 3): lambda x, y, srid: Point(x, y).wkb,
+    ("MakeLine", 2): lambda a, b: LineString([wkb.loads(a), wkb.loads(b)]).wkb,
+    ("ST_Distance", 2): lambda a, b: wkb.loads(a).distance(wkb.loads(b)),
+    ("ST_Intersects", 2): _predicate("intersects"),
+    ("ST_Crosses", 2): _predicate("crosses"),
+    ("ST_Contains", 2): _predicate("contains"),
+    ("AsGeoJSON", 1): lambda g: json.dumps(mapping(wkb.loads(g))),
+    ("AsBinary", 1): lambda g: g,
+    ("MbrMinX", 1): lambda g: wkb.loads(g).bounds[0],
+    ("MbrMinY", 1): lambda g: wkb.loads(g).bounds[1],
+    ("MbrMaxX", 1): lambda g: wkb.loads(g).bounds[2],
+    ("MbrMaxY", 1): lambda g: wkb.loads(g).bounds[3],
+}
+
+
+class _ShapelyManager(SpatiaLiteManager):
+    """Plain sqlite connections with shapely standing in for SpatiaLite."""
+
+    def _open(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self._local_path), check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        for (name, narg), fn in _FUNCTIONS.items():
+            conn.create_function(name, narg, fn, deterministic=True)
+        return conn
+
+
+# A → B heads east along 48°N, B → C north along 3°E
+WAYPOINTS = [("A", 48.0, 2.0), ("B", 48.0, 3.0), ("C", 49.0, 3.0)]
+LEGS = [(1, 2, 2000), (2, 3, 3000)]
+
+
+@pytest.fixture
+def service(tmp_path) -> AirspaceQueryService:
+    path = tmp_path / "ref.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE airspace_spatial_indexed (
+            espace_nom TEXT, espace_type TEXT, partie_nom TEXT, Classe TEXT,
+            altitude_floor_ft_amsl REAL, altitude_ceiling_ft_amsl REAL,
+            partie_pk INTEGER, volume_pk INTEGER, espace_pk INTEGER, geometry BLOB
+        );
+        CREATE TABLE Service (
+            pk INTEGER PRIMARY KEY, EspaceRef INTEGER, IndicLieu TEXT, IndicService TEXT
+        );
+        CREATE TABLE Frequence (
+            pk INTEGER PRIMARY KEY, ServiceRef INTEGER, Frequence REAL, Espacement TEXT,
+            SecteurSituation TEXT
+        );
+        INSERT INTO Service VALUES (1, 50, 'SEINE', 'Information');
+        INSERT INTO Frequence VALUES (1, 1, 120.325, '8.33', NULL);
+    """)
+    airspaces = [
+        # (name, type, class, floor, ceiling, pk, (lon_min, lat_min, lon_max, lat_max))
+        ("PARIS TMA 1", "TMA", "D", 1500, 4500, 10, (2.4, 47.9, 2.6, 48.1)),
+        ("B CTR", "CTR", "D", 0, 2500, 20, (2.9, 47.9, 3.1, 48.1)),
+        ("R 42", "R", None, 0, 9999, 30, (2.5, 48.02, 2.6, 48.03)),
+        ("CTL SECTOR", "CTL", None, 0, 9999, 40, (2.2, 47.9, 2.3, 48.1)),
+        ("SEINE SIV", "SIV", "E", 0, 5000, 50, (1.5, 47.5, 3.5, 49.5)),
+    ]
+    conn.executemany(
+        "INSERT INTO airspace_spatial_indexed VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (name, kind, name, cls, floor, ceiling, pk, pk + 1, pk, box(*bounds).wkb)
+            for name, kind, cls, floor, ceiling, pk, bounds in airspaces
+        ],
+    )
+    conn.commit()
+    conn.close()
+    manager = _ShapelyManager()
+    manager.use_local(Path(path))
+    return AirspaceQueryService(manager)
+
+
+@pytest.fixture
+def sql_only(monkeypatch):
+    """Exact route tests in (fake) SpatiaLite, as without shapely."""
+    monkeypatch.setitem(sys.modules, "shapely", None)
+
+
+class TestAnalyzeRoute:
+    def test_legs_classified(self, service):
+        first, second = service.analyze_route(WAYPOINTS, LEGS, include_geometry=True)
+
+        assert (first.from_waypoint, first.to_waypoint, first.planned_altitude_ft) == (
+            "A", "B", 2000,
+        )
+        assert {a.identifier: a.intersection_type for a in first.route_airspaces} == {
+            "PARIS TMA 1": IntersectionType.CROSSES,
+            "B CTR": IntersectionType.CROSSES,
+            "SEINE SIV": IntersectionType.INSIDE,
+        }
+        assert [a.identifier for a in first.corridor_airspaces] == ["R 42"]
+        assert [a.identifier for a in second.route_airspaces] == ["SEINE SIV"]
+        assert second.corridor_airspaces == []
+
+        siv = first.route_airspaces[-1]
+        assert [(s.callsign, [f.frequency_mhz for f in s.frequencies]) for s in siv.services] == [
+            ("SEINE", ["120.325"]),
+        ]
+        assert siv.geometry_geojson["type"] == "Polygon"
+
+    def test_matches_per_segment_query(self, service):
+        legs = service.analyze_route(WAYPOINTS, LEGS)
+        for leg, (from_seq, to_seq, alt) in zip(legs, LEGS):
+            _, lat1, lon1 = WAYPOINTS[from_seq - 1]
+            _, lat2, lon2 = WAYPOINTS[to_seq - 1]
+            assert leg.route_airspaces == service.query_segment_airspaces(
+                lat1, lon1, lat2, lon2, alt,
+            )
+
+    def test_legs_spread_over_workers(self, service, monkeypatch):
+        serial = service.analyze_route(WAYPOINTS, LEGS * 3)
+        monkeypatch.setattr("core.persistence.spatialite.airspace_query._LEGS_PER_WORKER", 1)
+        monkeypatch.setattr("os.cpu_count", lambda: 4)
+        batches = []
+        analyze_legs = service._analyze_legs
+
+        def spy(leg_rows, *args):
+            batches.append([row[0] for row in leg_rows])
+            analyze_legs(leg_rows, *args)
+
+        monkeypatch.setattr(service, "_analyze_legs", spy)
+        assert service.analyze_route(WAYPOINTS, LEGS * 3) == serial
+        assert sorted(batches) == [[0, 4], [1, 5], [2], [3]]
+
+    def test_services_looked_up_once_per_airspace(self, service, monkeypatch):
+        bulk, fallbacks = [], []
+        get_services_bulk = service._get_services_bulk
+        get_services = service._get_services
+
+        def bulk_spy(conn, espace_pks):
+            bulk.append(sorted(espace_pks))
+            return get_services_bulk(conn, espace_pks)
+
+        def spy(conn, *airspace):
+            fallbacks.append(airspace)
+            return get_services(conn, *airspace)
+
+        monkeypatch.setattr(service, "_get_services_bulk", bulk_spy)
+        monkeypatch.setattr(service, "_get_services", spy)
+        legs = service.analyze_route(WAYPOINTS, LEGS * 2)
+        # Direct links in one query; name lookup only for the TMA without any
+        assert bulk == [[10, 20, 50]]
+        assert fallbacks == [(10, "PARIS TMA 1", "TMA")]
+        assert all(leg.route_airspaces[-1].services for leg in legs)
+        assert [leg.route_airspaces[0].services for leg in legs[::2]] == [[], []]
+
+    def test_geometry_only_on_request(self, service):
+        legs = service.analyze_route(WAYPOINTS, LEGS)
+        assert all(a.geometry_geojson is None for leg in legs for a in leg.route_airspaces)
+        with_geometry = service.query_segment_airspaces(48.0, 2.0, 48.0, 3.0, 2000, True)
+        assert all(a.geometry_geojson for a in with_geometry)
+
+    @pytest.mark.usefixtures("sql_only")
+    def test_segment_geometry_built_once(self, service, monkeypatch):
+        calls = []
+        make_point = _FUNCTIONS["MakePoint", 3]
+
+        def counting(*args):
+            calls.append(args)
+            return make_point(*args)
+
+        monkeypatch.setitem(_FUNCTIONS, ("MakePoint", 3), counting)
+        assert len(service.query_segment_airspaces(48.0, 2.0, 48.0, 3.0, 2000)) == 3
+        assert calls == [(2.0, 48.0, 4326), (3.0, 48.0, 4326)]
+
+    def test_in_memory_matches_sql(self, service, monkeypatch, tmp_path):
+        with sqlite3.connect(tmp_path / "ref.db") as conn:
+            conn.execute(
+                "INSERT INTO airspace_spatial_indexed VALUES "
+                "('NEAR', 'P', 'NEAR', NULL, 0, 9999, 60, 61, 60, ?)",
+                (box(2.1, 47.90, 2.2, 47.96).wkb,),
+            )
+        in_memory = service.analyze_route(WAYPOINTS, LEGS * 2, include_geometry=True)
+        segment = service.query_segment_airspaces(48.0, 3.0, 48.0, 2.0, 2000, True)
+        assert all(airspace_query._airspace_shapes.values())
+        monkeypatch.setattr(airspace_query, "_airspace_shapes", {})
+        monkeypatch.setitem(sys.modules, "shapely", None)
+        assert service.analyze_route(WAYPOINTS, LEGS * 2, include_geometry=True) == in_memory
+        assert service.query_segment_airspaces(48.0, 3.0, 48.0, 2.0, 2000, True) == segment
+        assert [a.identifier for a in in_memory[0].corridor_airspaces] == ["R 42", "NEAR"]
+
+    @pytest.mark.usefixtures("sql_only")
+    def test_shared_waypoint_tested_once(self, service, monkeypatch):
+        calls = []
+        contains = _FUNCTIONS["ST_Contains", 2]
+
+        def counting(*args):
+            calls.append(args)
+            return contains(*args)
+
+        monkeypatch.setitem(_FUNCTIONS, ("ST_Contains", 2), counting)
+        first, second = service.analyze_route(WAYPOINTS, LEGS)
+        # A, B in TMA, CTR and SIV for A → B; B → C only adds C in the SIV
+        assert len(calls) == 7
+        assert first.route_airspaces[-1].intersection_type == IntersectionType.INSIDE
+        assert second.route_airspaces[0].intersection_type == IntersectionType.INSIDE
+
+    def test_untyped_airspace_kept(self, service, tmp_path):
+        with sqlite3.connect(tmp_path / "ref.db") as conn:
+            conn.execute(
+                "INSERT INTO airspace_spatial_indexed VALUES "
+                "('ZONE', NULL, 'ZONE', NULL, 0, 9999, 60, 61, 60, ?)",
+                (box(2.7, 47.9, 2.8, 48.1).wkb,),
+            )
+        found = service.query_segment_airspaces(48.0, 2.0, 48.0, 3.0, 2000)
+        assert [a.identifier for a in found] == ["PARIS TMA 1", "B CTR", "SEINE SIV", "ZONE"]
+
+    @pytest.mark.usefixtures("sql_only")
+    def test_segment_prefiltered_by_rtree(self, service, tmp_path):
+        with sqlite3.connect(tmp_path / "ref.db") as conn:
+            conn.execute(
+                "CREATE VIRTUAL TABLE idx_airspace_spatial_indexed_geometry "
+                "USING rtree(pkid, xmin, xmax, ymin, ymax)"
+            )
+            # B CTR left out of the R*Tree: only indexed volumes are candidates
+            conn.execute(
+                "INSERT INTO idx_airspace_spatial_indexed_geometry "
+                "SELECT rowid, ?, ?, ?, ? FROM airspace_spatial_indexed "
+                "WHERE espace_nom = 'SEINE SIV'",
+                (1.5, 3.5, 47.5, 49.5),
+            )
+            conn.execute(
+                "INSERT INTO idx_airspace_spatial_indexed_geometry "
+                "SELECT rowid, ?, ?, ?, ? FROM airspace_spatial_indexed "
+                "WHERE espace_nom = 'PARIS TMA 1'",
+                (2.4, 2.6, 47.9, 48.1),
+            )
+        found = service.query_segment_airspaces(48.0, 3.0, 48.0, 2.0, 2000)
+        assert [a.identifier for a in found] == ["PARIS TMA 1", "SEINE SIV"]
+
+    def test_corridor_half_width(self, service, tmp_path):
+        # 2.5 NM ≈ 0.0417°: 0.04° from the A → B leg is near, 0.05° is not
+        with sqlite3.connect(tmp_path / "ref.db") as conn:
+            conn.executemany(
+                "INSERT INTO airspace_spatial_indexed VALUES (?, 'P', ?, NULL, 0, 9999, ?, ?, ?, ?)",
+                [
+                    ("NEAR", "NEAR", 60, 61, 60, box(2.1, 47.90, 2.2, 47.96).wkb),
+                    ("FAR", "FAR", 70, 71, 70, box(2.1, 47.90, 2.2, 47.95).wkb),
+                ],
+            )
+        first, _ = service.analyze_route(WAYPOINTS, LEGS)
+        assert [a.identifier for a in first.corridor_airspaces] == ["R 42", "NEAR"]
+
+    @pytest.mark.usefixtures("sql_only")
+    def test_scratch_tables_emptied(self, service):
+        service.analyze_route(WAYPOINTS, LEGS)
+        conn = service._manager.acquire()
+        try:
+            assert conn.execute("SELECT count(*) FROM temp.route_legs").fetchone()[0] == 0
+            assert conn.execute("SELECT count(*) FROM temp.route_candidates").fetchone()[0] == 0
+        finally:
+            service._manager.release(conn)
+
+
+class TestGetServices:
+    @pytest.fixture
+    def conn(self, service, tmp_path):
+        with sqlite3.connect(tmp_path / "ref.db") as db:
+            db.executescript("""
+                INSERT INTO Service VALUES (2, NULL, 'PARIS NORD', 'Information');
+                INSERT INTO Service VALUES (3, NULL, 'LYON', 'Information');
+                INSERT INTO Frequence VALUES (2, 2, 119.25, '8.33', NULL);
+                INSERT INTO Frequence VALUES (3, 3, 120.5, '8.33', 'Secteur Nord');
+                INSERT INTO Frequence VALUES (4, 3, 121.0, '8.33', 'Secteur Sud');
+            """)
+        conn = service._manager.acquire()
+        yield conn
+        service._manager.release(conn)
+
+    @staticmethod
+    def _frequencies(service, conn, *airspace):
+        return [
+            (s.callsign, [f.frequency_mhz for f in s.frequencies])
+            for s in service._get_services(conn, *airspace)
+        ]
+
+    def test_fallback_order(self, service, conn):
+        assert self._frequencies(service, conn, 50, "PARIS NORD", "SIV") == [
+            ("SEINE", ["120.325"]),
+        ]
+        assert self._frequencies(service, conn, 99, "PARIS NORD", "SIV") == [
+            ("PARIS NORD", ["119.25"]),
+        ]
+        assert self._frequencies(service, conn, 99, "LYON NORD", "SIV") == [("LYON", ["120.5"])]
+        assert self._frequencies(service, conn, 99, "LYON EST", "SIV") == [
+            ("LYON", ["120.5", "121.0"]),
+        ]
+
+    def test_strategies_survive_missing_column(self, service, tmp_path):
+        with sqlite3.connect(tmp_path / "ref.db") as db:
+            db.execute("ALTER TABLE Frequence DROP COLUMN SecteurSituation")
+        conn = service._manager.acquire()
+        try:
+            # Sector strategy fails; the direct link and plain name lookups still run
+            assert self._frequencies(service, conn, 50, "SEINE SIV", "SIV") == [
+                ("SEINE", ["120.325"]),
+            ]
+            assert self._frequencies(service, conn, 99, "SEINE NORD", "SIV") == [
+                ("SEINE", ["120.325"]),
+            ]
+        finally:
+            service._manager.release(conn)
+
+    def test_name_lookup_only_for_siv_and_tma(self, service, conn):
+        assert self._frequencies(service, conn, 99, "LYON EST", "TMA") == []
+        assert self._frequencies(service, conn, 99, "PARIS NORD", "CTR") == []
+        assert self._frequencies(service, conn, None, None, None) == []
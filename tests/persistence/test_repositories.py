@@ -7,14 +7,20 @@ from unittest.mock import patch
 
 import pytest
 
+from core.contracts.dossier import Dossier
 from core.contracts.enums import (
+    DossierStatus,
     LocationType,
     WaypointRole,
     WaypointSource,
 )
+from core.contracts.aerodrome_notes import AerodromeNotes
 from core.contracts.route import Route, RouteLeg, RouteWaypointRef
 from core.contracts.waypoint import UserWaypoint
+from core.persistence.repositories.aerodrome_notes_repo import AerodromeNotesRepository
 from core.persistence.repositories.aircraft_repo import AircraftRepository
+from core.persistence.repositories.community_repo import CommunityRepository
+from core.persistence.repositories.dossier_repo import DossierRepository
 from core.persistence.repositories.route_repo import RouteRepository
 from core.persistence.repositories.waypoint_repo import WaypointRepository
 from tests.persistence.fake_firestore import FakeFirestoreClient
@@ -46,7 +52,15 @@ def patch_firestore(fake_client):
                     "core.persistence.repositories.route_repo.get_firestore_client",
                     return_value=fake_client,
                 ):
-                    yield
+                    with patch(
+                        "core.persistence.repositories.aerodrome_notes_repo.get_firestore_client",
+                        return_value=fake_client,
+                    ):
+                        with patch(
+                            "core.persistence.repositories.community_repo.get_firestore_client",
+                            return_value=fake_client,
+                        ):
+                            yield
 
 
 def _make_waypoint(name: str, lat: float, lon: float) -> UserWaypoint:
@@ -102,6 +116,24 @@ class TestWaypointRepository:
         assert restored.latitude == 48.0
         assert restored.id == wp.id
 
+    def test_collection_ref_cached_per_user_and_client(self, fake_client):
+        repo = WaypointRepository()
+        ref = repo._collection_ref(USER_ID)
+        assert repo._collection_ref(USER_ID) is ref
+        assert repo._collection_ref("other-user") is not ref
+
+        with patch(
+            "core.persistence.repositories.base.get_firestore_client",
+            return_value=FakeFirestoreClient(),
+        ):
+            assert repo._collection_ref(USER_ID) is not ref
+
+    def test_other_user_collections_cached(self):
+        repo = RouteRepository()
+        wp_col = repo._user_collection(USER_ID, "user_waypoints")
+        assert repo._user_collection(USER_ID, "user_waypoints") is wp_col
+        assert repo._collection_ref(USER_ID) is not wp_col
+
     @pytest.mark.asyncio
     async def test_create_deduplication(self):
         repo = WaypointRepository()
@@ -139,6 +171,17 @@ class TestWaypointRepository:
         assert result[wp1.id].name == "ALPHA"
         assert result[wp2.id].name == "BRAVO"
 
+    @pytest.mark.asyncio
+    async def test_get_by_ids_chunked(self, monkeypatch):
+        monkeypatch.setattr("core.persistence.repositories.waypoint_repo._GET_ALL_CHUNK", 2)
+        repo = WaypointRepository()
+        wps = [_make_waypoint(f"WP{i}", 48.0 + i / 10, 2.0) for i in range(5)]
+        for wp in wps:
+            await repo.create(USER_ID, wp)
+
+        result = await repo.get_by_ids(USER_ID, [wp.id for wp in wps] + ["missing"])
+        assert [result[wp.id].name for wp in wps] == ["WP0", "WP1", "WP2", "WP3", "WP4"]
+
     @pytest.mark.asyncio
     async def test_get_by_ids_empty(self):
         repo = WaypointRepository()
@@ -222,6 +265,61 @@ class TestRouteRepository:
         assert restored_wp is not None
         assert restored_wp.name == "DEP"
 
+    @pytest.mark.asyncio
+    async def test_save_retries_contended_commit(self, fake_client, monkeypatch):
+        monkeypatch.setattr(
+            "core.persistence.repositories.route_repo._retryable_errors",
+            lambda: (RuntimeError,),
+        )
+        monkeypatch.setattr("core.persistence.repositories.route_repo._COMMIT_BACKOFF_S", 0)
+        make_batch = fake_client.batch
+        attempts: list[int] = []
+
+        def flaky_batch():
+            batch = make_batch()
+            attempts.append(1)
+            if len(attempts) == 1:
+                async def aborted():
+                    raise RuntimeError("aborted")
+                batch.commit = aborted
+            return batch
+
+        monkeypatch.setattr(fake_client, "batch", flaky_batch)
+        repo = RouteRepository()
+        wp1 = _make_waypoint("DEP", 48.0, 2.0)
+        wp2 = _make_waypoint("ARR", 47.0, 3.0)
+
+        route_id = await repo.save_with_waypoints(USER_ID, _make_route([wp1, wp2]), [wp1, wp2])
+
+        assert len(attempts) == 2
+        assert await repo.get(USER_ID, route_id) is not None
+
+    @pytest.mark.asyncio
+    async def test_save_splits_batches_over_limit(self, fake_client, monkeypatch):
+        monkeypatch.setattr("core.persistence.repositories.route_repo._BATCH_LIMIT", 2)
+        make_batch = fake_client.batch
+        sizes: list[int] = []
+
+        def recording_batch():
+            batch = make_batch()
+            commit = batch.commit
+
+            async def recorded():
+                sizes.append(len(batch._ops))
+                await commit()
+            batch.commit = recorded
+            return batch
+
+        monkeypatch.setattr(fake_client, "batch", recording_batch)
+        repo = RouteRepository()
+        wps = [_make_waypoint(f"WP{i}", 48.0 + i / 10, 2.0) for i in range(5)]
+
+        route_id = await repo.save_with_waypoints(USER_ID, _make_route(wps), wps)
+
+        assert sizes == [2, 2, 1, 1]  # waypoint batches, then the route alone
+        assert len(await WaypointRepository().list_all(USER_ID)) == 5
+        assert await repo.get(USER_ID, route_id) is not None
+
     @pytest.mark.asyncio
     async def test_route_roundtrip(self):
         repo = RouteRepository()
@@ -268,6 +366,138 @@ class TestRouteRepository:
         assert len(all_routes) == 2
 
 
+# ---------------------------------------------------------------------------
+# AerodromeNotesRepository
+# ---------------------------------------------------------------------------
+
+
+class TestAerodromeNotesRepository:
+    @pytest.mark.asyncio
+    async def test_get_multiple_batched(self):
+        repo = AerodromeNotesRepository()
+        await repo.save(USER_ID, AerodromeNotes(icao="LFXU", runway_in_use="12"))
+        await repo.save(USER_ID, AerodromeNotes(icao="LFFU", runway_in_use="25"))
+
+        notes = await repo.get_multiple(USER_ID, ["lfxu", "LFFU", "LFPG", "LFXU"])
+
+        assert set(notes) == {"LFXU", "LFFU"}
+        assert notes["LFFU"].runway_in_use == "25"
+
+    @pytest.mark.asyncio
+    async def test_get_multiple_empty(self):
+        assert await AerodromeNotesRepository().get_multiple(USER_ID, []) == {}
+
+
+# ---------------------------------------------------------------------------
+# DossierRepository
+# ---------------------------------------------------------------------------
+
+
+class TestDossierRepository:
+    @pytest.mark.asyncio
+    async def test_list_by_status_spans_pages(self, monkeypatch):
+        monkeypatch.setattr("core.persistence.repositories.base._PAGE_SIZE", 2)
+        repo = DossierRepository()
+        departure = datetime(2026, 3, 15, 9, 0, tzinfo=timezone.utc)
+        for i in range(5):
+            await repo.create(USER_ID, Dossier(
+                name=f"Nav {i}", route_id="route1", departure_datetime_utc=departure,
+                status=DossierStatus.ARCHIVED if i == 2 else DossierStatus.DRAFT,
+            ))
+
+        drafts = await repo.list_by_status(USER_ID, DossierStatus.DRAFT)
+
+        assert sorted(d.name for d in drafts) == ["Nav 0", "Nav 1", "Nav 3", "Nav 4"]
+        assert len({d.id for d in drafts}) == 4
+
+        streamed = [d async for d in repo.list_by_status_iter(USER_ID, DossierStatus.DRAFT)]
+        assert streamed == drafts
+
+    @pytest.mark.asyncio
+    async def test_list_by_status_newest_first_pages(self):
+        repo = DossierRepository()
+        departure = datetime(2026, 3, 15, 9, 0, tzinfo=timezone.utc)
+        for i in range(5):
+            await repo.create(USER_ID, Dossier(
+                name=f"Nav {i}", route_id="route1", departure_datetime_utc=departure,
+                created_at=datetime(2026, 3, 1 + i, tzinfo=timezone.utc),
+            ))
+
+        first = await repo.list_by_status(USER_ID, DossierStatus.DRAFT, limit=2)
+        second = await repo.list_by_status(
+            USER_ID, DossierStatus.DRAFT, limit=2, start_after=first[-1].id,
+        )
+
+        assert [d.name for d in first] == ["Nav 4", "Nav 3"]
+        assert [d.name for d in second] == ["Nav 2", "Nav 1"]
+        assert await repo.list_by_status(
+            USER_ID, DossierStatus.DRAFT, limit=2, start_after="missing",
+        ) == []
+
+    @pytest.mark.asyncio
+    async def test_list_by_status_projection(self, monkeypatch):
+        monkeypatch.setattr("core.persistence.repositories.base._PAGE_SIZE", 2)
+        repo = DossierRepository()
+        departure = datetime(2026, 3, 15, 9, 0, tzinfo=timezone.utc)
+        ids = [
+            await repo.create(USER_ID, Dossier(
+                name=f"Nav {i}", route_id="route1", departure_datetime_utc=departure,
+            ))
+            for i in range(3)
+        ]
+
+        partial = await repo.list_by_status_fields(USER_ID, DossierStatus.DRAFT, ["name"])
+
+        assert sorted(partial, key=lambda d: d["name"]) == [
+            {"id": doc_id, "name": f"Nav {i}"} for i, doc_id in enumerate(ids)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_decode_offloaded_above_threshold(self, monkeypatch):
+        import asyncio
+
+        monkeypatch.setattr("core.persistence.repositories.base._INLINE_DECODE_MAX", 2)
+        offloaded: list[int] = []
+
+        async def to_thread(func, docs):
+            offloaded.append(len(docs))
+            return func(docs)
+
+        monkeypatch.setattr(asyncio, "to_thread", to_thread)
+        repo = DossierRepository()
+        departure = datetime(2026, 3, 15, 9, 0, tzinfo=timezone.utc)
+        for i in range(3):
+            await repo.create(USER_ID, Dossier(
+                name=f"Nav {i}", route_id="route1", departure_datetime_utc=departure,
+                status=DossierStatus.ARCHIVED if i == 0 else DossierStatus.DRAFT,
+            ))
+
+        assert len(await repo.list_by_status(USER_ID, DossierStatus.DRAFT)) == 2
+        assert offloaded == []
+        assert len(await repo.list_all(USER_ID)) == 3
+        assert offloaded == [3]
+
+
+# ---------------------------------------------------------------------------
+# CommunityRepository
+# ---------------------------------------------------------------------------
+
+
+class TestCommunityRepository:
+    @pytest.mark.asyncio
+    async def test_vac_notes_bulk(self):
+        repo = CommunityRepository()
+        await repo.set_vac_notes("lfxu", {"circuit": "north"}, USER_ID)
+        await repo.set_vac_notes("LFFU", {"circuit": "south"}, USER_ID)
+
+        notes = await repo.get_vac_notes_bulk(["LFXU", "lffu", "LFPG"])
+
+        assert set(notes) == {"LFXU", "LFFU"}
+        assert notes["LFFU"]["circuit"] == "south"
+        assert notes["LFXU"]["updated_by"] == USER_ID
+        assert await repo.get_tdp_bulk(["LFXU"]) == {}
+
+
 # ---------------------------------------------------------------------------
 # Roundtrip: to_firestore → store → from_firestore preserves data
 # ---------------------------------------------------------------------------
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import os
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
@@ -72,3 +74,100 @@ class TestSpatiaLiteManager:
         manager.use_local(tmp_path / "skypath_2604.db", cycle="2604")
         assert manager.current_cycle == "2604"
         assert manager._local_path == tmp_path / "skypath_2604.db"
+
+    @pytest.fixture
+    def pooled(self, tmp_path: Path, monkeypatch) -> SpatiaLiteManager:
+        # Plain SQLite stands in for the SpatiaLite extension
+        monkeypatch.setattr(
+            "core.persistence.spatialite.db_manager.enable_spatialite", lambda conn: None,
+        )
+        for name in ("a.db", "b.db"):
+            sqlite3.connect(str(tmp_path / name)).close()
+        manager = SpatiaLiteManager(max_connections=2)
+        manager.use_local(tmp_path / "a.db")
+        return manager
+
+    def test_pool_reuses_and_bounds_connections(self, pooled: SpatiaLiteManager):
+        first, second = pooled.acquire(), pooled.acquire()
+        assert first is not second
+
+        with ThreadPoolExecutor(1) as pool:
+            waiting = pool.submit(pooled.acquire)  # Pool is full: blocks
+            assert not waiting.done()
+            pooled.release(first)
+            reused = waiting.result(timeout=5)
+        assert reused is first
+        # Handed over to another thread without tripping the thread check
+        assert reused.execute("SELECT 1").fetchone()[0] == 1
+
+    def test_pool_drops_connections_of_previous_db(self, pooled: SpatiaLiteManager, tmp_path):
+        old = pooled.acquire()
+        pooled.release(old)
+        pooled.use_local(tmp_path / "b.db", cycle="2611")
+
+        fresh = pooled.acquire()
+        assert fresh is not old
+        with pytest.raises(sqlite3.ProgrammingError):
+            old.execute("SELECT 1")  # closed
+
+    def test_pool_drops_connections_when_db_reselected(self, pooled: SpatiaLiteManager, tmp_path):
+        # Connections are immutable: a file rebuilt in place needs new ones
+        old = pooled.acquire()
+        pooled.use_local(tmp_path / "a.db")
+        pooled.release(old)
+        assert pooled.acquire() is not old
+
+    def test_pool_drops_connections_when_file_rewritten(self, pooled: SpatiaLiteManager, tmp_path):
+        old = pooled.acquire()
+        pooled.release(old)
+        stat = (tmp_path / "a.db").stat()
+        os.utime(tmp_path / "a.db", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        fresh = pooled.acquire()
+        assert fresh is not old
+        with pytest.raises(sqlite3.ProgrammingError):
+            old.execute("SELECT 1")  # closed
+
+    def test_connections_read_only_with_memory_temp_store(self, pooled: SpatiaLiteManager):
+        conn = pooled.acquire()
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("CREATE TABLE t (x)")
+
+
+class _FakeConn:
+    """Records load_extension calls; only ``good_lib`` loads."""
+
+    def __init__(self, good_lib: str):
+        self.good_lib = good_lib
+        self.loaded: list[str] = []
+
+    def enable_load_extension(self, enabled: bool) -> None:
+        pass
+
+    def load_extension(self, name: str) -> None:
+        self.loaded.append(name)
+        if name != self.good_lib:
+            raise sqlite3.OperationalError(f"cannot open {name}")
+
+    def execute(self, sql: str):
+        return sqlite3.connect(":memory:").execute("SELECT '5.1.0'")
+
+
+class TestSpatiaLiteLoader:
+    def test_resolved_library_reused(self, monkeypatch):
+        from core.persistence.spatialite import spatialite_loader
+
+        monkeypatch.setattr(spatialite_loader, "_resolved_library", None)
+        monkeypatch.delenv("SPATIALITE_LIBRARY_PATH", raising=False)
+        monkeypatch.setattr(
+            spatialite_loader.SpatiaLiteLoader, "_get_platform_search_paths", lambda self: [],
+        )
+
+        first = _FakeConn("libspatialite")
+        assert spatialite_loader.enable_spatialite(first)
+        assert first.loaded == ["mod_spatialite", "spatialite", "libspatialite"]
+
+        second = _FakeConn("libspatialite")
+        assert spatialite_loader.enable_spatialite(second)
+        assert second.loaded == ["libspatialite"]
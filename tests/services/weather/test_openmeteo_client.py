@@ -8,7 +8,7 @@ import httpx
 import pytest
 
 from core.contracts.enums import ForecastModel
-from core.services.weather.openmeteo_client import OpenMeteoClient
+from core.services.weather.openmeteo_client import PRESSURE_LEVELS_HPA, OpenMeteoClient
 
 # Sample meta.json response
 META_RESPONSE = {
@@ -76,10 +76,10 @@ class TestOpenMeteoClient:
             assert forecast.wind_gusts_10m == 15.2
             assert forecast.visibility == 15000
             assert forecast.cloud_cover == 45
-            assert 850 in forecast.temperature_levels
-            assert forecast.temperature_levels[850] == 7.5
-            assert 925 in forecast.wind_speed_levels
-            assert forecast.wind_direction_levels[700] == 290
+            levels = list(PRESSURE_LEVELS_HPA)
+            assert forecast.temperature_levels[levels.index(850)] == 7.5
+            assert forecast.wind_speed_levels[levels.index(925)] is not None
+            assert forecast.wind_direction_levels[levels.index(700)] == 290
 
     async def test_get_forecast_url_params(self):
         """Verify correct URL parameters are sent."""